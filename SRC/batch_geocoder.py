@@ -0,0 +1,264 @@
+# Rate-limited, concurrent geocoding for bulk imports.
+#
+# get_property_coordinates() resolves one address per blocking call. When
+# hundreds of listings are imported at once, those calls run one after
+# another and most of the time is spent waiting on the network.
+#
+# BatchGeocoder takes an iterable of addresses, removes duplicates, and runs
+# the lookups on a small thread pool. Every request first takes a token from
+# a shared token bucket so the geocoding service's rate limit is respected
+# no matter how many workers run. Timeouts and service errors are retried
+# with jittered exponential backoff, and results are streamed back as soon
+# as each lookup finishes. Addresses go through the same path as
+# get_property_coordinates(): the campus destination table, the geocode
+# cache and the negative cache first, then a single-flight backend lookup.
+#
+# A BatchGeocoder is also callable with a single address, so it can be
+# plugged in as the backend of get_property_coordinates():
+#
+#     set_geocoder_backend(BatchGeocoder(rate_per_second=1.0))
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from geopy.exc import GeocoderServiceError, GeocoderTimedOut
+
+from function_library import (format_address, get_geocode_cache, known_coordinates,
+                              lookup_coordinates, nominatim_geocode)
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    Example:
+        bucket = TokenBucket(rate_per_second=1.0, capacity=1)
+        bucket.acquire()   # returns immediately
+        bucket.acquire()   # waits about one second
+    """
+
+    def __init__(self, rate_per_second: float, capacity: int = 1,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            rate_per_second (float): Tokens added per second.
+            capacity (int): Maximum tokens stored (allowed burst size).
+            clock (callable): Monotonic time source (injectable for tests).
+            sleep (callable): Sleep function (injectable for tests).
+
+        Raises:
+            ValueError: If rate_per_second or capacity is not positive.
+        """
+        if rate_per_second <= 0:
+            raise ValueError("Rate must be positive.")
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1.")
+
+        self._rate = float(rate_per_second)
+        self._capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until one token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_seconds = (1 - self._tokens) / self._rate
+
+            self._sleep(wait_seconds)
+
+
+class BatchGeocoder:
+    """Geocodes many addresses with bounded concurrency, rate limiting and retries.
+
+    Example:
+        geocoder = BatchGeocoder(rate_per_second=1.0, max_workers=2)
+        for address, coords, error in geocoder.geocode_stream(addresses):
+            print(address, coords or error)
+    """
+
+    # Errors worth retrying: the service was slow or briefly unavailable
+    RETRYABLE_ERRORS = (GeocoderTimedOut, GeocoderServiceError)
+
+    def __init__(self, lookup=None, rate_per_second: float = 1.0, burst: int = 1,
+                 max_workers: int = 4, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 sleep=time.sleep, rng=None):
+        """
+        Args:
+            lookup (callable | None): Raw single-address lookup taking a formatted
+                address and returning (latitude, longitude) or None.
+                Default is the shared Nominatim lookup.
+            rate_per_second (float): Maximum requests per second across all workers.
+                Public Nominatim allows 1 request per second.
+            burst (int): Requests allowed back-to-back before rate limiting applies.
+            max_workers (int): Number of concurrent lookups.
+            max_retries (int): Retries after a timeout or service error.
+            backoff_base (float): Base delay in seconds for exponential backoff.
+            backoff_max (float): Upper bound for a single backoff delay.
+            sleep (callable): Sleep function (injectable for tests).
+            rng (random.Random | None): Random source for backoff jitter.
+
+        Raises:
+            ValueError: If max_workers or max_retries is invalid.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative.")
+
+        self._lookup = lookup or nominatim_geocode
+        self._rate = float(rate_per_second)
+        self._bucket = TokenBucket(rate_per_second, burst, sleep=sleep)
+        self._max_workers = int(max_workers)
+        self._max_retries = int(max_retries)
+        self._backoff_base = float(backoff_base)
+        self._backoff_max = float(backoff_max)
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    @property
+    def max_workers(self) -> int:
+        """Return the number of concurrent lookups."""
+        return self._max_workers
+
+    # ----------
+    # Single lookups
+    # ----------
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Return a 'full jitter' delay for the given retry attempt (0-based)."""
+        ceiling = min(self._backoff_max, self._backoff_base * (2 ** attempt))
+        return self._rng.uniform(0, ceiling)
+
+    def __call__(self, clean_address: str):
+        """
+        Look up one formatted address with rate limiting and retries.
+
+        This makes a BatchGeocoder usable as a get_property_coordinates backend.
+
+        Args:
+            clean_address (str): Address produced by format_address().
+
+        Returns:
+            tuple[float, float] | None: (latitude, longitude), or None if not found.
+
+        Raises:
+            GeocoderTimedOut, GeocoderServiceError: If every retry failed.
+        """
+        attempt = 0
+        while True:
+            self._bucket.acquire()
+            try:
+                return self._lookup(clean_address)
+            except self.RETRYABLE_ERRORS:
+                if attempt >= self._max_retries:
+                    raise
+                self._sleep(self._backoff_delay(attempt))
+                attempt += 1
+
+    # ----------
+    # Batch lookups
+    # ----------
+
+    def geocode_stream(self, addresses, use_cache: bool = True):
+        """
+        Geocode many addresses and yield each result as soon as it is ready.
+
+        Addresses are normalized with format_address() and duplicates are only
+        looked up (and yielded) once. Campus buildings, cached addresses and
+        recent failures are yielded right away without using a worker; other
+        lookups are shared with concurrent get_property_coordinates() calls
+        for the same address. At most 2 x max_workers lookups are queued at
+        a time, so very large inputs are consumed lazily.
+
+        Args:
+            addresses (Iterable[str]): Addresses to geocode.
+            use_cache (bool): Read from and write to the shared geocode cache.
+
+        Yields:
+            tuple: (clean_address, coordinates, error) where exactly one of
+                   coordinates or error is None.
+
+        Example:
+            for address, coords, error in geocoder.geocode_stream(["4500 Knox Rd"]):
+                ...
+        """
+        cache = get_geocode_cache() if use_cache else None
+        seen = set()
+        in_flight = {}
+        window = self._max_workers * 2
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            for address in addresses:
+                try:
+                    clean_address = format_address(address)
+                except (TypeError, ValueError) as e:
+                    yield (address, None, e)
+                    continue
+
+                if clean_address in seen:
+                    continue
+                seen.add(clean_address)
+
+                try:
+                    known = known_coordinates(clean_address, cache)
+                except (ValueError, ConnectionError) as e:
+                    yield (clean_address, None, e)
+                    continue
+                if known is not None:
+                    yield (clean_address, known, None)
+                    continue
+
+                in_flight[pool.submit(lookup_coordinates, clean_address, cache, self)] = clean_address
+
+                # Keep the queue bounded: drain finished lookups before submitting more
+                if len(in_flight) >= window:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._finish(future, in_flight.pop(future))
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._finish(future, in_flight.pop(future))
+
+    def _finish(self, future, clean_address: str) -> tuple:
+        """Turn a finished lookup into a (address, coordinates, error) result."""
+        try:
+            return (clean_address, future.result(), None)
+        except (ValueError, ConnectionError) as e:
+            return (clean_address, None, e)
+
+    def geocode_all(self, addresses, use_cache: bool = True) -> dict:
+        """
+        Geocode many addresses and collect the results.
+
+        Args:
+            addresses (Iterable[str]): Addresses to geocode.
+            use_cache (bool): Read from and write to the shared geocode cache.
+
+        Returns:
+            dict: clean_address -> (latitude, longitude) or the exception raised.
+        """
+        return {
+            address: coordinates if error is None else error
+            for address, coordinates, error in self.geocode_stream(addresses, use_cache)
+        }
+
+    def __str__(self) -> str:
+        """Readable summary for debugging."""
+        return (f"BatchGeocoder(workers={self._max_workers}, "
+                f"rate={self._rate}/s, retries={self._max_retries})")
@@ -0,0 +1,157 @@
+# Built-in coordinates for UMD campus buildings and other named destinations.
+#
+# Commutes are always measured to a small, fixed set of places: the class
+# buildings accepted by validate_class_locations() and the campus address
+# used by the live demo. Geocoding those same points again for every rental
+# and every travel mode wastes thousands of network calls.
+#
+# DestinationTable maps building codes, names and street addresses (all
+# normalized with format_address) to coordinates. get_property_coordinates()
+# checks the active table before the cache or geocoder, so Commute and
+# calculate_distance() resolve these destinations with zero network calls.
+
+from pathlib import Path
+import csv
+
+from function_library import format_address
+
+
+# Approximate building entrances on the College Park campus
+CAMPUS_BUILDINGS = {
+    "ESJ": {
+        "name": "Edward St. John Learning and Teaching Center",
+        "address": "4131 Campus Dr, College Park, MD 20742",
+        "coordinates": (38.98695, -76.94178),
+    },
+    "HBK": {
+        "name": "Hornbake Library",
+        "address": "4130 Campus Dr, College Park, MD 20742",
+        "coordinates": (38.98815, -76.94156),
+    },
+    "KEY": {
+        "name": "Francis Scott Key Hall",
+        "address": "4115 Chapel Dr, College Park, MD 20742",
+        "coordinates": (38.98507, -76.94316),
+    },
+    "MMH": {
+        "name": "Marie Mount Hall",
+        "address": "7814 Regents Dr, College Park, MD 20742",
+        "coordinates": (38.98501, -76.94050),
+    },
+    "CCC": {
+        "name": "Cambridge Community Center",
+        "address": "4220 Farm Dr, College Park, MD 20742",
+        "coordinates": (38.99203, -76.94257),
+    },
+    "TWS": {
+        "name": "Tawes Hall",
+        "address": "7760 Alumni Dr, College Park, MD 20742",
+        "coordinates": (38.98578, -76.94820),
+    },
+}
+
+# Other destinations used across the system (live_demo.CAMPUS_ADDRESS is McKeldin)
+NAMED_DESTINATIONS = {
+    "MCK": {
+        "name": "McKeldin Library",
+        "address": "7649 Library Ln, College Park, MD 20742",
+        "coordinates": (38.98598, -76.94503),
+    },
+}
+
+
+class DestinationTable:
+    """Lookup table of known destinations -> (latitude, longitude).
+
+    Example:
+        table = DestinationTable.campus()
+        table.lookup("ESJ")
+        (38.98695, -76.94178)
+        table.lookup("7649 library ln, college park, md 20742")
+        (38.98598, -76.94503)
+    """
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self._coordinates = {}  # normalized alias -> coordinates
+        self._codes = {}        # code -> coordinates
+
+    @classmethod
+    def campus(cls):
+        """Return a table with every built-in campus building and named destination."""
+        table = cls()
+        for code, entry in {**CAMPUS_BUILDINGS, **NAMED_DESTINATIONS}.items():
+            table.add(code, entry["coordinates"], entry["name"], entry["address"])
+        return table
+
+    @classmethod
+    def from_csv(cls, path: str, include_campus: bool = True):
+        """
+        Load destinations from a CSV with code, name, address, lat, lon columns.
+
+        Args:
+            path (str): CSV file path. The name and address columns are optional.
+            include_campus (bool): Start from the built-in campus table.
+
+        Returns:
+            DestinationTable: The loaded table.
+
+        Raises:
+            ValueError: If the file is missing or a row is invalid.
+        """
+        file_path = Path(path)
+        if not file_path.exists():
+            raise ValueError(f"Destination file not found: {path}")
+
+        table = cls.campus() if include_campus else cls()
+        with file_path.open(newline="", encoding="utf-8") as file:
+            for line_number, row in enumerate(csv.DictReader(file), start=2):
+                try:
+                    coordinates = (float(row["lat"]), float(row["lon"]))
+                    table.add(row["code"], coordinates, row.get("name") or None, row.get("address") or None)
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError(f"Invalid destination row on line {line_number}.")
+        return table
+
+    def add(self, code: str, coordinates: tuple, *aliases) -> None:
+        """
+        Register a destination under its code and any aliases (names, addresses).
+
+        Args:
+            code (str): Short code such as "ESJ".
+            coordinates (tuple): (latitude, longitude).
+            *aliases (str | None): Other names that should resolve to the same point.
+        """
+        point = (float(coordinates[0]), float(coordinates[1]))
+        self._codes[code.strip().upper()] = point
+        for alias in (code, *aliases):
+            if alias:
+                self._coordinates[format_address(alias)] = point
+
+    def lookup(self, address: str):
+        """
+        Return coordinates for a known destination, or None.
+
+        Args:
+            address (str): Building code, name or address (any capitalization/spacing).
+
+        Returns:
+            tuple[float, float] | None: (latitude, longitude) if the destination is known.
+        """
+        try:
+            return self._coordinates.get(format_address(address))
+        except (TypeError, ValueError):
+            return None
+
+    def codes(self) -> list[str]:
+        """Return the registered destination codes."""
+        return list(self._codes)
+
+    def __contains__(self, address) -> bool:
+        return self.lookup(address) is not None
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __str__(self) -> str:
+        return f"DestinationTable({len(self)} destinations)"
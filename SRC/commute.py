@@ -1,6 +1,7 @@
 
 from function_library import (
     calculate_commute_time, 
+    calculate_commute_times,
     calculate_distance
 )
 from coordinates import Coordinates
@@ -143,3 +144,109 @@ class Commute:
         return (f"{self._mode.title()} commute from '{self._start_address}' -> "
                 f"'{self._end_address}': {self._distance_miles} miles, "
                 f"{self._time_minutes} min")
+
+
+# CommuteProfile covers every travel mode between the same two addresses.
+#
+# Building one Commute per mode repeats the distance calculation (and the
+# geocoding behind it) for each mode, even though only the speed changes.
+# A profile computes the distance once and derives the time for every mode
+# from the shared speed table in one step.
+class CommuteProfile:
+    """Distance computed once, commute times for every travel mode
+
+        Example:
+        p = CommuteProfile("7303 Baltimore Ave", "7649 Library Ln, College Park, MD 20742")
+        p.times
+            {'walk': 25.0, 'bike': 7.5, 'drive': 3.0, 'bus': 5.0}
+        p.distances(["walk", "drive"])
+            {'walk': 1.25, 'drive': 1.25}
+    """
+
+    def __init__(self, start_address: str, end_address: str, modes: list[str] | None = None):
+        """
+        Initialize with start and end addresses and compute the distance once.
+
+            Args:
+             start_address(str): The starting address for the commute
+             end_address (str): The destination address for the commute
+             modes (list[str] | None): Travel modes to include. Default is every
+                mode in the speed table (walk, bike, drive, bus).
+
+             Raises:
+                ValueError: If either address or a mode is invalid.
+        """
+        self._validator = Validator()
+
+        if not self._validator.validate_address(start_address):
+            raise ValueError("Invalid start address.")
+        if not self._validator.validate_address(end_address):
+            raise ValueError("Invalid destination address.")
+
+        self._start_address = format_address(start_address)
+        self._end_address = format_address(end_address)
+
+        # One distance for all modes, then every mode's time in one pass
+        self._distance_miles = calculate_distance(self._start_address, self._end_address)
+        self._times = calculate_commute_times(self._distance_miles, modes)
+
+    @property
+    def start_address(self):
+        """Return formatted starting address."""
+        return self._start_address
+
+    @property
+    def end_address(self):
+        """Return formatted destination address."""
+        return self._end_address
+
+    @property
+    def distance_miles(self):
+        """Return calculated distance in miles (same for every mode)."""
+        return self._distance_miles
+
+    @property
+    def modes(self) -> list[str]:
+        """Return the travel modes covered by this profile."""
+        return list(self._times)
+
+    @property
+    def times(self) -> dict:
+        """Return a copy of mode -> travel time in minutes."""
+        return dict(self._times)
+
+    def time_for(self, mode: str) -> float:
+        """Return travel time in minutes for one mode.
+
+            Raises:
+                ValueError: If the mode is not part of this profile.
+        """
+        mode = mode.lower()
+        if mode not in self._times:
+            raise ValueError(f"Mode '{mode}' is not part of this commute profile.")
+        return self._times[mode]
+
+    def distances(self, modes: list[str] | None = None) -> dict:
+        """Return mode -> distance in miles, the format RentalProperty.distances uses.
+
+            Args:
+                modes (list[str] | None): Modes to include. Default is every profile mode.
+        """
+        selected = self._times if modes is None else [mode.lower() for mode in modes]
+        return {mode: self._distance_miles for mode in selected}
+
+    def commute(self, mode: str) -> dict:
+        """Return a Commute-style summary for one mode without recomputing anything."""
+        return {
+            "start": self._start_address,
+            "end": self._end_address,
+            "mode": mode.lower(),
+            "distance_miles": self._distance_miles,
+            "time_minutes": self.time_for(mode)
+        }
+
+    def __str__(self):
+        """Readable text summary for printing or debugging."""
+        times = ", ".join(f"{mode} {minutes} min" for mode, minutes in self._times.items())
+        return (f"Commute from '{self._start_address}' -> '{self._end_address}': "
+                f"{self._distance_miles} miles ({times})")
@@ -1,5 +1,6 @@
-
-from function_library import get_property_coordinates
+from function_library import get_property_coordinates, format_address
+from datetime import datetime, timezone
+import weakref
 
 # This class is responsible for converting a rental property address
 # into geographic coordinates (latitude and longitude).
@@ -10,14 +11,43 @@ from function_library import get_property_coordinates
 #
 # This class supports automatic updates when an address changes
 # and provides a clean interface for accessing coordinates.
+#
+# In lazy mode the lookup is deferred until the coordinates are first
+# read, and it runs at most once. Pending lookups can also be resolved
+# together with Coordinates.resolve_all(), which geocodes each distinct
+# address only once.
 
 class Coordinates:
     """ Gets coordinates for a given rental property"""
 
-    def __init__(self, address: str):
-        """ Initialize with address and fetch coordinates"""
+    # Lazy instances that have not been geocoded yet (weak, so they can be garbage collected)
+    _pending = weakref.WeakSet()
+
+    def __init__(self, address: str, lazy: bool = False):
+        """ Initialize with address and fetch coordinates
+
+        Args:
+            address (str): Address to geocode.
+            lazy (bool): If True, defer the lookup until the coordinates are first read.
+        """
+        self._lazy = lazy
         self.address = address
-        self.latitude, self.longitude = get_property_coordinates(address)
+
+    @classmethod
+    def from_saved(cls, address: str, coordinates: tuple, geocoded_at: str | None = None):
+        """ Rebuild a Coordinates object from previously resolved values (no network call)
+
+        Args:
+            address (str): The address the coordinates belong to.
+            coordinates (tuple): Saved (latitude, longitude).
+            geocoded_at (str | None): When the coordinates were originally resolved.
+        """
+        obj = cls.__new__(cls)
+        obj._lazy = True
+        obj._address = address
+        obj._coordinates = (float(coordinates[0]), float(coordinates[1]))
+        obj._geocoded_at = geocoded_at
+        return obj
 
 # -----------------
 # Address handling
@@ -35,29 +65,128 @@ class Coordinates:
     def address(self, new_address: str):
         """ Sets the rental property address and refreshes coordinates"""
         self._address = new_address
-        self._coordinates = get_property_coordinates(new_address)
+        self._coordinates = None
+        self._geocoded_at = None
+
+        if self._lazy:
+            Coordinates._pending.add(self)
+        else:
+            self.refresh_coordinates()
 
     # Coordinates Getter
     # Reads data safely without directly accessing private variables
     @property
     def coordinates(self) -> tuple:
         """ Returns the (latitude, longitude) tuple for the rental property"""
+        if self._coordinates is None:
+            self.refresh_coordinates()
         return self._coordinates
-    
+
+    @property
+    def latitude(self) -> float:
+        """ Returns the latitude of the address"""
+        return self.coordinates[0]
+
+    @property
+    def longitude(self) -> float:
+        """ Returns the longitude of the address"""
+        return self.coordinates[1]
+
+    @property
+    def resolved(self) -> bool:
+        """ Returns True once coordinates are available without a lookup"""
+        return self._coordinates is not None
+
+    @property
+    def geocoded_at(self) -> str | None:
+        """ Returns when the coordinates were resolved (ISO-8601 UTC), or None"""
+        return self._geocoded_at
+
     # Manual Refresh Method
     # Manual override to force a coordinate update
     def refresh_coordinates(self) -> tuple:
         """ Manually refreshes and returns the latest coordinates for the current address"""
-        self._coordinates = get_property_coordinates(self._address)
+        self._store(get_property_coordinates(self._address))
         return self._coordinates
-    
+
+    def _store(self, coordinates: tuple):
+        """ Saves resolved coordinates, stamps the time and leaves the pending set"""
+        self._coordinates = coordinates
+        self._geocoded_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        Coordinates._pending.discard(self)
+
+# -----------------
+# Batch resolution
+# -----------------
+
+    @classmethod
+    def pending_count(cls) -> int:
+        """ Returns how many lazy Coordinates objects are still waiting for a lookup"""
+        return len(cls._pending)
+
+    @classmethod
+    def resolve_all(cls, geocoder=None) -> dict:
+        """ Geocodes every pending lazy Coordinates object in one pass
+
+        Each distinct address is looked up once, even if many objects share it.
+        Objects whose lookup fails stay pending and raise on their next read.
+
+        Args:
+            geocoder (BatchGeocoder | None): Optional batch geocoder used to run
+                the lookups concurrently. Default resolves them one by one.
+
+        Returns:
+            dict: Address -> exception for every address that could not be resolved
+                  (empty when everything resolved).
+
+        Example:
+            Coordinates("4500 Knox Rd", lazy=True)
+            Coordinates.resolve_all()
+            {}
+        """
+        by_address = {}
+        for coords in list(cls._pending):
+            by_address.setdefault(coords._address, []).append(coords)
+
+        if geocoder is not None:
+            return cls._resolve_with(geocoder, by_address)
+
+        failures = {}
+        for address, waiting in by_address.items():
+            try:
+                result = get_property_coordinates(address)
+            except (ValueError, ConnectionError) as e:
+                failures[address] = e
+                continue
+            for coords in waiting:
+                coords._store(result)
+
+        return failures
+
+    @classmethod
+    def _resolve_with(cls, geocoder, by_address: dict) -> dict:
+        """ Streams pending addresses through a BatchGeocoder and stores the results"""
+        by_clean = {}
+        for address, waiting in by_address.items():
+            by_clean.setdefault(format_address(address), []).extend(waiting)
+
+        failures = {}
+        for clean_address, result, error in geocoder.geocode_stream(by_clean):
+            if error is not None:
+                failures[clean_address] = error
+                continue
+            for coords in by_clean[clean_address]:
+                coords._store(result)
+
+        return failures
+
 
     # String Representation
     # For easy debugging and display
     def __str__(self):
         """
-        Returns a string representation of the object showing 
+        Returns a string representation of the object showing
         the address and its latitude and longitude.
         """
-        lat, lon = self._coordinates
+        lat, lon = self.coordinates
         return f"Address: {self._address}, Latitude: {lat}, Longitude: {lon}"
@@ -0,0 +1,215 @@
+# Vectorized distance and commute calculations with NumPy.
+#
+# calculate_distance() measures one geodesic between two addresses at a
+# time, so comparing N rentals against up to 5 class buildings costs N x 5
+# Python-level calls (plus geocoding). This module works on coordinate
+# arrays instead: one call returns the full N x M matrix of miles using the
+# haversine formula, and the commute helpers turn that matrix into commute
+# times and commute scores for every pair at once.
+#
+# Haversine treats the Earth as a sphere, so it can be off from the
+# geodesic (ellipsoid) distance by up to about 0.56%. distance_matrix()
+# always reports the maximum approximation error, and exact=True refines
+# every pair with geopy's geodesic for callers that need identical miles.
+
+import numpy as np
+from geopy.distance import geodesic
+
+from function_library import COMMUTE_SPEEDS_MPH
+
+
+# Mean Earth radius (IUGG) in miles
+EARTH_RADIUS_MILES = 3958.7613
+
+# Worst-case relative error of a spherical model vs. the WGS-84 ellipsoid
+HAVERSINE_RELATIVE_ERROR = 0.0056
+
+
+def round_like_python(values, ndigits: int = 2) -> np.ndarray:
+    """
+    Round an array exactly like Python's built-in round(x, ndigits).
+
+    np.round scales by 10**ndigits before rounding, which can land on the
+    other side of a tie than Python's correctly rounded round(). Values that
+    are that close to a tie are rounded with round() itself, so scalar and
+    bulk results always agree.
+
+    Args:
+        values (array-like): Values to round.
+        ndigits (int): Decimal places.
+
+    Returns:
+        np.ndarray: Rounded float64 array.
+
+    Examples:
+        >>> round_like_python([2.675, 1.005], 2)
+        array([2.67, 1.  ])
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+
+    scaled = values * (10 ** ndigits)
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if np.any(near_tie):
+        rounded = rounded.copy()
+        flat_values = values[near_tie]
+        rounded[near_tie] = [round(float(v), ndigits) for v in flat_values]
+
+    return rounded
+
+
+def _as_coordinates(points, name: str) -> np.ndarray:
+    """Validate and convert (latitude, longitude) pairs to an (N, 2) float array."""
+    array = np.asarray(points, dtype=np.float64)
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError(f"{name} must be a sequence of (latitude, longitude) pairs.")
+    if np.any(np.abs(array[:, 0]) > 90) or np.any(np.abs(array[:, 1]) > 180):
+        raise ValueError(f"{name} contain out-of-range latitude or longitude values.")
+    return array
+
+
+def haversine_matrix(origins, destinations) -> np.ndarray:
+    """
+    Great-circle distance in miles between every origin and every destination.
+
+    Args:
+        origins (array-like): N (latitude, longitude) pairs, e.g. rentals.
+        destinations (array-like): M (latitude, longitude) pairs, e.g. class buildings.
+
+    Returns:
+        np.ndarray: N x M matrix of miles (unrounded).
+
+    Raises:
+        ValueError: If either input is not a list of valid coordinate pairs.
+    """
+    start = np.radians(_as_coordinates(origins, "Origins"))
+    end = np.radians(_as_coordinates(destinations, "Destinations"))
+
+    lat1 = start[:, 0][:, np.newaxis]
+    lon1 = start[:, 1][:, np.newaxis]
+    lat2 = end[:, 0][np.newaxis, :]
+    lon2 = end[:, 1][np.newaxis, :]
+
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distance_matrix(origins, destinations, exact: bool = False, decimals: int | None = 2):
+    """
+    N x M matrix of miles between origins and destinations, with its error bound.
+
+    Args:
+        origins (array-like): N (latitude, longitude) pairs.
+        destinations (array-like): M (latitude, longitude) pairs.
+        exact (bool): If True, refine every pair with geopy's geodesic (slower;
+            matches calculate_distance) and report the measured haversine error.
+        decimals (int | None): Round miles like calculate_distance (2). None keeps full precision.
+
+    Returns:
+        tuple[np.ndarray, float]: (miles matrix, maximum approximation error in miles).
+            For exact=False the error is an upper bound for the haversine result;
+            for exact=True it is the largest measured haversine-vs-geodesic gap.
+
+    Example:
+        miles, max_error = distance_matrix(rental_coords, building_coords)
+    """
+    approx = haversine_matrix(origins, destinations)
+
+    if exact:
+        start = _as_coordinates(origins, "Origins")
+        end = _as_coordinates(destinations, "Destinations")
+        miles = np.array([[geodesic(tuple(a), tuple(b)).miles for b in end] for a in start],
+                         dtype=np.float64).reshape(approx.shape)
+        max_error = float(np.max(np.abs(approx - miles))) if miles.size else 0.0
+    else:
+        miles = approx
+        max_error = float(np.max(approx) * HAVERSINE_RELATIVE_ERROR) if approx.size else 0.0
+
+    if decimals is not None:
+        miles = round_like_python(miles, decimals)
+
+    return miles, max_error
+
+
+# ----------
+# Bulk commute helpers
+# ----------
+
+def commute_time_matrix(miles, mode: str) -> np.ndarray:
+    """
+    Bulk version of calculate_commute_time(): minutes for every distance.
+
+    Args:
+        miles (array-like): Distances in miles (any shape).
+        mode (str): "walk", "bike", "drive" or "bus".
+
+    Returns:
+        np.ndarray: Minutes, same shape as miles, identical to the scalar function.
+
+    Raises:
+        ValueError: If a distance is negative or the mode is unknown.
+    """
+    miles = np.asarray(miles, dtype=np.float64)
+    if np.any(miles < 0):
+        raise ValueError("Distance cannot be negative.")
+
+    mode = mode.lower()
+    if mode not in COMMUTE_SPEEDS_MPH:
+        raise ValueError("Mode of transportation must be selected (walk, bike, drive, or bus).")
+
+    return round_like_python((miles / COMMUTE_SPEEDS_MPH[mode]) * 60, 2)
+
+
+def commute_score_matrix(distances: dict) -> np.ndarray:
+    """
+    Bulk version of calculate_commute_score().
+
+    Args:
+        distances (dict): Mode -> array of miles. Arrays share one shape; NaN
+            marks a mode that does not apply to that element. Unknown modes are
+            skipped like in the scalar function. Modes are summed in dict order.
+
+    Returns:
+        np.ndarray: Commute scores (0-10), identical to calculate_commute_score().
+
+    Raises:
+        ValueError: If no valid mode is given for some element, or a distance is negative.
+
+    Example:
+        miles, _ = distance_matrix(rental_coords, building_coords)
+        scores = commute_score_matrix({"walk": miles, "drive": miles})
+    """
+    if not isinstance(distances, dict):
+        raise TypeError("Distances must be provided as a dictionary.")
+    if not distances:
+        raise ValueError("Distances dictionary cannot be empty.")
+
+    total = None
+    count = None
+
+    for mode, miles in distances.items():
+        if mode not in COMMUTE_SPEEDS_MPH:
+            continue
+
+        miles = np.asarray(miles, dtype=np.float64)
+        present = ~np.isnan(miles)
+        if np.any(miles[present] < 0):
+            raise ValueError(f"Distance for mode '{mode}' cannot be negative.")
+
+        time = commute_time_matrix(np.where(present, miles, 0.0), mode)
+        score = np.where(
+            time <= 10, 10.0,
+            np.where(time >= 60, 0.0, round_like_python(10 * (1 - (time - 10) / 50), 2))
+        )
+
+        if total is None:
+            total = np.zeros(miles.shape)
+            count = np.zeros(miles.shape)
+        total = total + np.where(present, score, 0.0)
+        count = count + present
+
+    if total is None or np.any(count == 0):
+        raise ValueError("No valid transportation modes provided.")
+
+    return round_like_python(total / count, 2)
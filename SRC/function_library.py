@@ -6,6 +6,10 @@ from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderServiceError, GeocoderTimedOut
 from geopy.distance import geodesic
 
+# Persistent cache so already-resolved addresses skip the network
+from geocode_cache import GeocodeCache
+from single_flight import NegativeCache, SingleFlight
+
 #simple
 
 def validate_rental_address(address):
@@ -143,6 +147,32 @@ def format_address(address: str) -> str:
 
         return clean_address
 
+# Key identifying a stored listing (CSV tombstones, storage backends, record store)
+def address_key(address) -> str:
+        """
+        Normalize an address into the key listings are matched on.
+
+        Like format_address(), but never raises: values it rejects are only
+        stripped, so every stored row still gets a key.
+
+        Args:
+            address: The listing's address (any value).
+
+        Returns:
+            str: The formatted address, or the stripped text when it cannot be formatted.
+
+        Examples:
+                >>> address_key(" 4500  knox rd ")
+                '4500 Knox Rd'
+                >>> address_key("")
+                ''
+        """
+        address = str(address)
+        try:
+            return format_address(address)
+        except (TypeError, ValueError):
+            return address.strip()
+
 # fromat listing title 
 def format_listing_title(title: str) -> str:
          """
@@ -427,6 +457,14 @@ def calculate_price_score(price: float, average_price: float) -> float:
 # Produces a normalized score (higher = safer).  
 # def calculate_safety_score(crime_rate: float, avg_crime_rate: float)
 
+# Average travel speeds (mph) used for every commute estimate
+COMMUTE_SPEEDS_MPH = {
+     'walk': 3,    # Average walking speed in mph
+     'bike': 10,   # Average biking speed in mph
+     'drive': 25,  # Average driving speed in College Park
+     'bus': 15     # Average bus speed in mph in College Park
+}
+
 # Converts miles → estimated minutes based on travel mode (“walk”, “bike”, “drive”, “bus”).
 def calculate_commute_time(distance: float, mode: str) -> float:
      """
@@ -453,13 +491,7 @@ def calculate_commute_time(distance: float, mode: str) -> float:
      if distance < 0:
           raise ValueError("Distance cannot be negative.")
 
-     
-     speeds = {
-     'walk': 3,    # Average walking speed in mph}
-     'bike': 10,   # Average biking speed in mph
-     'drive': 25,  # Average driving speed in College Park
-     'bus': 15     # Average bus speed in mph in College Park
-     }
+     speeds = COMMUTE_SPEEDS_MPH
      
      mode = mode.lower()
      if mode not in speeds:
@@ -468,6 +500,36 @@ def calculate_commute_time(distance: float, mode: str) -> float:
      time_minutes = round((distance / speeds[mode]) * 60, 2)
      
      return time_minutes
+
+# Estimate commute time for several travel modes from one distance
+def calculate_commute_times(distance: float, modes: list[str] | None = None) -> dict:
+     """
+     Estimate commute time in minutes for every travel mode at once.
+
+     The distance only has to be computed (or geocoded) once; each mode's time
+     matches calculate_commute_time(distance, mode) exactly.
+
+     Args:
+          distance (float): Distance in miles.
+          modes (list[str] | None): Modes to include. Default is every mode in COMMUTE_SPEEDS_MPH.
+
+     Returns:
+          dict: Mode -> estimated minutes.
+
+     Raises:
+          ValueError: If distance is negative or a mode is unknown.
+
+     Examples:
+          >>> calculate_commute_times(1.2)
+          {'walk': 24.0, 'bike': 7.2, 'drive': 2.88, 'bus': 4.8}
+          >>> calculate_commute_times(3, ["drive"])
+          {'drive': 7.2}
+     """
+     if distance < 0:
+          raise ValueError("Distance cannot be negative.")
+
+     selected = COMMUTE_SPEEDS_MPH if modes is None else [mode.lower() for mode in modes]
+     return {mode: calculate_commute_time(distance, mode) for mode in selected}
    
 # Calculate distance
 def calculate_distance(start_address: str, end_address: str) -> float:
@@ -661,6 +723,11 @@ def get_property_coordinates(address: str) -> tuple:
      """
      Get the latitude and longitude coordinates for a given address using geopy.
      Uses the Nominatim geocoding service to convert a formatted address into geographic coordinates.
+     Results are stored in the persistent geocode cache, so an address is only
+     sent to Nominatim again once its cache entry expires or is invalidated.
+     Concurrent calls for the same address share a single lookup, and
+     addresses that could not be found are remembered for a few minutes.
+     Campus buildings (ESJ, HBK, ...) come from a built-in table with no lookup.
 
      Args:
           address (str): The rental address to geocode.
@@ -693,15 +760,290 @@ def get_property_coordinates(address: str) -> tuple:
      if not clean_address:
           raise ValueError("Address cannot be empty.")
      
-     # Initialize Nominatim geocoder
-     geolocator = Nominatim(user_agent="rental_hunters")
+     cache = get_geocode_cache()
+     known = known_coordinates(clean_address, cache)
+     if known is not None:
+          return known
+     return lookup_coordinates(clean_address, cache)
+
+def known_coordinates(clean_address: str, cache):
+     """
+     Coordinates of a formatted address that need no backend lookup.
+
+     Checks the campus destination table, then the geocode cache. Addresses
+     that failed recently re-raise their error instead of being looked up again.
+
+     Args:
+          clean_address (str): Address produced by format_address().
+          cache (GeocodeCache | None): Active cache (None skips it).
+
+     Returns:
+          tuple[float, float] | None: (latitude, longitude), or None if a lookup is needed.
+
+     Raises:
+          ValueError, ConnectionError: The remembered error of a recent failed lookup.
+     """
+     # Campus buildings and other known destinations never need a lookup
+     known = get_destination_table().lookup(clean_address)
+     if known is not None:
+          return known
+
+     # Reuse coordinates resolved in an earlier run
+     if cache is not None:
+          cached = cache.get(clean_address)
+          if cached is not None:
+               return cached
+
+     # Addresses that failed recently fail fast instead of hitting the backend again
+     recent_failure = _failed_geocodes.get(clean_address)
+     if recent_failure is not None:
+          raise recent_failure
+     return None
+
+def lookup_coordinates(clean_address: str, cache, backend=None) -> tuple:
+     """
+     Look up a formatted address on the backend, sharing the lookup with
+     concurrent callers for the same address (see known_coordinates() first).
+
+     Args:
+          clean_address (str): Address produced by format_address().
+          cache (GeocodeCache | None): Cache the result is stored in (None skips it).
+          backend (callable | None): Lookup to use (default: get_geocoder_backend()).
+
+     Returns:
+          tuple[float, float]: (latitude, longitude).
+
+     Raises:
+          ValueError: If the address could not be geocoded (remembered for a few minutes).
+          ConnectionError: If the geocoding service failed.
+     """
+     return _geocode_flight.do(clean_address, lambda: _lookup_coordinates(clean_address, cache, backend))
+
+def _lookup_coordinates(clean_address: str, cache, backend=None) -> tuple:
+     """Run one backend lookup, then record the result in the cache or negative cache."""
+
+     # Configured backend (gazetteer, rate-limited BatchGeocoder, ...) or plain Nominatim
+     backend = backend or get_geocoder_backend()
 
      try:
-          location = geolocator.geocode(clean_address, timeout = 10)
+          coordinates = backend(clean_address)
      except (GeocoderServiceError, GeocoderTimedOut) as e:
           raise ConnectionError(f"Geocoding service error: {e}")
      
-     if location is None:
-          raise ValueError("Could not provide coordinates for the provided address.")
+     if coordinates is None:
+          error = ValueError("Could not provide coordinates for the provided address.")
+          _failed_geocodes.add(clean_address, error)
+          raise error
      
+     return store_geocode(cache, clean_address, coordinates)
+
+class ApproximateCoordinates(tuple):
+     """
+     (latitude, longitude) from a fuzzy match (e.g. a street centroid).
+
+     Backends return this instead of a plain tuple when the point is only an
+     estimate, so it is cached for APPROXIMATE_GEOCODE_TTL instead of the
+     full cache lifetime.
+     """
+     __slots__ = ()
+
+# Fuzzy geocodes are retried after an hour instead of being trusted for 30 days
+APPROXIMATE_GEOCODE_TTL = 3600
+
+def store_geocode(cache, clean_address: str, coordinates: tuple) -> tuple:
+     """
+     Record a backend result in the geocode cache and return it as a plain tuple.
+
+     Approximate results (ApproximateCoordinates) expire after APPROXIMATE_GEOCODE_TTL.
+
+     Args:
+          cache (GeocodeCache | None): Active cache (None skips caching).
+          clean_address (str): Address produced by format_address().
+          coordinates (tuple[float, float]): (latitude, longitude) from a backend.
+
+     Returns:
+          tuple[float, float]: (latitude, longitude).
+     """
+     approximate = isinstance(coordinates, ApproximateCoordinates)
+     coordinates = (coordinates[0], coordinates[1])
+     if cache is not None:
+          cache.set(clean_address, coordinates,
+                    ttl_seconds=APPROXIMATE_GEOCODE_TTL if approximate else None)
+     return coordinates
+
+
+# Geocoder + cache configuration
+# One Nominatim client and one cache are shared by Coordinates, RentalProperty and Commute
+GEOCODE_CACHE_PATH = "geocode_cache.db"
+
+_geolocator = None
+_geocoder_backend = None
+_geocoder_backend_checked = False
+_geocode_cache = None
+_geocode_cache_enabled = True
+_destination_table = None
+
+# In-flight request coalescing + short-lived memory of addresses that could not be geocoded
+NEGATIVE_CACHE_TTL = 300
+_geocode_flight = SingleFlight()
+_failed_geocodes = NegativeCache(NEGATIVE_CACHE_TTL)
+
+def _get_geolocator():
+     """Return the shared Nominatim client, creating it on first use."""
+     global _geolocator
+     if _geolocator is None:
+          _geolocator = Nominatim(user_agent="rental_hunters")
+     return _geolocator
+
+def nominatim_geocode(clean_address: str, geolocator=None, timeout: float = 10):
+     """
+     Look up one already-formatted address with a Nominatim client.
+
+     This is the raw network call with no caching, rate limiting or retries.
+
+     Args:
+          clean_address (str): Address produced by format_address().
+          geolocator (Nominatim | None): Client to use (default: the shared one).
+          timeout (float): Request timeout in seconds.
+
+     Returns:
+          tuple[float, float] | None: (latitude, longitude), or None if not found.
+
+     Raises:
+          GeocoderTimedOut, GeocoderServiceError: If the geocoding service fails.
+     """
+     location = (geolocator or _get_geolocator()).geocode(clean_address, timeout = timeout)
+     if location is None:
+          return None
      return (location.latitude, location.longitude)
+
+def set_geocoder_backend(backend) -> None:
+     """
+     Replace the lookup used by get_property_coordinates on a cache miss.
+
+     Args:
+          backend (callable | None): Takes a formatted address and returns
+               (latitude, longitude) or None, e.g. a GeocoderBackend or a
+               BatchGeocoder. It may raise GeocoderTimedOut or
+               GeocoderServiceError. None restores the plain Nominatim lookup.
+
+     Examples:
+          >>> set_geocoder_backend(GazetteerBackend("address_points.csv"))
+          >>> set_geocoder_backend(BatchGeocoder(rate_per_second=1.0))
+     """
+     global _geocoder_backend, _geocoder_backend_checked
+     _geocoder_backend = backend
+     _geocoder_backend_checked = True
+
+def get_geocoder_backend():
+     """
+     Return the lookup currently used on a cache miss.
+
+     If no backend was set explicitly, the RENTAL_HUNTERS_GEOCODER environment
+     variable is checked once (see geocoder_backends.backend_from_environment).
+     """
+     global _geocoder_backend, _geocoder_backend_checked
+     if not _geocoder_backend_checked:
+          from geocoder_backends import backend_from_environment
+          _geocoder_backend = backend_from_environment()
+          _geocoder_backend_checked = True
+     return _geocoder_backend or nominatim_geocode
+
+def configure_geocode_cache(path: str = GEOCODE_CACHE_PATH, ttl_seconds: float = 30 * 24 * 3600,
+                            max_entries: int = 50000, enabled: bool = True):
+     """
+     Configure the persistent geocode cache used by get_property_coordinates.
+
+     Args:
+          path (str): SQLite file for the cache (":memory:" for a throwaway cache).
+          ttl_seconds (float): How long a cached address stays valid.
+          max_entries (int): Maximum number of cached addresses.
+          enabled (bool): False turns caching off entirely.
+
+     Returns:
+          GeocodeCache | None: The active cache, or None when disabled.
+
+     Examples:
+          >>> print(configure_geocode_cache(":memory:", ttl_seconds=3600))
+          GeocodeCache(:memory:, 0 entries)
+     """
+     global _geocode_cache, _geocode_cache_enabled
+
+     if _geocode_cache is not None:
+          _geocode_cache.close()
+
+     _geocode_cache_enabled = enabled
+     _geocode_cache = GeocodeCache(path, ttl_seconds, max_entries) if enabled else None
+     return _geocode_cache
+
+def get_geocode_cache():
+     """
+     Return the active geocode cache, opening the default one on first use.
+
+     Returns:
+          GeocodeCache | None: The active cache, or None when caching is disabled.
+     """
+     global _geocode_cache
+     if _geocode_cache is None and _geocode_cache_enabled:
+          _geocode_cache = GeocodeCache(GEOCODE_CACHE_PATH)
+     return _geocode_cache
+
+def invalidate_cached_coordinates(address: str | None = None) -> int:
+     """
+     Drop a cached geocode (or remembered failure) so the next lookup hits the geocoder again.
+
+     Args:
+          address (str | None): Address to invalidate. None clears the whole cache.
+
+     Returns:
+          int: Number of cache entries removed.
+
+     Examples:
+          >>> invalidate_cached_coordinates("7303 baltimore ave, college park, md")
+          1
+     """
+     key = format_address(address) if address is not None else None
+     _failed_geocodes.discard(key)
+
+     cache = get_geocode_cache()
+     if cache is None:
+          return 0
+     return cache.invalidate(key)
+
+def get_destination_table():
+     """
+     Return the table of known destinations checked before any geocoding.
+
+     Defaults to the built-in campus buildings (see campus_locations.py).
+
+     Returns:
+          DestinationTable: The active destination table.
+     """
+     global _destination_table
+     if _destination_table is None:
+          from campus_locations import DestinationTable
+          _destination_table = DestinationTable.campus()
+     return _destination_table
+
+def set_destination_table(table) -> None:
+     """
+     Replace the known-destination table (None restores the campus default).
+
+     Examples:
+          >>> set_destination_table(DestinationTable.from_csv("destinations.csv"))
+     """
+     global _destination_table
+     _destination_table = table
+
+def configure_negative_cache(ttl_seconds: float = NEGATIVE_CACHE_TTL) -> None:
+     """
+     Set how long an address that could not be geocoded is remembered as failed.
+
+     Args:
+          ttl_seconds (float): Seconds before a failed address is retried.
+
+     Examples:
+          >>> configure_negative_cache(60)
+     """
+     global _failed_geocodes
+     _failed_geocodes = NegativeCache(ttl_seconds)
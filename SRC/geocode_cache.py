@@ -0,0 +1,209 @@
+# Persistent on-disk cache for geocoded addresses.
+#
+# Geocoding is by far the slowest step in the system: every lookup is a
+# network round-trip to Nominatim. Saved listings are reloaded and
+# re-scored often, so the same addresses are looked up again and again.
+#
+# This class stores (latitude, longitude) results in a small SQLite file
+# keyed by the format_address()-normalized address. Entries expire after a
+# configurable TTL and the table is kept under a maximum size by evicting
+# the least recently used rows.
+
+import sqlite3
+import threading
+import time
+
+
+class GeocodeCache:
+    """SQLite-backed cache of address -> (latitude, longitude).
+
+    Example:
+        cache = GeocodeCache("geocode_cache.db")
+        cache.set("7303 Baltimore Ave, College Park, MD", (38.97, -76.93))
+        cache.get("7303 Baltimore Ave, College Park, MD")
+        (38.97, -76.93)
+    """
+
+    def __init__(self, path: str = "geocode_cache.db", ttl_seconds: float = 30 * 24 * 3600,
+                 max_entries: int = 50000, clock=time.time):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): SQLite file path. Use ":memory:" for a throwaway cache.
+            ttl_seconds (float): How long an entry stays valid. Default is 30 days.
+            max_entries (int): Maximum number of rows kept before the least
+                recently used ones are evicted.
+            clock (callable): Returns the current time in seconds (injectable for tests).
+
+        Raises:
+            ValueError: If ttl_seconds or max_entries is not positive.
+        """
+        if ttl_seconds <= 0:
+            raise ValueError("Cache TTL must be positive.")
+        if max_entries <= 0:
+            raise ValueError("Cache size must be positive.")
+
+        self._path = str(path)
+        self._ttl = float(ttl_seconds)
+        self._max_entries = int(max_entries)
+        self._clock = clock
+
+        # One shared connection guarded by a lock so the cache can be used
+        # from worker threads (batch geocoding).
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS geocodes (
+                    address     TEXT PRIMARY KEY,
+                    latitude    REAL NOT NULL,
+                    longitude   REAL NOT NULL,
+                    expires_at  REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_geocodes_accessed ON geocodes (accessed_at)"
+            )
+            # Running row count, so set() does not count the table every time
+            (self._count,) = self._conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()
+
+    # ----------
+    # Lookups
+    # ----------
+
+    def get(self, address: str):
+        """
+        Return cached coordinates for an address, or None on a miss.
+
+        Expired entries count as a miss and are removed.
+
+        Args:
+            address (str): Normalized address key.
+
+        Returns:
+            tuple[float, float] | None: Cached (latitude, longitude).
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latitude, longitude, expires_at FROM geocodes WHERE address = ?",
+                (address,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            latitude, longitude, expires_at = row
+            with self._conn:
+                if expires_at <= now:
+                    cursor = self._conn.execute("DELETE FROM geocodes WHERE address = ?", (address,))
+                    self._count -= cursor.rowcount
+                    return None
+                self._conn.execute(
+                    "UPDATE geocodes SET accessed_at = ? WHERE address = ?", (now, address)
+                )
+
+        return (latitude, longitude)
+
+    def set(self, address: str, coordinates: tuple, ttl_seconds: float | None = None) -> None:
+        """
+        Store coordinates for an address and evict old rows if the cache is full.
+
+        Args:
+            address (str): Normalized address key.
+            coordinates (tuple[float, float]): (latitude, longitude).
+            ttl_seconds (float | None): Lifetime of this entry (default: the cache TTL).
+        """
+        latitude, longitude = coordinates
+        ttl = self._ttl if ttl_seconds is None else min(float(ttl_seconds), self._ttl)
+        now = self._clock()
+        with self._lock, self._conn:
+            known = self._conn.execute(
+                "SELECT 1 FROM geocodes WHERE address = ?", (address,)
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO geocodes (address, latitude, longitude, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (address, float(latitude), float(longitude), now + ttl, now)
+            )
+            if known is None:
+                self._count += 1
+                if self._count > self._max_entries:
+                    self._evict()
+
+    # ----------
+    # Invalidation / maintenance
+    # ----------
+
+    def invalidate(self, address: str | None = None) -> int:
+        """
+        Remove one cached address, or every entry when no address is given.
+
+        Args:
+            address (str | None): Normalized address key to drop.
+
+        Returns:
+            int: Number of rows removed.
+        """
+        with self._lock, self._conn:
+            if address is None:
+                cursor = self._conn.execute("DELETE FROM geocodes")
+            else:
+                cursor = self._conn.execute("DELETE FROM geocodes WHERE address = ?", (address,))
+            self._count -= cursor.rowcount
+        return cursor.rowcount
+
+    def purge_expired(self) -> int:
+        """
+        Remove every expired entry.
+
+        Returns:
+            int: Number of rows removed.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM geocodes WHERE expires_at <= ?", (self._clock(),)
+            )
+            self._count -= cursor.rowcount
+        return cursor.rowcount
+
+    def _evict(self) -> None:
+        """
+        Drop the least recently used rows above max_entries (caller holds the lock).
+
+        Only called once the running count passes the limit; the table is
+        counted again here in case another process shares the file.
+        """
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()
+        overflow = self._count - self._max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                """
+                DELETE FROM geocodes WHERE address IN (
+                    SELECT address FROM geocodes ORDER BY accessed_at ASC LIMIT ?
+                )
+                """,
+                (overflow,)
+            )
+            self._count -= cursor.rowcount
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        """Return the number of stored entries (including not-yet-purged expired ones)."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()
+        return count
+
+    def __str__(self) -> str:
+        """Readable summary for debugging."""
+        return f"GeocodeCache({self._path}, {len(self)} entries)"
@@ -0,0 +1,301 @@
+# Pluggable geocoder backends for get_property_coordinates().
+#
+# A backend turns one formatted address into (latitude, longitude), or
+# None when the address is unknown. The geocoding layer (cache, batch
+# queue, Coordinates) only depends on this small interface, so the live
+# Nominatim service can be swapped for an offline lookup.
+#
+# Backends:
+# - NominatimBackend: live OpenStreetMap geocoding through geopy
+# - GazetteerBackend: offline lookup in a local CSV of address points
+#
+# The active backend is chosen with configure_geocoder(), or through the
+# RENTAL_HUNTERS_GEOCODER / RENTAL_HUNTERS_GAZETTEER environment variables.
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from pathlib import Path
+import csv
+import math
+import os
+import re
+
+from geopy.geocoders import Nominatim
+
+from function_library import (ApproximateCoordinates, format_address, nominatim_geocode,
+                              set_geocoder_backend)
+
+
+class GeocoderBackend(ABC):
+    """
+    Abstract base class for address -> coordinates lookups.
+
+    Subclasses implement geocode(). Instances are callable, so any backend
+    can be passed to set_geocoder_backend() or wrapped in a BatchGeocoder.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def geocode(self, clean_address: str):
+        """
+        Look up one formatted address.
+
+        Args:
+            clean_address (str): Address produced by format_address().
+
+        Returns:
+            tuple[float, float] | None: (latitude, longitude), or None if not found.
+        """
+        pass
+
+    def __call__(self, clean_address: str):
+        """Allow the backend to be used anywhere a lookup function is expected."""
+        return self.geocode(clean_address)
+
+    def __str__(self):
+        return f"{type(self).__name__}()"
+
+
+# ------------------
+# Live Nominatim
+# ------------------
+class NominatimBackend(GeocoderBackend):
+    """Live geocoding through the Nominatim service (network required)."""
+
+    name = "nominatim"
+
+    def __init__(self, user_agent: str = "rental_hunters", timeout: float = 10,
+                 domain: str | None = None, scheme: str | None = None):
+        """
+        Args:
+            user_agent (str): User agent sent to Nominatim.
+            timeout (float): Request timeout in seconds.
+            domain (str | None): Alternate Nominatim host (e.g. a self-hosted instance).
+            scheme (str | None): "http" or "https" for the alternate host.
+        """
+        options = {"user_agent": user_agent}
+        if domain:
+            options["domain"] = domain
+        if scheme:
+            options["scheme"] = scheme
+        self._geolocator = Nominatim(**options)
+        self._timeout = timeout
+
+    def geocode(self, clean_address: str):
+        """Look up one address on Nominatim (raises geopy errors on service failure)."""
+        return nominatim_geocode(clean_address, self._geolocator, self._timeout)
+
+
+# ------------------
+# Offline gazetteer
+# ------------------
+class GazetteerBackend(GeocoderBackend):
+    """
+    Offline geocoding from a local address-point file.
+
+    The CSV needs an address column and latitude/longitude columns
+    ("lat"/"lon" or "latitude"/"longitude"). Addresses are indexed by their
+    format_address() form. Lookups that miss an exact match fall back to:
+        1. the street line (text before the first comma),
+        2. the only indexed address starting with the query,
+        3. the centroid of every point on the same street (house number ignored).
+    Fallbacks only use points in the query's city or ZIP code; when the
+    query names neither, the candidates must all lie in one city. Ambiguous
+    matches return None, and fallback hits are ApproximateCoordinates, so
+    they are only cached briefly.
+
+    Example:
+        backend = GazetteerBackend("address_points.csv")
+        backend.geocode("4500 Knox Rd, College Park, MD")
+        (38.9817, -76.9388)
+    """
+
+    name = "gazetteer"
+
+    LATITUDE_COLUMNS = ("lat", "latitude")
+    LONGITUDE_COLUMNS = ("lon", "lng", "longitude")
+
+    # Splits "4500 Knox Rd" into house number and street name
+    _HOUSE_NUMBER = re.compile(r"^\d+[A-Za-z]?\s+")
+    _ZIPCODE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+    def __init__(self, path: str, max_centroid_spread_miles: float = 1.0):
+        """
+        Load the address points into memory.
+
+        Args:
+            path (str): CSV file of address, lat, lon rows.
+            max_centroid_spread_miles (float): Street centroids are rejected
+                when the street's points lie further apart than this.
+
+        Raises:
+            ValueError: If the file is missing, has no usable columns, or
+                contains a row with invalid coordinates.
+        """
+        file_path = Path(path)
+        if not file_path.exists():
+            raise ValueError(f"Gazetteer file not found: {path}")
+
+        self._path = str(path)
+        self._max_spread = float(max_centroid_spread_miles)
+        self._exact = {}          # full address -> coordinates
+        self._streets = {}        # "4500 Knox Rd" -> list of (place, coordinates)
+        self._street_points = {}  # "Knox Rd" -> list of (place, coordinates)
+
+        with file_path.open(newline="", encoding="utf-8") as file:
+            reader = csv.DictReader(file)
+            columns = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+
+            address_col = columns.get("address")
+            lat_col = next((columns[c] for c in self.LATITUDE_COLUMNS if c in columns), None)
+            lon_col = next((columns[c] for c in self.LONGITUDE_COLUMNS if c in columns), None)
+            if not (address_col and lat_col and lon_col):
+                raise ValueError("Gazetteer CSV needs address, lat and lon columns.")
+
+            for line_number, row in enumerate(reader, start=2):
+                try:
+                    coordinates = (float(row[lat_col]), float(row[lon_col]))
+                    key = format_address(row[address_col])
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid gazetteer row on line {line_number}.")
+                self._add(key, coordinates)
+
+        # Sorted keys make prefix lookups a binary search
+        self._sorted_keys = sorted(self._exact)
+
+    @classmethod
+    def _place(cls, address: str) -> tuple:
+        """(city, ZIP) of a formatted address; either may be None."""
+        parts = [part.strip() for part in address.split(",")]
+        city = parts[1].lower() if len(parts) > 1 and parts[1] else None
+        match = cls._ZIPCODE.search(",".join(parts[1:]))
+        return (city, match.group(1) if match else None)
+
+    @staticmethod
+    def _same_place(query: tuple, candidate: tuple) -> bool:
+        """True if a candidate point can belong to the query's city/ZIP."""
+        query_city, query_zip = query
+        city, zipcode = candidate
+        if query_zip and zipcode:
+            return query_zip == zipcode
+        if query_city and city:
+            return query_city == city
+        return not (query_city or query_zip)
+
+    def _candidates(self, entries: list, place: tuple) -> list:
+        """
+        Coordinates of entries in the query's place, or [] if they span several
+        cities (a query without city/ZIP only matches an unambiguous street).
+        """
+        matches = [(candidate, point) for candidate, point in entries if self._same_place(place, candidate)]
+        if len({candidate[0] or candidate[1] for candidate, _ in matches}) > 1:
+            return []
+        return [point for _, point in matches]
+
+    def _add(self, key: str, coordinates: tuple) -> None:
+        """Index one address point under its full, street-line and street-name keys."""
+        self._exact[key] = coordinates
+        place = self._place(key)
+
+        street_line = key.split(",")[0].strip()
+        self._streets.setdefault(street_line, []).append((place, coordinates))
+
+        street_name = self._HOUSE_NUMBER.sub("", street_line)
+        self._street_points.setdefault(street_name, []).append((place, coordinates))
+
+    def geocode(self, clean_address: str):
+        """Look up an address in the gazetteer, using partial-match fallbacks."""
+        if clean_address in self._exact:
+            return self._exact[clean_address]
+
+        place = self._place(clean_address)
+        street_line = clean_address.split(",")[0].strip()
+        points = set(self._candidates(self._streets.get(street_line, []), place))
+        if len(points) == 1:
+            return ApproximateCoordinates(points.pop())
+        if points:
+            return None  # same house number on the street, several different points
+
+        index = bisect_left(self._sorted_keys, clean_address)
+        matches = self._sorted_keys[index:index + 2]
+        if matches and matches[0].startswith(clean_address):
+            if len(matches) > 1 and matches[1].startswith(clean_address):
+                return None  # more than one address completes the query
+            return ApproximateCoordinates(self._exact[matches[0]])
+
+        points = self._candidates(self._street_points.get(self._HOUSE_NUMBER.sub("", street_line), []), place)
+        if not points:
+            return None
+        latitude = sum(p[0] for p in points) / len(points)
+        longitude = sum(p[1] for p in points) / len(points)
+
+        # A street name shared by far-apart segments has no meaningful centroid
+        spread_lat = (max(p[0] for p in points) - min(p[0] for p in points)) * 69.0
+        spread_lon = ((max(p[1] for p in points) - min(p[1] for p in points))
+                      * 69.0 * math.cos(math.radians(latitude)))
+        if math.hypot(spread_lat, spread_lon) > self._max_spread:
+            return None
+        return ApproximateCoordinates((latitude, longitude))
+
+    def __len__(self):
+        """Return the number of indexed address points."""
+        return len(self._exact)
+
+    def __str__(self):
+        return f"GazetteerBackend({self._path}, {len(self)} addresses)"
+
+
+# ------------------
+# Configuration
+# ------------------
+GEOCODER_BACKENDS = {
+    NominatimBackend.name: NominatimBackend,
+    GazetteerBackend.name: GazetteerBackend,
+}
+
+def create_backend(name: str, **options) -> GeocoderBackend:
+    """
+    Build a backend by name.
+
+    Args:
+        name (str): "nominatim" or "gazetteer".
+        **options: Passed to the backend constructor (e.g. path="points.csv").
+
+    Returns:
+        GeocoderBackend: The new backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    key = name.strip().lower()
+    if key not in GEOCODER_BACKENDS:
+        raise ValueError(f"Unknown geocoder backend: {name}. Choose from {', '.join(GEOCODER_BACKENDS)}.")
+    return GEOCODER_BACKENDS[key](**options)
+
+def configure_geocoder(name: str, **options) -> GeocoderBackend:
+    """
+    Select the backend used by get_property_coordinates().
+
+    Example:
+        configure_geocoder("gazetteer", path="address_points.csv")
+    """
+    backend = create_backend(name, **options)
+    set_geocoder_backend(backend)
+    return backend
+
+def backend_from_environment():
+    """
+    Build the backend named by RENTAL_HUNTERS_GEOCODER, if set.
+
+    RENTAL_HUNTERS_GAZETTEER gives the CSV path for the gazetteer backend.
+
+    Returns:
+        GeocoderBackend | None: The configured backend, or None when unset.
+    """
+    name = os.environ.get("RENTAL_HUNTERS_GEOCODER", "").strip()
+    if not name:
+        return None
+    if name.lower() == GazetteerBackend.name:
+        return create_backend(name, path=os.environ.get("RENTAL_HUNTERS_GAZETTEER", "address_points.csv"))
+    return create_backend(name)
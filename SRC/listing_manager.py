@@ -3,12 +3,28 @@
 # - Storing multiple rental properties
 # - Validating incoming data
 # - Exporting/importing listings to/from CSV files
+#   (full rewrites with save_to_csv, append-only incremental saves with flush,
+#   and deletes recorded as tombstones in a "<file>.tombstones" side log)
+# - Optionally persisting to a database backend (storage.SQLiteStore), with
+#   CSV files used for import/export
+# - Saving/loading columnar NumPy snapshots (snapshot.Snapshot) for fast bulk I/O
+# - Keeping a memory-mapped record store (record_store.RecordStore) in step
+#   with adds, deletes and rescores, for random access to single saved
+#   listings by number or address
 # - Supporting full system workflows (Phase 5)
 
 from pathlib import Path
 import csv
+import os
 from property import Property
 from rental_property import RentalProperty
+from spatial_index import GridIndex
+from ranking import SortedIndex, top_k
+from market_stats import MarketAverages
+from storage import ListingStore
+from snapshot import Snapshot, save_snapshot
+from record_store import RecordStore
+from function_library import address_key, get_property_coordinates
 import json
 
 class PropertyManager:
@@ -17,14 +33,66 @@ class PropertyManager:
     Handles data storage, validation, and formatted retrieval of property information.
     """
 
-    def __init__(self):
+    def __init__(self, compact_fraction: float = 0.3, storage: ListingStore | None = None,
+                 records: RecordStore | None = None):
         """
         Initializes an empty property manager.
 
+        Args:
+            compact_fraction (float): Fraction of deleted (tombstoned) rows in the
+                saved CSV at which compaction_due turns True (see compact_if_due()).
+            storage (ListingStore | None): Database backend. When given, flush()
+                without a filename writes to it instead of a CSV file.
+            records (RecordStore | None): Open record store kept in step with this
+                manager: added listings are appended, removed ones flagged deleted
+                and rescored ones get their score overwritten in place. Listings
+                loaded from CSV, storage or snapshots are not copied into it.
+
         Attributes:
             _properties (list[dict]): Internal list storing property listings.
+            _spatial_index (GridIndex): Listings with coordinates, for location queries.
+            _score_index (SortedIndex): Listings by overall score, best first.
+            _rent_index (SortedIndex): Listings by rent, cheapest first.
+            _market (MarketAverages): Running rent statistics per (ZIP, property type).
+            _csv_path (str | None): File last loaded or saved; flush() target.
+            _unsaved (list[dict]): Listings added since the last save or flush.
+            _row_numbers (dict): id(listing) -> (listing, data row number in the saved CSV);
+                the entry keeps the listing, so a reused id() never matches it.
+            _rows_on_disk (int): Data rows in the saved CSV, deleted ones included.
+            _dead_rows (int): Tombstoned rows still in the saved CSV.
+            _pending_tombstones (list[tuple]): Deletes not written yet, as (row, key).
+            _storage (ListingStore | None): Database backend.
+            _storage_ids (dict): id(listing) -> (listing, id in the storage backend).
+            _storage_deletes (list[int]): Storage ids of removed listings not deleted yet.
+            _storage_updates (dict): id(listing) -> listing, for stored listings
+                changed in place (rescored) and not written back yet.
+            _records (RecordStore | None): Attached record store.
+            _record_numbers (dict): id(listing) -> (listing, record number in _records).
+            _unlocated (dict): id(listing) -> (listing, rental) for rentals added
+                before their (lazy) coordinates were resolved.
         """
+        if not 0 < compact_fraction <= 1:
+            raise ValueError("Compaction fraction must be between 0 and 1.")
+
         self._properties = []
+        self._spatial_index = GridIndex()
+        self._score_index = SortedIndex(self._listing_score)
+        self._rent_index = SortedIndex(self._listing_rent, descending=False)
+        self._market = MarketAverages(source=self._market_rents)
+        self._csv_path = None
+        self._unsaved = []
+        self._compact_fraction = float(compact_fraction)
+        self._row_numbers = {}
+        self._rows_on_disk = 0
+        self._dead_rows = 0
+        self._pending_tombstones = []
+        self._storage = storage
+        self._storage_ids = {}
+        self._storage_deletes = []
+        self._storage_updates = {}
+        self._records = records
+        self._record_numbers = {}
+        self._unlocated = {}
 
     # ----------
     # Validation helpers
@@ -146,7 +214,7 @@ class PropertyManager:
             "Property Type": property_type.title()
         }
 
-        self._properties.append(listing)
+        self._store(listing)
         return listing
 
     def add_property_object(self, property_obj):
@@ -159,25 +227,190 @@ class PropertyManager:
         # Case 1: RentalProperty
         if hasattr(property_obj, "property_type_obj"):
             listing_dict = property_obj.property_type_obj.to_dict()
-            self._properties.append(listing_dict)
+            self._store(listing_dict)
             return listing_dict
 
         # Case 2: Raw Property subclass
         if isinstance(property_obj, Property):
             listing_dict = property_obj.to_dict()
-            self._properties.append(listing_dict)
+            self._store(listing_dict)
             return listing_dict
         
         raise TypeError("Object must be a Property or RentalProperty instance")
 
-    def list_properties(self) -> list[dict]:
+    def remove_property(self, index: int) -> dict:
+        """
+        Removes a stored listing by its position in list_properties().
+
+        Args:
+            index (int): Position of the listing (0-based).
+
+        Returns:
+            dict: The removed listing.
+
+        Raises:
+            IndexError: If index is out of range.
+        """
+        if not 0 <= index < len(self._properties):
+            raise IndexError("Listing index out of range.")
+
+        listing = self._properties.pop(index)
+        self._spatial_index.remove(listing)
+        self._unlocated.pop(id(listing), None)
+        self._score_index.remove(listing)
+        self._rent_index.remove(listing)
+        self._update_market(listing, removed=True)
+
+        record_number = self._record_number(listing)
+        if record_number is not None:
+            del self._record_numbers[id(listing)]
+            self._records.delete(record_number)
+
+        pending = next((i for i, row in enumerate(self._unsaved) if row is listing), None)
+        if pending is not None:
+            del self._unsaved[pending]  # never written, nothing to undo on disk
+        else:
+            row_number = self._row_number(listing)
+            if row_number is not None:
+                del self._row_numbers[id(listing)]
+                self._pending_tombstones.append((row_number, self.listing_key(listing)))
+            storage_id = self._storage_id(listing)
+            if storage_id is not None:
+                del self._storage_ids[id(listing)]
+                self._storage_updates.pop(id(listing), None)
+                self._storage_deletes.append(storage_id)
+        return listing
+
+    @staticmethod
+    def listing_key(listing: dict) -> str:
+        """
+        Returns the key identifying a listing: its normalized address.
+
+        Example:
+            PropertyManager.listing_key({"Address": " 4500  knox rd "})
+            '4500 Knox Rd'
+        """
+        return address_key(listing.get("Address", ""))
+
+    def delete(self, key: str) -> int:
+        """
+        Deletes every stored listing with the given address key.
+
+        Saved rows are not rewritten: the next flush() appends one tombstone
+        per deleted row to the side log, and rows with tombstones are skipped
+        on read until the file is compacted.
+
+        Args:
+            key (str): Address of the listing (normalized like listing_key()).
+
+        Returns:
+            int: Number of listings deleted.
+
+        Example:
+            manager.delete("4500 Knox Rd, College Park, MD")
+            manager.flush()
+        """
+        wanted = self.listing_key({"Address": key})
+        positions = [i for i, listing in enumerate(self._properties) if self.listing_key(listing) == wanted]
+        for index in reversed(positions):
+            self.remove_property(index)
+        return len(positions)
+
+    def _store(self, listing: dict, unsaved: bool = True, record: bool = True) -> None:
+        """
+        Appends a listing and adds it to every index.
+
+        Unsaved listings are appended to the attached record store too, unless
+        record is False (the caller appends once the listing is complete).
+        """
+        self._properties.append(listing)
+        if unsaved:
+            self._unsaved.append(listing)
+        self._index_location(listing)
+        self._score_index.insert(listing)
+        self._rent_index.insert(listing)
+        self._update_market(listing)
+        if unsaved and record:
+            self._append_record(listing)
+
+    def _append_record(self, listing: dict) -> None:
+        """Copies a new listing into the attached record store, if any."""
+        if self._records is not None:
+            self._record_numbers[id(listing)] = (listing, self._records.append(listing))
+
+    def _clear(self) -> None:
+        """Removes every listing and empties every index."""
+        self._properties = []
+        self._unsaved = []
+        self._row_numbers = {}
+        self._rows_on_disk = 0
+        self._dead_rows = 0
+        self._pending_tombstones = []
+        self._storage_ids = {}
+        self._storage_deletes = []
+        self._storage_updates = {}
+        self._record_numbers = {}
+        self._unlocated = {}
+        self._spatial_index.clear()
+        self._score_index.clear()
+        self._rent_index.clear()
+        self._market.clear()
+
+    def _market_rents(self):
+        """Yields (ZIP, property type, rent) of every stored listing with a rent."""
+        for listing in self._properties:
+            rent = self._listing_rent(listing)
+            if rent > 0:
+                yield listing.get("ZIP"), listing.get("Property Type"), rent
+
+    def _update_market(self, listing: dict, removed: bool = False) -> None:
+        """Adds (or removes) a listing's rent in the market statistics."""
+        rent = self._listing_rent(listing)
+        if rent <= 0:
+            return
+        zipcode = listing.get("ZIP")
+        property_type = listing.get("Property Type")
+        if removed:
+            self._market.remove(zipcode, property_type, rent)
+        else:
+            self._market.add(zipcode, property_type, rent)
+
+    @property
+    def market(self) -> MarketAverages:
+        """
+        Live rent statistics per (ZIP, property type) over the stored listings.
+
+        Example:
+            calculator = ScoreCalculator(market=manager.market)
+        """
+        return self._market
+
+    def list_properties(self, sort_by: str | None = None):
         """
-        Returns a copy of all stored property listings.
+        Returns the stored property listings.
+
+        Args:
+            sort_by (str | None): None for a copy in insertion order, "score"
+                (best first) or "rent" (cheapest first) for a sorted view.
 
         Returns:
-            list[dict]: List of property dictionaries.
+            list[dict] | SortedIndex: The listings. Sorted views are live,
+                already-ordered indexes (no copy or sort); treat them as
+                read-only and use rank(), between() and page() on them.
+
+        Raises:
+            ValueError: If sort_by is unknown.
+
+        Example:
+            manager.list_properties("score").page(2, 10)
         """
-        return self._properties.copy()
+        if sort_by is None:
+            return self._properties.copy()
+        if sort_by == "score":
+            return self._score_index
+        if sort_by == "rent":
+            return self._rent_index
+        raise ValueError("sort_by must be None, 'score' or 'rent'.")
 
     # ----------
     # CSV Persistence
@@ -201,8 +434,239 @@ class PropertyManager:
             writer.writeheader()
             writer.writerows(self._properties)
 
+        self._tombstone_path(filename).unlink(missing_ok=True)
+        self._row_numbers = {id(listing): (listing, number) for number, listing in enumerate(self._properties)}
+        self._rows_on_disk = len(self._properties)
+        self._dead_rows = 0
+        self._pending_tombstones = []
+        self._mark_saved(filename)
+
+    def _mark_saved(self, filename) -> None:
+        """Records that every stored listing is now on disk in filename."""
+        self._csv_path = str(filename)
+        self._unsaved = []
+
+    @property
+    def dirty(self) -> bool:
+        """True if listings were added, changed or removed since the last save/flush."""
+        return (bool(self._unsaved) or bool(self._pending_tombstones)
+                or bool(self._storage_deletes) or bool(self._storage_updates))
+
+    def flush(self, filename: str | None = None) -> int:
+        """
+        Writes pending changes to a CSV file, appending whenever possible.
+
+        Listings added since the last save are appended under the file's
+        existing header (columns a new row lacks are left empty), and deletes
+        are appended to the tombstone log. Rows changed in place (rescore())
+        are written the same way: the old row gets a tombstone and the new
+        version is appended. The file is only rewritten when a new row brings
+        a column the header does not have yet (old rows keep their values under
+        the widened header), or when listings loaded from elsewhere are flushed
+        to a different file (every listing is written then). Compaction is left
+        to compact_if_due(), so a flush after one delete never rewrites the
+        whole file.
+
+        Args:
+            filename (str | None): Target file (default: the file last loaded or saved).
+
+        Returns:
+            int: Number of rows written.
+
+        Raises:
+            ValueError: If no file is given and none was loaded or saved before.
+
+        Example:
+            manager.add_rental(rental, score)
+            manager.flush("saved_rentals.csv")
+        """
+        if filename is None and self._storage is not None:
+            return self._flush_storage()
+
+        filename = str(filename) if filename is not None else self._csv_path
+        if filename is None:
+            raise ValueError("No CSV file to flush to.")
+        file_path = Path(filename)
+
+        if filename != self._csv_path:
+            if len(self._properties) > len(self._unsaved):
+                # Loaded listings are not in the new file: appending would drop them
+                self.save_to_csv(filename)
+                return len(self._properties)
+            # Row numbers and deletes refer to the previous file
+            self._row_numbers = {}
+            self._pending_tombstones = []
+            self._rows_on_disk = self._count_rows(file_path)
+            self._dead_rows = len(self.read_tombstones(file_path))
+
+        rows = self._unsaved
+        if rows:
+            header = self._csv_header(file_path)
+            if header is None:
+                header = list(rows[0].keys())
+                self._tombstone_path(file_path).unlink(missing_ok=True)
+                self._rows_on_disk = self._dead_rows = 0
+                with file_path.open("w", newline="", encoding="utf-8") as file:
+                    writer = csv.DictWriter(file, fieldnames=header, restval="")
+                    writer.writeheader()
+                    writer.writerows(rows)
+            else:
+                new_columns = [key for row in rows for key in row if key not in header]
+                if new_columns:
+                    header = self._widen_header(file_path, header, list(dict.fromkeys(new_columns)))
+                with file_path.open("a", newline="", encoding="utf-8") as file:
+                    csv.DictWriter(file, fieldnames=header, restval="").writerows(rows)
+
+            for listing in rows:
+                self._row_numbers[id(listing)] = (listing, self._rows_on_disk)
+                self._rows_on_disk += 1
+
+        written = len(rows)
+        self._write_tombstones(file_path)
+        self._mark_saved(filename)
+        return written
+
+    def _row_number(self, listing: dict):
+        """Data row number of a stored listing in the saved CSV, or None if it is not on disk."""
+        entry = self._row_numbers.get(id(listing))
+        return entry[1] if entry is not None and entry[0] is listing else None
+
+    def _csv_header(self, file_path: Path):
+        """Returns a CSV file's header, or None if the file is missing or empty."""
+        if not file_path.exists():
+            return None
+        with file_path.open(newline="", encoding="utf-8") as file:
+            return next(csv.reader(file), None) or None
+
+    def _count_rows(self, file_path: Path) -> int:
+        """Counts the data rows of a CSV file (0 if it does not exist)."""
+        if not file_path.exists():
+            return 0
+        with file_path.open(newline="", encoding="utf-8") as file:
+            return sum(1 for _ in csv.DictReader(file))
+
+    def _widen_header(self, file_path: Path, header: list, new_columns: list) -> list:
+        """Rewrites a CSV (streaming, via a temp file) with extra empty columns."""
+        widened = header + new_columns
+        temp_path = file_path.with_name(file_path.name + ".tmp")
+        with file_path.open(newline="", encoding="utf-8") as source, \
+             temp_path.open("w", newline="", encoding="utf-8") as target:
+            writer = csv.DictWriter(target, fieldnames=widened, restval="")
+            writer.writeheader()
+            writer.writerows(csv.DictReader(source))
+        os.replace(temp_path, file_path)
+        return widened
+
+    # ----------
+    # Tombstones
+    # ----------
+
+    @staticmethod
+    def _tombstone_path(filename) -> Path:
+        """Side log of deleted rows for a CSV file ("saved_rentals.csv.tombstones")."""
+        file_path = Path(filename)
+        return file_path.with_name(file_path.name + ".tombstones")
+
+    @classmethod
+    def read_tombstones(cls, filename) -> dict:
+        """
+        Reads a CSV file's tombstone log.
+
+        A row is dead when its number is in the log under its own listing key
+        (see _read_rows()); score_csv_parallel() skips the same rows.
+
+        Returns:
+            dict[int, str]: Deleted data row number -> listing key.
+        """
+        log_path = cls._tombstone_path(filename)
+        if not log_path.exists():
+            return {}
+        with log_path.open(newline="", encoding="utf-8") as file:
+            return {int(row_number): key for row_number, key in csv.reader(file)}
+
+    def _write_tombstones(self, file_path: Path) -> None:
+        """Appends pending deletes to the tombstone log (O(1) I/O per delete)."""
+        if not self._pending_tombstones:
+            return
+        with self._tombstone_path(file_path).open("a", newline="", encoding="utf-8") as file:
+            csv.writer(file).writerows(self._pending_tombstones)
+        self._dead_rows += len(self._pending_tombstones)
+        self._pending_tombstones = []
+
+    def compact(self) -> int:
+        """
+        Rewrites the saved CSV without its tombstoned rows and clears the log.
+
+        The file is streamed through a temp file, so rows that are on disk but
+        not loaded in this manager are kept.
+
+        Returns:
+            int: Number of rows removed from the file.
+
+        Raises:
+            ValueError: If no file was loaded or saved yet.
+        """
+        if self._csv_path is None:
+            raise ValueError("No CSV file to compact.")
+        file_path = Path(self._csv_path)
+        self._write_tombstones(file_path)
+        dead = self.read_tombstones(file_path)
+        if not dead or not file_path.exists():
+            return 0
+
+        new_numbers = {}
+        temp_path = file_path.with_name(file_path.name + ".tmp")
+        with file_path.open(newline="", encoding="utf-8") as source, \
+             temp_path.open("w", newline="", encoding="utf-8") as target:
+            reader = csv.DictReader(source)
+            writer = csv.DictWriter(target, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            for number, row in enumerate(reader):
+                if number in dead and dead[number] == self.listing_key(row):
+                    continue
+                new_numbers[number] = len(new_numbers)
+                writer.writerow(row)
+        os.replace(temp_path, file_path)
+        self._tombstone_path(file_path).unlink(missing_ok=True)
+
+        removed = self._rows_on_disk - len(new_numbers)
+        self._row_numbers = {
+            listing_id: (listing, new_numbers[number])
+            for listing_id, (listing, number) in self._row_numbers.items() if number in new_numbers
+        }
+        self._rows_on_disk = len(new_numbers)
+        self._dead_rows = 0
+        return removed
+
+    @property
+    def compaction_due(self) -> bool:
+        """True once tombstoned rows reach compact_fraction of the saved CSV."""
+        return bool(self._rows_on_disk) and (
+            (self._dead_rows + len(self._pending_tombstones)) / self._rows_on_disk >= self._compact_fraction)
+
+    def compact_if_due(self) -> int:
+        """
+        Maintenance step: compacts the saved CSV once compaction_due is True.
 
+        flush() never compacts, so deletes stay O(1) on interactive paths;
+        call this when a session or batch ends.
 
+        Returns:
+            int: Number of rows removed from the file (0 when not due or no file).
+        """
+        if self._csv_path is None or not self.compaction_due:
+            return 0
+        return self.compact()
+
+    def __enter__(self):
+        """Batches saves: pending rows are flushed once when the block ends."""
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        if (self._csv_path is not None or self._storage is not None) and self.dirty:
+            self.flush()
+        self.compact_if_due()
+        return False
 
     def load_from_csv(self, filename: str = "properties.csv") -> list[dict]:
         """
@@ -219,7 +683,50 @@ class PropertyManager:
         if not file_path.exists():
             raise ValueError(f"CSV file not found: {filename}")
 
-        self._properties = [] # Reset manager state
+        self._clear() # Reset manager state
+
+        for row_number, row in self._read_rows(filename):
+            self._store(row, unsaved=False)
+            self._row_numbers[id(row)] = (row, row_number)
+
+        self._dead_rows = len(self.read_tombstones(filename))
+        self._rows_on_disk = len(self._properties) + self._dead_rows
+        self._csv_path = str(filename)
+        return self._properties
+
+    def iter_rows(self, filename: str = "properties.csv", columns=None):
+        """
+        Streams listing rows from a CSV file one at a time.
+
+        Nothing is stored in the manager and only the current row is held in
+        memory, so files larger than RAM can be filtered or scored as a pipeline.
+
+        Args:
+            filename (str): The CSV file to read.
+            columns (Iterable[str] | None): Only keep these columns (projection).
+
+        Yields:
+            dict: One row per listing.
+
+        Raises:
+            ValueError: If the file is missing or empty, a projected column does
+                not exist, or an Overall Score is not numeric.
+
+        Example:
+            cheap = (r for r in manager.iter_rows("rentals.csv", ["Address", "Rent"])
+                     if float(r["Rent"]) < 1000)
+        """
+        for _, row in self._read_rows(filename, columns):
+            yield row
+
+    def _read_rows(self, filename, columns=None):
+        """Yields (data row number, row) for every row without a tombstone."""
+        file_path = Path(filename)
+
+        if not file_path.exists():
+            raise ValueError(f"CSV file not found: {filename}")
+
+        dead = self.read_tombstones(file_path)
 
         with file_path.open(newline="", encoding="utf-8") as file:
             reader = csv.DictReader(file)
@@ -227,21 +734,48 @@ class PropertyManager:
             if not reader.fieldnames:
                 raise ValueError("CSV file is empty or corrupted.")
 
-            for row in reader:
+            if columns is not None:
+                columns = list(columns)
+                missing = [column for column in columns if column not in reader.fieldnames]
+                if missing:
+                    raise ValueError(f"Unknown CSV column(s): {', '.join(missing)}")
+
+            for row_number, row in enumerate(reader):
+                if row_number in dead and dead[row_number] == self.listing_key(row):
+                    continue
                 if "Overall Score" in row:
                     try:
                         float(row["Overall Score"])
                     except ValueError:
                         raise ValueError("Invalid Overall Score in CSV file.")
-                self._properties.append(row)
+                if columns is not None:
+                    row = {column: row[column] for column in columns}
+                yield row_number, row
 
-        return self._properties
+    def iter_rentals(self, filename: str = "properties.csv"):
+        """
+        Streams RentalProperty objects rebuilt from a CSV file.
+
+        Rows with saved coordinates are restored without geocoding, as in
+        load_rentals_from_csv(), but no list of rows or rentals is built.
+
+        Yields:
+            RentalProperty: One rental per row.
+
+        Example:
+            manager.top_rentals(manager.iter_rentals("rentals.csv"), calculator, k=20)
+        """
+        for row in self.iter_rows(filename):
+            yield RentalProperty.from_dict(row)
     
 
 
     def load_rentals_from_csv(self, filename: str) -> list:
         """
         Loads rental properties from CSV and reconstructs RentalProperty objects.
+
+        Saved Latitude/Longitude columns are restored as-is, so rows written
+        by add_rental() are rebuilt without any geocoding requests.
         """
         raw_rows = self.load_from_csv(filename)
 
@@ -257,13 +791,296 @@ class PropertyManager:
 
 
 
+    # ----------
+    # Storage Backend
+    # ----------
+
+    @property
+    def storage(self):
+        """The database backend (None when only CSV files are used)."""
+        return self._storage
+
+    def _require_storage(self) -> ListingStore:
+        if self._storage is None:
+            raise ValueError("No storage backend configured.")
+        return self._storage
+
+    def _storage_id(self, listing: dict):
+        """Storage backend id of a stored listing, or None if it was not written there."""
+        entry = self._storage_ids.get(id(listing))
+        return entry[1] if entry is not None and entry[0] is listing else None
+
+    def _flush_storage(self) -> int:
+        """
+        Writes pending changes to the storage backend: removed listings are
+        deleted by id, listings rescored in place are updated by id, and added
+        ones are inserted in a single batch. Stored rows this manager never
+        loaded (e.g. from import_csv()) are left as they are.
+        """
+        storage = self._require_storage()
+
+        if self._storage_deletes:
+            storage.delete_ids(self._storage_deletes)
+        updates = [(self._storage_id(listing), listing) for listing in self._storage_updates.values()]
+        if updates:
+            storage.update_many(updates)
+        ids = storage.insert_many(self._unsaved)
+        for listing, storage_id in zip(self._unsaved, ids):
+            self._storage_ids[id(listing)] = (listing, storage_id)
+        written = len(updates) + len(self._unsaved)
+
+        self._unsaved = []
+        self._storage_deletes = []
+        self._storage_updates = {}
+        return written
+
+    def load_from_storage(self) -> list[dict]:
+        """
+        Loads every listing from the storage backend.
+
+        Returns:
+            list[dict]: The loaded listings.
+
+        Raises:
+            ValueError: If no storage backend is configured.
+        """
+        storage = self._require_storage()
+        self._clear()
+        for storage_id, listing in storage.iter_listings():
+            self._store(listing, unsaved=False)
+            self._storage_ids[id(listing)] = (listing, storage_id)
+        return self._properties
+
+    def import_csv(self, filename: str) -> int:
+        """
+        Streams a listings CSV straight into the storage backend.
+
+        The rows are not kept in memory; call load_from_storage() or query()
+        to read them back.
+
+        Returns:
+            int: Number of rows imported.
+
+        Raises:
+            ValueError: If no storage backend is configured or the file is missing.
+        """
+        storage = self._require_storage()
+        return len(storage.insert_many(self.iter_rows(filename)))
+
+    def export_csv(self, filename: str) -> int:
+        """
+        Streams every listing in the storage backend to a CSV file.
+
+        Returns:
+            int: Number of rows exported.
+
+        Raises:
+            ValueError: If no storage backend is configured.
+        """
+        storage = self._require_storage()
+
+        # First pass collects every column, so listings of different shapes share one header
+        header = {}
+        for _, listing in storage.iter_listings():
+            header.update(dict.fromkeys(listing))
+
+        count = 0
+        with open(filename, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=list(header), restval="")
+            writer.writeheader()
+            for _, listing in storage.iter_listings():
+                writer.writerow(listing)
+                count += 1
+        return count
+
+    def query(self, zipcode=None, property_type: str | None = None, min_rent: float | None = None,
+              max_rent: float | None = None, min_score: float | None = None,
+              order_by: str = "score", limit: int | None = None) -> list[dict]:
+        """
+        Filters and ranks listings.
+
+        With a storage backend this runs as one indexed SQL query over the
+        flushed listings. Otherwise stored listings are filtered in memory,
+        walking the score or rent index so a limit stops the scan early.
+
+        Args:
+            zipcode (str | int | None): Only this ZIP code.
+            property_type (str | None): Only this type (case-insensitive).
+            min_rent (float | None): Lowest rent.
+            max_rent (float | None): Highest rent.
+            min_score (float | None): Lowest overall score.
+            order_by (str): "score" (best first), "rent" (cheapest first) or "inserted".
+            limit (int | None): Maximum number of listings.
+
+        Returns:
+            list[dict]: Matching listings.
+
+        Raises:
+            ValueError: If order_by is unknown or limit is not positive.
+
+        Example:
+            manager.query(zipcode="20740", property_type="2x2", max_rent=1500, limit=10)
+        """
+        if self._storage is not None:
+            return self._storage.query(zipcode, property_type, min_rent, max_rent,
+                                       min_score, order_by, limit)
+
+        sources = {"score": self._score_index, "rent": self._rent_index, "inserted": self._properties}
+        if order_by not in sources:
+            raise ValueError(f"order_by must be one of: {', '.join(sources)}.")
+        if limit is not None and limit < 1:
+            raise ValueError("Limit must be positive.")
+
+        matches_type = self._type_filter(property_type)
+        wanted_zip = None if zipcode is None else str(zipcode).strip()
+        results = []
+        for listing in sources[order_by]:
+            rent = self._listing_rent(listing)
+            if wanted_zip is not None and str(listing.get("ZIP", "")).strip() != wanted_zip:
+                continue
+            if matches_type is not None and not matches_type(listing):
+                continue
+            if (min_rent is not None and rent < min_rent) or (max_rent is not None and rent > max_rent):
+                continue
+            if min_score is not None and self._listing_score(listing) < min_score:
+                continue
+            results.append(listing)
+            if limit is not None and len(results) == limit:
+                break
+        return results
+
+    # ----------
+    # Columnar Snapshots
+    # ----------
+
+    def save_snapshot(self, directory: str) -> dict:
+        """
+        Saves every listing as a columnar snapshot directory (see snapshot.py).
+
+        Exporting the loaded snapshot with save_to_csv() reproduces the same CSV.
+
+        Args:
+            directory (str): Snapshot directory (created if needed).
+
+        Returns:
+            dict: The snapshot manifest.
+
+        Raises:
+            ValueError: If there are no listings to save.
+        """
+        if not self._properties:
+            raise ValueError("No properties to save.")
+        return save_snapshot(self._properties, directory)
+
+    @staticmethod
+    def open_snapshot(directory: str) -> Snapshot:
+        """
+        Memory-maps a snapshot without loading it, ready for Snapshot.query().
+
+        Example:
+            PropertyManager.open_snapshot("rentals_snapshot").query(max_rent=1500, limit=10)
+        """
+        return Snapshot(directory)
+
+    def load_snapshot(self, directory: str) -> list[dict]:
+        """
+        Loads every listing from a snapshot directory.
+
+        Returns:
+            list[dict]: The loaded listings.
+
+        Raises:
+            ValueError: If the directory holds no valid snapshot.
+        """
+        snapshot = Snapshot(directory)
+        self._clear()
+        for row in snapshot:
+            self._store(row, unsaved=False)
+        self._csv_path = None  # nothing on disk to append to until the next save
+        return self._properties
+
+    # ----------
+    # Record Store
+    # ----------
+
+    def save_records(self, path: str) -> int:
+        """
+        Writes every listing to a new record store (see record_store.py),
+        replacing any store already at path.
+
+        Record numbers follow list_properties() order.
+
+        Returns:
+            int: Number of records written.
+
+        Raises:
+            ValueError: If there are no listings to save.
+        """
+        if not self._properties:
+            raise ValueError("No properties to save.")
+
+        for suffix in ("", ".strings", ".index"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+        with RecordStore(path) as store:
+            return len(store.append_many(self._properties))
+
+    @property
+    def records(self):
+        """The attached record store (None when not given)."""
+        return self._records
+
+    def _record_number(self, listing: dict):
+        """Record number of a stored listing in the attached record store, or None."""
+        entry = self._record_numbers.get(id(listing))
+        return entry[1] if entry is not None and entry[0] is listing else None
+
+    def load_from_records(self) -> list[dict]:
+        """
+        Loads every live listing from the attached record store, keeping
+        their record numbers so later deletes and rescores reach the store.
+
+        Returns:
+            list[dict]: The loaded listings.
+
+        Raises:
+            ValueError: If no record store is attached.
+        """
+        if self._records is None:
+            raise ValueError("No record store attached.")
+        self._clear()
+        for number, listing in self._records:
+            self._store(listing, unsaved=False)
+            self._record_numbers[id(listing)] = (listing, number)
+        self._csv_path = None
+        return self._properties
+
+    @staticmethod
+    def open_records(path: str) -> RecordStore:
+        """
+        Opens a record store for single-listing reads and in-place score updates.
+
+        Example:
+            with PropertyManager.open_records("rentals.rec") as store:
+                for number in store.find("4500 Knox Rd, College Park, MD"):
+                    store.update_score(number, 8.25)
+        """
+        return RecordStore(path)
+
     # ----------
     # Rental-Specific Integration
     # ----------
 
-    def add_rental(self, rental, score: float) -> dict:
+    def add_rental(self, rental, score: float, calculator=None) -> dict:
         """
         Stores a RentalProperty object along with its computed overall score.
+        The rental's coordinates and geocode timestamp are stored too, so a
+        reload does not need to geocode the address again.
+
+        When the ScoreCalculator that produced the score is given, the component
+        scores, a content hash of the scoring inputs, the market reference price
+        and the scoring version are stored as well, so rescore() can skip the
+        row while nothing changes. They are computed once the listing is part
+        of the market, the same way rescore() recomputes them.
         """
         from rental_property import RentalProperty
 
@@ -281,11 +1098,308 @@ class PropertyManager:
             "Property Type": rental.property_type_obj.type_key,
             "Type Score": rental.property_type_obj.type_score(),
             "Overall Score": score_value,
-            "Distances": json.dumps(rental.distances)
+            "Distances": json.dumps(rental.distances),
+            **rental.coordinate_fields(),
+            **self._scoring_fields(rental, None)  # column order; filled in below
         }
 
-        self._properties.append(listing)
+        self._store(listing, record=False)
+        listing.update(self._scoring_fields(rental, calculator))
+        self._append_record(listing)
+        if listing["Latitude"] == "":
+            # Lazy coordinates: geocoded and indexed on the next location query
+            self._unlocated[id(listing)] = (listing, rental)
         return listing
+
+    # ----------
+    # Change Detection
+    # ----------
+
+    # Stored component scores, in ScoreCalculator.component_scores() order
+    COMPONENT_FIELDS = {
+        "Price Score": "price",
+        "Flexibility Score": "flexibility",
+        "Commute Score": "commute"
+    }
+
+    def _scoring_fields(self, rental, calculator) -> dict:
+        """Component scores, content hash and scoring version columns (empty without a calculator)."""
+        if calculator is None:
+            fields = {field: "" for field in self.COMPONENT_FIELDS}
+            fields.update({"Content Hash": "", "Reference Price": "", "Scoring Version": ""})
+            return fields
+
+        components = calculator.component_scores(rental)
+        fields = {field: components[name] for field, name in self.COMPONENT_FIELDS.items()}
+        fields.update({
+            "Content Hash": calculator.rental_hash(rental),
+            "Reference Price": calculator.reference_price(rental.zipcode, rental.property_type_obj.type_key),
+            "Scoring Version": calculator.scoring_version()
+        })
+        return fields
+
+    def _row_hash(self, row: dict, calculator):
+        """Content hash of a stored row's scoring inputs, or None if they are incomplete."""
+        try:
+            distances = json.loads(row.get("Distances") or "{}")
+            return calculator.content_hash(row["Address"], row["Rent"], row["Lease Term"],
+                                           distances, row["Property Type"], row["ZIP"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _price_moved(row: dict, reference_price: float, tolerance: float) -> bool:
+        """True if the market price moved more than tolerance since the row was scored."""
+        try:
+            stored = float(row.get("Reference Price"))
+        except (TypeError, ValueError):
+            return True
+        return abs(reference_price - stored) > tolerance * stored
+
+    def rescore(self, calculator, price_tolerance: float = 0.02) -> dict:
+        """
+        Brings every stored rental row's scores up to date, skipping unchanged rows.
+
+        A row whose stored Content Hash and Scoring Version match its current
+        inputs and the calculator, and whose stored Reference Price is within
+        price_tolerance of the market's current one, keeps its stored scores,
+        and no RentalProperty is built for it. Other rows (new, edited, repriced
+        by the market, or scored with other weights) are rebuilt and rescored;
+        overall scores are clamped to 0-10 like add_rental() requires.
+
+        Args:
+            calculator (ScoreCalculator): Scoring configuration to check against.
+            price_tolerance (float): Relative market price move (0.02 = 2%) that
+                stored price scores may lag behind before they are refreshed.
+
+        Returns:
+            dict: Counts of 'reused', 'rescored' and 'skipped' (not rental rows).
+
+        Example:
+            manager.load_from_csv("saved_rentals.csv")
+            manager.rescore(calculator)
+            {'reused': 998, 'rescored': 2, 'skipped': 0}
+        """
+        version = calculator.scoring_version()
+        counts = {"reused": 0, "rescored": 0, "skipped": 0}
+
+        for row in self._properties:
+            content_hash = self._row_hash(row, calculator)
+            if content_hash is None:
+                counts["skipped"] += 1
+                continue
+            reference_price = calculator.reference_price(row.get("ZIP"), row.get("Property Type"))
+            if (row.get("Content Hash") == content_hash and row.get("Scoring Version") == version
+                    and not self._price_moved(row, reference_price, price_tolerance)):
+                counts["reused"] += 1
+                continue
+
+            rental = RentalProperty.from_dict(row)
+            components = calculator.component_scores(rental)
+            overall = min(max(calculator.overall_score(rental), 0.0), 10.0)
+
+            row["Overall Score"] = self._validate_score(overall)
+            row["Type Score"] = components["type"]
+            for field, name in self.COMPONENT_FIELDS.items():
+                row[field] = components[name]
+            row["Content Hash"] = content_hash
+            row["Reference Price"] = reference_price
+            row["Scoring Version"] = version
+            self._score_index.insert(row)  # re-insert at its new score
+            self._listing_changed(row)
+            counts["rescored"] += 1
+
+        return counts
+
+    def _listing_changed(self, listing: dict) -> None:
+        """Queues (or writes) a stored listing changed in place to every backend holding it."""
+        self._supersede_row(listing)
+        if self._storage_id(listing) is not None:
+            self._storage_updates[id(listing)] = listing
+        record_number = self._record_number(listing)
+        if record_number is not None:
+            self._record_numbers[id(listing)] = (listing, self._records.replace(record_number, listing))
+
+    def _supersede_row(self, listing: dict) -> None:
+        """Queues a saved row changed in place: tombstone the old row, append the new one."""
+        row_number = self._row_number(listing)
+        if row_number is None:
+            return  # not on disk (or still unsaved)
+        del self._row_numbers[id(listing)]
+        self._pending_tombstones.append((row_number, self.listing_key(listing)))
+        self._unsaved.append(listing)
+
+    def load_scored_csv(self, filename: str, calculator) -> dict:
+        """
+        Loads listings from CSV and rescores only new or changed rows.
+
+        Returns:
+            dict: rescore() counts.
+        """
+        self.load_from_csv(filename)
+        return self.rescore(calculator)
+
+    # ----------
+    # Ranking
+    # ----------
+
+    def top_listings(self, k: int = 10, property_type: str | None = None) -> list[dict]:
+        """
+        Returns the k stored listings with the highest overall score.
+
+        Without a type filter the best k are read straight off the score
+        index; with one, only the best k matches are kept while scanning
+        (bounded heap). Equal scores keep their stored order.
+
+        Args:
+            k (int): Number of listings to return.
+            property_type (str | None): Only include this type (e.g. "2x2").
+
+        Returns:
+            list[dict]: Up to k listings, best first.
+
+        Example:
+            manager.top_listings(10)
+        """
+        matches = self._type_filter(property_type)
+        if matches is None:
+            if k <= 0:
+                raise ValueError("k must be positive.")
+            return self._score_index[:k]
+
+        scored = (
+            (self._listing_score(listing), listing)
+            for listing in self._properties
+            if matches(listing)
+        )
+        return [listing for _, listing in top_k(scored, k)]
+
+    def top_rentals(self, rentals, calculator, k: int = 10) -> list:
+        """
+        Scores rentals on the fly and keeps only the best k.
+
+        Args:
+            rentals (Iterable[RentalProperty]): Any iterable, e.g. a generator.
+            calculator (ScoreCalculator): Computes each rental's overall score.
+            k (int): Number of rentals to return.
+
+        Returns:
+            list[tuple[float, RentalProperty]]: Up to k (score, rental) pairs, best first.
+
+        Example:
+            manager.top_rentals(manager.load_rentals_from_csv("rentals.csv"), calculator, k=20)
+        """
+        return top_k(((calculator.overall_score(rental), rental) for rental in rentals), k)
+
+    def _listing_score(self, listing: dict) -> float:
+        """Overall score of a stored listing (CSV rows hold it as text)."""
+        score = listing.get("Overall Score", listing.get("Score", 0))
+        try:
+            return float(score)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _listing_rent(self, listing: dict) -> float:
+        """Monthly rent of a stored listing (0.0 if missing or invalid)."""
+        try:
+            return self._validate_rent(listing.get("Rent", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    # ----------
+    # Location Queries
+    # ----------
+
+    def _index_location(self, listing: dict) -> None:
+        """
+        Adds a listing to the spatial index if it has saved coordinates.
+        Listings without Latitude/Longitude (e.g. not geocoded yet) are skipped.
+        """
+        try:
+            latitude = float(listing.get("Latitude", ""))
+            longitude = float(listing.get("Longitude", ""))
+        except (TypeError, ValueError):
+            return
+        self._spatial_index.add(listing, latitude, longitude)
+
+    def _locate_pending(self) -> None:
+        """
+        Resolves the coordinates of rentals added before they were geocoded,
+        copies them into their listings and adds them to the spatial index.
+
+        Rentals that still cannot be geocoded stay queued (a failed address is
+        only retried after the negative-cache TTL, so queries stay fast).
+        Listings that were already saved are updated like rescored ones.
+        """
+        for key, (listing, rental) in list(self._unlocated.items()):
+            try:
+                rental.coordinates
+            except (ValueError, ConnectionError):
+                continue
+            listing.update(rental.coordinate_fields())
+            del self._unlocated[key]
+            self._index_location(listing)
+            self._listing_changed(listing)
+
+    def _resolve_center(self, center) -> tuple:
+        """
+        Converts a query center to (latitude, longitude).
+
+        Args:
+            center (tuple | str): Coordinates, an address, or a campus building code.
+        """
+        if isinstance(center, str):
+            return get_property_coordinates(center)
+        latitude, longitude = center
+        return (float(latitude), float(longitude))
+
+    def _type_filter(self, property_type: str | None):
+        """Builds a listing predicate for an optional property type (e.g. '2x2')."""
+        if property_type is None:
+            return None
+        wanted = property_type.strip().lower()
+        return lambda listing: str(listing.get("Property Type", "")).lower() == wanted
+
+    def rentals_within(self, center, miles: float, property_type: str | None = None) -> list:
+        """
+        Finds stored rentals within a distance of a point, closest first.
+
+        Rentals added with lazy coordinates are geocoded first; other listings
+        are only searched if they have saved coordinates.
+
+        Args:
+            center (tuple | str): (latitude, longitude), an address, or a building code like "ESJ".
+            miles (float): Search radius in miles.
+            property_type (str | None): Only include this type (e.g. "2x2").
+
+        Returns:
+            list[tuple[float, dict]]: (distance in miles, listing) pairs.
+
+        Example:
+            manager.rentals_within("ESJ", 1.0)
+        """
+        self._locate_pending()
+        return self._spatial_index.within(self._resolve_center(center), miles,
+                                          self._type_filter(property_type))
+
+    def nearest_rentals(self, center, k: int = 20, property_type: str | None = None) -> list:
+        """
+        Finds the k stored rentals closest to a point.
+
+        Args:
+            center (tuple | str): (latitude, longitude), an address, or a building code like "HBK".
+            k (int): Number of rentals to return.
+            property_type (str | None): Only include this type (e.g. "2x2").
+
+        Returns:
+            list[tuple[float, dict]]: Up to k (distance in miles, listing) pairs, closest first.
+
+        Example:
+            manager.nearest_rentals("HBK", k=20, property_type="2x2")
+        """
+        self._locate_pending()
+        return self._spatial_index.nearest(self._resolve_center(center), k,
+                                           self._type_filter(property_type))
     
     # ----------
     # Debugging / Display
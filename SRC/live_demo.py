@@ -26,14 +26,21 @@ This demonstrates:
 from rental_property import RentalProperty
 from score_calculator import ScoreCalculator
 from listing_manager import PropertyManager
-from commute import Commute
+from commute import CommuteProfile
 
+# McKeldin Library: resolved from the built-in campus table (campus_locations.py), never geocoded
 CAMPUS_ADDRESS = "7649 Library Ln, College Park, MD 20742"
 
 
 
-def display_score_breakdown(rental, calculator):
-    """Display a detailed breakdown of the rental score."""
+def display_score_breakdown(rental, calculator, profile=None):
+    """Display a detailed breakdown of the rental score.
+
+    Args:
+        rental (RentalProperty): The rental to display.
+        calculator (ScoreCalculator): Calculator used for the scores.
+        profile (CommuteProfile | None): Commute to campus, if already computed.
+    """
 
     price_score = calculator.price_score(rental.rent)
     flexibility_score = calculator.flexibility_score(rental.lease_term)
@@ -51,21 +58,21 @@ def display_score_breakdown(rental, calculator):
     print(f"⭐ OVERALL SCORE:      {overall}/10\n")
 
     # --------------------------------
-    # COMMUTE DETAILS (RECOMPUTED)
+    # COMMUTE DETAILS (ONE DISTANCE, EVERY MODE)
     # --------------------------------
     print("🚗 COMMUTE DETAILS")
 
+    if profile is None:
+        profile = CommuteProfile(rental.address, CAMPUS_ADDRESS)
+
     for mode in rental.distances.keys():
-        commute = Commute(
-            rental.address,
-            CAMPUS_ADDRESS,
-            mode=mode
-        )
+        if mode not in profile.modes:
+            continue
 
         print(
             f"{mode.title():<6}: "
-            f"{commute.distance_miles} miles → "
-            f"{commute.time_minutes} minutes"
+            f"{profile.distance_miles} miles → "
+            f"{profile.time_for(mode)} minutes"
         )
 
 
@@ -87,14 +94,9 @@ def get_rental_score(manager, calculator):
 
     print("\n📍 Calculating commute to campus...")
 
-    walk_commute = Commute(address, CAMPUS_ADDRESS, mode="walk")
-    drive_commute = Commute(address, CAMPUS_ADDRESS, mode="drive")
-
-    # Distances are the SAME miles, but times differ
-    distances = {
-        "walk": walk_commute.distance_miles,
-        "drive": drive_commute.distance_miles
-    }
+    # Distances are the SAME miles for every mode, only the times differ
+    profile = CommuteProfile(address, CAMPUS_ADDRESS)
+    distances = profile.distances(["walk", "drive"])
 
 
 
@@ -108,13 +110,14 @@ def get_rental_score(manager, calculator):
         distances=distances
     )
 
-    display_score_breakdown(rental, calculator)
+    display_score_breakdown(rental, calculator, profile)
 
     save = input("Save this rental? (yes/no): ").strip().lower()
     if save == "yes":
-        score = calculator.overall_score(rental)
-        manager.add_rental(rental, score)
-        manager.save_to_csv("saved_rentals.csv")
+        manager.add_rental(rental, calculator.overall_score(rental), calculator)
+        # The new rent moves the market; settle every score before persisting
+        manager.rescore(calculator)
+        manager.flush("saved_rentals.csv")
         print("💾 Rental saved.\n")
     else:
         print("❌ Rental not saved.\n")
@@ -128,7 +131,7 @@ def saved_rentals_menu(manager, calculator):
     """Menu for interacting with saved rentals."""
 
     try:
-        manager.load_from_csv("saved_rentals.csv")
+        manager.load_scored_csv("saved_rentals.csv", calculator)
     except ValueError:
         print("\nNo saved rentals found.")
         return
@@ -166,9 +169,9 @@ def saved_rentals_menu(manager, calculator):
                 print("Invalid selection.")
                 continue
 
-            deleted = rentals.pop(index)
-            manager._properties = rentals
-            manager.save_to_csv("saved_rentals.csv")
+            deleted = manager.remove_property(index)
+            manager.rescore(calculator)
+            manager.flush("saved_rentals.csv")
             print(f"🗑️ Deleted: {deleted['Address']}")
 
         elif choice == "3":
@@ -186,7 +189,7 @@ def main():
     """Main interactive menu."""
 
     manager = PropertyManager()
-    calculator = ScoreCalculator()
+    calculator = ScoreCalculator(market=manager.market)
 
     while True:
         print("\n==============================")
@@ -203,6 +206,8 @@ def main():
         elif choice == "2":
             saved_rentals_menu(manager, calculator)
         elif choice == "3":
+            # Deletes only append tombstones; tidy the file once, off the menu path
+            manager.compact_if_due()
             print("\n👋 Session ended.")
             break
         else:
@@ -55,19 +55,19 @@ def main():
         )
     ]
 #Step 2: Initialize system components
-# ScoreCalculator handles scoring logic
 # PropertyManager stores and manages ranked results
-    calculator = ScoreCalculator()
+# ScoreCalculator handles scoring logic, priced against the manager's market
     manager = PropertyManager()
+    calculator = ScoreCalculator(market=manager.market)
 
-# Step 3: Score rentals and store results
+# Step 3: Store rentals, then score them once the market holds every rent
+# (a score taken mid-ingestion would depend on insertion order)
     for rental in rentals:
-        score = calculator.overall_score(rental)
-        manager.add_rental(rental, score)
+        manager.add_rental(rental, calculator.overall_score(rental), calculator)
+    manager.rescore(calculator)
 
- # Step 4: Rank rentals by overall score
-    results = manager.list_properties()
-    results.sort(key=lambda r: r["Overall Score"], reverse=True)
+ # Step 4: Rank rentals by overall score (keeps only the best 10)
+    results = manager.top_listings(k=10)
 
 # Step 5: Display ranked rentals
     print("📊 Ranked Rentals:\n")
@@ -0,0 +1,375 @@
+# Streaming market rent statistics per (ZIP, property type).
+#
+# ScoreCalculator compared every rent against one fixed average ($1500),
+# so a cheap 4x4 in 20742 and a pricey studio in 20740 were judged against
+# the same number. MarketAverages keeps running statistics for each
+# (ZIP, property type) group as listings arrive, without storing the rents:
+# - count and mean (Welford's running update, also reversible on delete)
+# - approximate median and percentiles with the P² estimator
+#   (Jain & Chlamtac, 1985): five markers per quantile, constant memory
+#
+# P² markers cannot forget a value, so a removal marks the group's quantiles
+# stale. Given a source of the current rents, MarketAverages rebuilds stale
+# groups the next time a quantile is read; without one, reading a stale
+# quantile raises instead of returning a figure that still counts deleted rents.
+#
+# PropertyManager feeds it every stored listing, and ScoreCalculator(market=...)
+# uses it as the reference price in price_score.
+
+from bisect import insort
+import math
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile using the P² algorithm.
+
+    Exact for the first five values, then approximated with five markers.
+
+    Example:
+        median = P2Quantile(0.5)
+        for rent in rents:
+            median.add(rent)
+        median.value()
+    """
+
+    def __init__(self, p: float):
+        """
+        Args:
+            p (float): Quantile to track, between 0 and 1 (0.5 is the median).
+
+        Raises:
+            ValueError: If p is outside [0, 1].
+        """
+        if not 0 <= p <= 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+        self._p = float(p)
+        self._count = 0
+        self._heights = []   # marker heights (the first five values until initialized)
+        self._positions = []
+        self._desired = []
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        """Add one observation."""
+        value = float(value)
+        self._count += 1
+
+        if self._count <= 5:
+            insort(self._heights, value)
+            if self._count == 5:
+                p = self._p
+                self._positions = [1, 2, 3, 4, 5]
+                self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+            return
+
+        q, n = self._heights, self._positions
+
+        # Find the cell holding the value, stretching the extremes if needed
+        if value < q[0]:
+            q[0] = value
+            cell = 0
+        elif value >= q[4]:
+            q[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if q[i] <= value < q[i + 1])
+
+        for i in range(cell + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Move the middle markers toward their desired positions
+        for i in range(1, 4):
+            offset = self._desired[i] - n[i]
+            if (offset >= 1 and n[i + 1] - n[i] > 1) or (offset <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        """Piecewise-parabolic prediction of marker i moved by step."""
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        """
+        Return the current estimate.
+
+        Returns:
+            float | None: The quantile estimate, or None before any value is added.
+        """
+        if self._count == 0:
+            return None
+        if self._count <= 5:
+            # Exact, interpolated between the closest ranks
+            position = self._p * (self._count - 1)
+            low = math.floor(position)
+            high = min(low + 1, self._count - 1)
+            fraction = position - low
+            return self._heights[low] + (self._heights[high] - self._heights[low]) * fraction
+        return self._heights[2]
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class RunningStats:
+    """Count, mean and streaming quantiles of one group of rents.
+
+    Example:
+        stats = RunningStats()
+        stats.add(1350)
+        stats.mean, stats.median
+    """
+
+    def __init__(self, quantiles: tuple = (0.25, 0.5, 0.75)):
+        """
+        Args:
+            quantiles (tuple[float]): Quantiles to estimate (0.5 is always tracked).
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations (Welford)
+        self._quantiles = {p: P2Quantile(p) for p in sorted({*quantiles, 0.5})}
+        self.stale = False  # True once a removal left the quantiles behind
+
+    def add(self, value: float) -> None:
+        """Add one rent."""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        for estimator in self._quantiles.values():
+            estimator.add(value)
+
+    def remove(self, value: float) -> None:
+        """
+        Remove a previously added rent from the count and mean.
+
+        The P² quantiles cannot forget a value, so they are marked stale and
+        quantile() refuses to answer until the statistics are rebuilt.
+        """
+        if self.count == 0:
+            return
+        value = float(value)
+        self.stale = True
+        if self.count == 1:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+            return
+        old_mean = (self.count * self.mean - value) / (self.count - 1)
+        self._m2 = max(0.0, self._m2 - (value - old_mean) * (value - self.mean))
+        self.mean = old_mean
+        self.count -= 1
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation (0.0 below two values)."""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def median(self):
+        """Approximate median, or None when empty."""
+        return self.quantile(0.5)
+
+    def quantile(self, p: float):
+        """
+        Return a tracked quantile estimate.
+
+        Raises:
+            ValueError: If p was not requested when the stats were created,
+                or a removal made the quantiles stale.
+        """
+        if p not in self._quantiles:
+            raise ValueError(f"Quantile {p} is not tracked.")
+        if self.stale:
+            raise ValueError("Quantiles are stale after a removal; rebuild the statistics.")
+        return self._quantiles[p].value() if self.count else None
+
+    def summary(self) -> dict:
+        """Return count, mean, stdev and every tracked quantile."""
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "stdev": round(self.stdev, 2),
+            **{f"p{round(p * 100)}": (None if self.stale or self.quantile(p) is None
+                                      else round(self.quantile(p), 2))
+               for p in self._quantiles}
+        }
+
+
+class MarketAverages:
+    """Running rent statistics per (ZIP, property type), updated one listing at a time.
+
+    Reference prices fall back from the (ZIP, type) group to the whole ZIP,
+    then to every listing, whenever a group has fewer than min_count rents.
+
+    Example:
+        market = MarketAverages()
+        market.add("20740", "2x2", 1350)
+        market.reference_price("20740", "2x2", default=1500.0)
+    """
+
+    STATISTICS = ("mean", "median")
+
+    def __init__(self, statistic: str = "mean", min_count: int = 3,
+                 quantiles: tuple = (0.25, 0.5, 0.75), source=None):
+        """
+        Args:
+            statistic (str): "mean" or "median" - the value used as reference price.
+            min_count (int): Rents a group needs before it is trusted.
+            quantiles (tuple[float]): Quantiles tracked per group.
+            source (callable | None): Returns the current (zipcode, property_type, rent)
+                triples; used to rebuild groups whose quantiles went stale on removal.
+
+        Raises:
+            ValueError: If statistic is unknown or min_count is not positive.
+        """
+        if statistic not in self.STATISTICS:
+            raise ValueError(f"Statistic must be one of: {', '.join(self.STATISTICS)}.")
+        if min_count < 1:
+            raise ValueError("Minimum group size must be positive.")
+
+        self._statistic = statistic
+        self._min_count = int(min_count)
+        self._quantiles = tuple(quantiles)
+        self._groups = {}  # (zip, type) / (zip, None) / (None, None) -> RunningStats
+        self._source = source
+        self._stale = set()  # group keys with removals since they were built
+        self._version = 0  # bumped on every change, so cached reference prices can be checked
+
+    @staticmethod
+    def _key(zipcode, property_type) -> tuple:
+        """Normalize a group key ("20740", "2x2")."""
+        zipcode = None if zipcode in (None, "") else str(zipcode).strip()
+        if zipcode is not None and zipcode.isdigit():
+            zipcode = zipcode.zfill(5)  # ZIPs stored as int lose leading zeros
+        property_type = None if property_type in (None, "") else str(property_type).strip().lower()
+        return (zipcode, property_type)
+
+    @classmethod
+    def _levels(cls, zipcode, property_type) -> list:
+        """Group keys from most to least specific."""
+        zipcode, property_type = cls._key(zipcode, property_type)
+        levels = []
+        if zipcode is not None and property_type is not None:
+            levels.append((zipcode, property_type))
+        if zipcode is not None:
+            levels.append((zipcode, None))
+        levels.append((None, None))
+        return levels
+
+    def add(self, zipcode, property_type, rent: float) -> None:
+        """Record one listing's rent in its group, its ZIP and the whole market."""
+        for key in self._levels(zipcode, property_type):
+            self._groups.setdefault(key, RunningStats(self._quantiles)).add(rent)
+        self._version += 1
+
+    def remove(self, zipcode, property_type, rent: float) -> None:
+        """Take a deleted listing's rent out of the running counts and means."""
+        for key in self._levels(zipcode, property_type):
+            if key in self._groups:
+                self._groups[key].remove(rent)
+                self._stale.add(key)
+        self._version += 1
+
+    def clear(self) -> None:
+        """Forget every group."""
+        self._groups.clear()
+        self._stale.clear()
+        self._version += 1
+
+    def _rebuild_stale(self) -> None:
+        """Recompute the groups touched by removals from the current rents."""
+        if not self._stale or self._source is None:
+            return
+        stale, self._stale = self._stale, set()
+        for key in stale:
+            self._groups[key] = RunningStats(self._quantiles)
+        for zipcode, property_type, rent in self._source():
+            for key in self._levels(zipcode, property_type):
+                if key in stale:
+                    self._groups[key].add(rent)
+
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever a rent is added or removed."""
+        return self._version
+
+    def stats(self, zipcode=None, property_type=None):
+        """
+        Return the RunningStats of one group.
+
+        Args:
+            zipcode (str | int | None): ZIP code, or None for the whole market.
+            property_type (str | None): Property type, or None for the whole ZIP.
+
+        Returns:
+            RunningStats | None: The group's statistics, or None if it has no rents.
+        """
+        self._rebuild_stale()
+        stats = self._groups.get(self._key(zipcode, property_type))
+        return stats if stats is not None and stats.count else None
+
+    def reference_price(self, zipcode=None, property_type=None, default: float = 1500.0) -> float:
+        """
+        Market price a rent should be compared against.
+
+        Args:
+            zipcode (str | int | None): Listing ZIP code.
+            property_type (str | None): Listing type (e.g. "2x2").
+            default (float): Used when no level has min_count rents.
+
+        Returns:
+            float: Mean (or median) of the most specific group with enough rents.
+        """
+        if self._statistic == "median":
+            self._rebuild_stale()  # the running means stay exact, medians do not
+        for key in self._levels(zipcode, property_type):
+            stats = self._groups.get(key)
+            if stats is not None and stats.count >= self._min_count:
+                return stats.mean if self._statistic == "mean" else stats.median
+        return float(default)
+
+    def reference_table(self, default: float = 1500.0) -> dict:
+        """
+        Resolved reference price of every group, as a plain dict.
+
+        Lets processes without the live statistics (e.g. scoring workers) price
+        listings with table_price() and get the same answer as reference_price().
+
+        Args:
+            default (float): Used when no level has min_count rents.
+
+        Returns:
+            dict: Group key -> reference price, always including the whole market (None, None).
+        """
+        self._rebuild_stale()
+        table = {key: self.reference_price(*key, default=default)
+                 for key, stats in self._groups.items() if stats.count}
+        table[(None, None)] = self.reference_price(default=default)
+        return table
+
+    @classmethod
+    def table_price(cls, table: dict, zipcode=None, property_type=None) -> float:
+        """Reference price of a listing from a reference_table() dict."""
+        for key in cls._levels(zipcode, property_type):
+            if key in table:
+                return table[key]
+        return table[(None, None)]
+
+    def __len__(self) -> int:
+        """Number of (ZIP, type) groups with rents."""
+        return sum(1 for (z, t), s in self._groups.items() if z is not None and t is not None and s.count)
+
+    def __str__(self) -> str:
+        market = self.stats()
+        total = market.count if market else 0
+        return f"MarketAverages({len(self)} groups, {total} rents, {self._statistic})"
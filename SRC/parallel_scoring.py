@@ -0,0 +1,304 @@
+# Parallel scoring of large listing sets on a process pool.
+#
+# ScoreCalculator.overall_score() runs one rental at a time in one Python
+# process. For files with millions of rows this module splits the input
+# into shards and scores them on a ProcessPoolExecutor:
+# - a CSV file is split into byte ranges that end on row boundaries; the
+#   parent only counts quote and newline bytes, and each worker reads,
+#   parses (csv + JSON distances) and prices the rows of its own range
+# - in-memory rentals are sent as plain tuples of their scoring inputs, not
+#   as pickled RentalProperty objects with their Validator and Coordinates
+#   inside; each worker builds the NumPy columns and prices its own chunk
+# - rows with a tombstone in the CSV's "<file>.tombstones" log are skipped,
+#   as PropertyManager.iter_rows() skips them
+# - workers run the vectorized ScoreCalculator.score_batch() on each shard
+# - results come back in submission order and are concatenated, so row i
+#   of the output is always input row i
+#
+# The weights and the resolved reference-price table (which may come from a
+# live MarketAverages) are sent once per worker through the pool initializer,
+# not with every task.
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+import csv
+import io
+import json
+import os
+
+import numpy as np
+
+from listing_manager import PropertyManager
+from market_stats import MarketAverages
+from score_calculator import ScoreCalculator
+
+
+SCORE_COLUMNS = ("price", "flexibility", "commute", "type", "overall")
+
+_worker = {}  # per-process state set by _init_worker
+
+
+def _init_worker(config: dict, table: dict, path: str = None, fieldnames: list = None,
+                 dead: dict = None) -> None:
+    """Pool initializer: build the calculator and keep the shared lookup data."""
+    _worker["calculator"] = ScoreCalculator(config["average_price"], weights=config["weights"])
+    _worker["table"] = table
+    _worker["path"] = path
+    _worker["fieldnames"] = fieldnames
+    _worker["dead"] = dead or {}
+
+
+def _score_chunk(records: list) -> dict:
+    """Worker entry point: build the columns of one chunk of rentals and score them."""
+    columns = _record_columns(records, _worker["table"])
+    return _worker["calculator"].score_batch(**columns)
+
+
+def _score_shard(start: int, end: int, first_line: int, first_row: int) -> dict:
+    """Worker entry point: read, parse and score the CSV rows in bytes [start, end)."""
+    with open(_worker["path"], "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+    reader = csv.DictReader(io.StringIO(text, newline=""), fieldnames=_worker["fieldnames"])
+    columns = _row_columns(reader, _worker["table"], first_line, first_row, _worker["dead"])
+    return _worker["calculator"].score_batch(**columns)
+
+
+def _batches(iterable, size: int):
+    """Yield lists of up to size items from any iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _rental_record(rental) -> tuple:
+    """The scoring inputs of a RentalProperty, as a small picklable tuple."""
+    property_type = rental.property_type_obj
+    return (rental.rent, rental.lease_term, rental.distances, property_type.type_score(),
+            rental.zipcode, property_type.type_key)
+
+
+def _record_columns(records: list, table: dict) -> dict:
+    """Columns for a chunk of _rental_record() tuples."""
+    modes = []
+    for record in records:
+        for mode in record[2]:
+            if mode not in modes:
+                modes.append(mode)
+
+    return {
+        "rent": np.array([record[0] for record in records], dtype=np.float64),
+        "lease_term": np.array([record[1] for record in records], dtype=np.float64),
+        "distances": {
+            mode: np.array([record[2].get(mode, np.nan) for record in records], dtype=np.float64)
+            for mode in modes
+        },
+        "type_score": np.array([record[3] for record in records], dtype=np.float64),
+        "average_price": np.array([MarketAverages.table_price(table, record[4], record[5])
+                                   for record in records], dtype=np.float64)
+    }
+
+
+def _row_columns(reader: csv.DictReader, table: dict, first_line: int, first_row: int = 0,
+                 dead: dict = None) -> dict:
+    """
+    Columns for the saved listing rows of one shard (the add_rental() CSV format).
+
+    Rows whose data row number is in dead under their own listing key (see
+    PropertyManager.read_tombstones()) are skipped.
+
+    Raises:
+        ValueError: If a row is missing or has an invalid scoring column.
+    """
+    rent, lease_term, type_score, average_price = [], [], [], []
+    distances = {}
+    dead = dead or {}
+
+    for row_number, row in enumerate(reader, first_row):
+        if row_number in dead and dead[row_number] == PropertyManager.listing_key(row):
+            continue
+        offset = len(rent)
+        try:
+            rent.append(float(str(row["Rent"]).replace("$", "").replace(",", "")))
+            lease_term.append(float(row["Lease Term"]))
+            type_score.append(float(row["Type Score"]))
+            row_distances = json.loads(row.get("Distances") or "{}")
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid listing row on line {first_line + reader.line_num - 1}.")
+
+        for mode, miles in row_distances.items():
+            if mode not in distances:
+                distances[mode] = [np.nan] * offset  # NaN-padded so each mode column lines up with the rows
+            distances[mode].append(float(miles))
+        for column in distances.values():
+            if len(column) == offset:
+                column.append(np.nan)
+
+        average_price.append(MarketAverages.table_price(table, row.get("ZIP"), row.get("Property Type")))
+
+    return {
+        "rent": np.array(rent),
+        "lease_term": np.array(lease_term),
+        "distances": {mode: np.array(miles) for mode, miles in distances.items()},
+        "type_score": np.array(type_score),
+        "average_price": np.array(average_price)
+    }
+
+
+def _shards(path: Path, data_start: int, first_line: int, shard_bytes: int,
+            block_size: int = 1 << 20) -> list:
+    """
+    Split the data rows of a CSV file into byte ranges of about shard_bytes.
+
+    Each range ends just after a newline that is outside every quoted field,
+    so it holds whole rows. Only quote and newline bytes are counted here
+    (vectorized over each block); the rows themselves are parsed by the workers.
+
+    Returns:
+        list[tuple[int, int, int, int]]: (start, end, first line number, first
+        data row number) of each shard.
+    """
+    shards = []
+    start, start_line, start_row = data_start, first_line, 0
+    target = start + shard_bytes
+    position, line, row, quotes = data_start, first_line, 0, 0
+
+    with path.open("rb") as file:
+        file.seek(data_start)
+        for block in iter(lambda: file.read(block_size), b""):
+            data = np.frombuffer(block, dtype=np.uint8)
+            newlines = np.flatnonzero(data == ord("\n"))
+            quoted = np.cumsum(data == ord('"'))
+            row_ends = newlines[(quotes + quoted[newlines]) % 2 == 0]  # not inside a quoted field
+
+            index = int(np.searchsorted(row_ends, target - position))
+            while index < len(row_ends):
+                cut = int(row_ends[index]) + 1
+                end = position + cut
+                shards.append((start, end, start_line, start_row))
+                start = end
+                start_line = line + int(np.searchsorted(newlines, cut))
+                start_row = row + index + 1
+                target = end + shard_bytes
+                index = int(np.searchsorted(row_ends, target - position))
+
+            quotes += int(quoted[-1])
+            line += len(newlines)
+            row += len(row_ends)
+            position += len(block)
+
+    if position > start:
+        shards.append((start, position, start_line, start_row))
+    return shards
+
+
+def _run(function, tasks, initargs: tuple, workers: int | None) -> dict:
+    """Run tasks (in a pool unless workers == 1) and merge the score columns in order."""
+    workers = workers or os.cpu_count() or 1
+    results = []
+
+    if workers == 1:
+        _init_worker(*initargs)
+        try:
+            results = [function(*task) for task in tasks]
+        finally:
+            _worker.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            # At most 2 x workers tasks are in memory or in flight at once
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(function, *task))
+                if len(pending) >= 2 * workers:
+                    results.append(pending.popleft().result())
+            while pending:
+                results.append(pending.popleft().result())
+
+    if not results:
+        return {name: np.empty(0) for name in SCORE_COLUMNS}
+    return {name: np.concatenate([result[name] for result in results]) for name in SCORE_COLUMNS}
+
+
+def _config(calculator: ScoreCalculator) -> dict:
+    """Calculator settings a worker needs to rebuild it."""
+    return {"average_price": calculator.average_price, "weights": calculator.weights}
+
+
+def score_parallel(rentals, calculator: ScoreCalculator = None, workers: int = None,
+                   chunk_size: int = 50000) -> dict:
+    """
+    Score many RentalProperty objects across processes.
+
+    Args:
+        rentals (Iterable[RentalProperty]): Rentals to score (consumed lazily).
+        calculator (ScoreCalculator | None): Weights, average price and market to use.
+        workers (int | None): Process count (default: all cores; 1 runs in-process).
+        chunk_size (int): Rentals per chunk.
+
+    Returns:
+        dict: 'price', 'flexibility', 'commute', 'type' and 'overall' arrays in input order.
+
+    Raises:
+        ValueError: If chunk_size is not positive or a rental cannot be scored.
+
+    Example:
+        scores = score_parallel(rentals, ScoreCalculator(), workers=8)
+        scores["overall"]
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive.")
+    calculator = calculator or ScoreCalculator()
+    chunks = (([_rental_record(rental) for rental in batch],) for batch in _batches(rentals, chunk_size))
+    return _run(_score_chunk, chunks, (_config(calculator), calculator.reference_table()), workers)
+
+
+def score_csv_parallel(filename: str, calculator: ScoreCalculator = None, workers: int = None,
+                       chunk_size: int = 50000) -> dict:
+    """
+    Score every row of a saved listings CSV across processes.
+
+    The parent process only finds row boundaries; each worker reads, parses
+    and scores its own byte range of about chunk_size rows. Rows deleted
+    through the file's tombstone log are skipped, so the output lines up
+    with PropertyManager.iter_rows(filename). Rows need Rent,
+    Lease Term, Type Score and Distances (JSON) columns, as written by
+    PropertyManager.add_rental() / save_to_csv().
+
+    Args:
+        filename (str): Listings CSV.
+        calculator (ScoreCalculator | None): Weights, average price and market to use.
+        workers (int | None): Process count (default: all cores; 1 runs in-process).
+        chunk_size (int): Approximate rows per shard.
+
+    Returns:
+        dict: 'price', 'flexibility', 'commute', 'type' and 'overall' arrays in file order.
+
+    Raises:
+        ValueError: If the file is missing, chunk_size is not positive, or a row is invalid.
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive.")
+    file_path = Path(filename)
+    if not file_path.exists():
+        raise ValueError(f"CSV file not found: {filename}")
+    calculator = calculator or ScoreCalculator()
+
+    with file_path.open("rb") as file:
+        header = file.readline()
+        data_start = file.tell()
+        sample = file.read(1 << 16)  # row length estimate for the shard size
+    if not header.strip():
+        return {name: np.empty(0) for name in SCORE_COLUMNS}
+
+    fieldnames = next(csv.reader([header.decode("utf-8")]))
+    row_bytes = len(sample) / max(1, sample.count(b"\n"))
+    shards = _shards(file_path, data_start, 1 + header.count(b"\n"),
+                     max(1, int(chunk_size * row_bytes)))
+    initargs = (_config(calculator), calculator.reference_table(), str(file_path), fieldnames,
+                PropertyManager.read_tombstones(file_path))
+    return _run(_score_shard, shards, initargs, workers)
@@ -0,0 +1,278 @@
+# Ranking helpers for scored listings.
+#
+# Views only ever show the best 10-50 rentals, so sorting the full
+# candidate list is wasted work. top_k() streams (score, item) pairs through
+# a bounded min-heap: O(K) memory and O(n log K) time, and it accepts any
+# iterator, so rentals can be scored on the fly without building a list.
+#
+# Ties are broken by arrival order (the earlier item ranks higher), which
+# keeps results identical to a stable sort by descending score.
+#
+# SortedIndex keeps items ordered by a numeric field as they are added and
+# removed (an indexable skiplist), so rankings, rank lookups, score ranges
+# and pages never need a re-sort. PropertyManager maintains one index on
+# "Overall Score" and one on "Rent".
+
+from collections.abc import Sequence
+from itertools import count
+import heapq
+import random
+
+
+def top_k(scored, k: int) -> list:
+    """
+    Return the k highest-scoring items, best first.
+
+    Args:
+        scored (Iterable[tuple[float, Any]]): (score, item) pairs.
+        k (int): Number of items to keep.
+
+    Returns:
+        list[tuple[float, Any]]: Up to k (score, item) pairs, highest score first;
+            equal scores keep their input order.
+
+    Raises:
+        ValueError: If k is not positive.
+
+    Examples:
+        >>> top_k([(7.5, "a"), (9.1, "b"), (7.5, "c"), (3.0, "d")], 3)
+        [(9.1, 'b'), (7.5, 'a'), (7.5, 'c')]
+    """
+    if k <= 0:
+        raise ValueError("k must be positive.")
+
+    # Min-heap of (score, -arrival, item): the root is the weakest kept item,
+    # and among equal scores the latest arrival is the weakest
+    heap = []
+    arrival = count()
+    for score, item in scored:
+        entry = (score, -next(arrival), item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    heap.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+    return [(score, item) for score, _, item in heap]
+
+
+class _Node:
+    """Skiplist node: next[level] links and the number of positions each link skips."""
+
+    __slots__ = ("key", "item", "next", "width")
+
+    def __init__(self, key, item, levels: int):
+        self.key = key
+        self.item = item
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class SortedIndex(Sequence):
+    """Items ordered by a numeric field, updated in O(log n) per insert/remove.
+
+    Items are kept by identity (dicts work), highest value first by default.
+    Equal values keep insertion order, like a stable sort.
+
+    Example:
+        index = SortedIndex(lambda listing: float(listing["Overall Score"]))
+        index.insert(listing)
+        index[0]                 # best listing
+        index.rank(listing)      # 0-based position
+        index.between(7.0, 9.0)  # listings scoring 7-9
+        index.page(2, 10)        # listings 11-20
+    """
+
+    MAX_LEVELS = 32
+
+    def __init__(self, value, descending: bool = True, rng=None):
+        """
+        Args:
+            value (callable): Returns the numeric sort value of an item.
+            descending (bool): Highest value first (True) or lowest first.
+            rng (random.Random | None): Level generator (injectable for tests).
+        """
+        self._value = value
+        self._descending = descending
+        self._random = (rng or random.Random()).random
+        self._head = _Node(None, None, self.MAX_LEVELS)
+        self._keys = {}  # id(item) -> key
+        self._sequence = count()
+
+    # ----------
+    # Maintenance
+    # ----------
+
+    def _sort_value(self, value: float) -> float:
+        return -value if self._descending else value
+
+    def insert(self, item) -> None:
+        """Add an item (re-inserting an item moves it to its current value)."""
+        self.remove(item)
+        key = (self._sort_value(float(self._value(item))), next(self._sequence))
+
+        chain = [None] * self.MAX_LEVELS
+        steps_at_level = [0] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        levels = 1
+        while levels < self.MAX_LEVELS and self._random() < 0.5:
+            levels += 1
+
+        new_node = _Node(key, item, levels)
+        steps = 0
+        for level in range(levels):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+
+        self._keys[id(item)] = key
+
+    def remove(self, item) -> bool:
+        """
+        Remove an item.
+
+        Returns:
+            bool: True if the item was indexed.
+        """
+        key = self._keys.pop(id(item), None)
+        if key is None:
+            return False
+
+        chain = [None] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        return True
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self._head = _Node(None, None, self.MAX_LEVELS)
+        self._keys.clear()
+
+    # ----------
+    # Lookups
+    # ----------
+
+    def _position(self, key) -> int:
+        """Number of items ordered before key."""
+        node = self._head
+        position = 0
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def _node_at(self, index: int) -> _Node:
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def _walk(self, start: int, stop: int) -> list:
+        """Items at positions start..stop-1 (one O(log n) seek, then a linear walk)."""
+        items = []
+        if start >= stop:
+            return items
+        node = self._node_at(start)
+        for _ in range(stop - start):
+            items.append(node.item)
+            node = node.next[0]
+        return items
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._walk(start, stop)
+            return [self[i] for i in range(start, stop, step)]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Index out of range.")
+        return self._node_at(index).item
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, item) -> bool:
+        return id(item) in self._keys
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node.item
+            node = node.next[0]
+
+    def rank(self, item) -> int:
+        """
+        Return an item's 0-based position (0 = first in sort order).
+
+        Raises:
+            ValueError: If the item is not indexed.
+        """
+        key = self._keys.get(id(item))
+        if key is None:
+            raise ValueError("Item is not in the index.")
+        return self._position(key)
+
+    def index(self, item, *args) -> int:
+        """Same as rank(); overrides Sequence.index's linear scan."""
+        return self.rank(item)
+
+    def between(self, low: float, high: float) -> list:
+        """
+        Return the items whose value lies in [low, high], in sort order.
+
+        Raises:
+            ValueError: If low is greater than high.
+        """
+        if low > high:
+            raise ValueError("Range low bound cannot exceed the high bound.")
+
+        first, last = (high, low) if self._descending else (low, high)
+        start = self._position((self._sort_value(first), -1))
+        stop = self._position((self._sort_value(last), float("inf")))
+        return self._walk(start, stop)
+
+    def page(self, number: int, size: int = 10) -> list:
+        """
+        Return one page of items (pages are numbered from 1).
+
+        Raises:
+            ValueError: If number or size is not positive.
+        """
+        if number < 1 or size < 1:
+            raise ValueError("Page number and size must be positive.")
+        start = (number - 1) * size
+        return self[start:start + size]
+
+    def __str__(self) -> str:
+        order = "descending" if self._descending else "ascending"
+        return f"SortedIndex({len(self)} items, {order})"
+
@@ -0,0 +1,414 @@
+# Memory-mapped fixed-width record file for random access to saved listings.
+#
+# Reading one saved listing from a CSV means parsing the file up to that
+# row, and changing its score means rewriting the file. RecordStore keeps
+# three files instead, all accessed through mmap:
+# - "<path>": a header plus one fixed-width record per listing (live flag,
+#   address hash, overall score, rent, and where its data lives)
+# - "<path>.strings": the variable-length part of every listing (its fields
+#   as UTF-8 JSON), appended and never rewritten
+# - "<path>.index": an open-addressing hash table from the normalized
+#   address to record numbers
+# Reading listing n touches one record and one string; a lookup by address
+# probes a few index slots; update_score() and delete() overwrite a few bytes
+# of one record in place, and replace() appends a superseding record. The
+# records and strings files grow by doubling, so an append only remaps a file
+# when it runs out of room. Cost does not grow with the file size.
+
+from pathlib import Path
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+
+from function_library import address_key
+
+
+RECORDS_MAGIC = b"LREC"
+STRINGS_MAGIC = b"LSTR"
+INDEX_MAGIC = b"LIDX"
+FORMAT_VERSION = 1
+
+# magic, version, record size, records written, records deleted
+_RECORDS_HEADER = struct.Struct("<4sHHQQ")
+# live flag, address hash, overall score, rent, data offset, data length
+_RECORD = struct.Struct("<B7xQddQI4x")
+_SCORE_OFFSET = 16  # byte offset of the overall score inside a record
+# magic, version, capacity (slots), slots used
+_INDEX_HEADER = struct.Struct("<4sHxxQQ")
+# address hash, record number + 1 (0 marks an empty slot)
+_SLOT = struct.Struct("<QQ")
+
+_LIVE = 1
+_MIN_CAPACITY = 1024
+_MAX_LOAD = 0.5
+
+# Fields kept in the fixed-width record (the JSON keeps their position only)
+_SCORE_FIELD = "Overall Score"
+
+
+def _key_hash(key: str) -> int:
+    """Stable 64-bit hash of an address key (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _as_float(value) -> float:
+    """Stored value ("$1,200", "7.5", 7.5) as float, NaN if missing or invalid."""
+    try:
+        return float(str(value).replace("$", "").replace(",", ""))
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class RecordStore:
+    """
+    Fixed-width listing records with an on-disk address index.
+
+    Example:
+        with RecordStore("rentals.rec") as store:
+            number = store.append(listing)
+            store.get(number)
+            store.find("4500 Knox Rd, College Park, MD")
+            store.update_score(number, 8.25)
+    """
+
+    def __init__(self, path: str = "rentals.rec"):
+        """
+        Open (or create) a record store.
+
+        Args:
+            path (str): Records file; the string and index files sit next to it.
+
+        Raises:
+            ValueError: If an existing file is not a record store of this version.
+        """
+        self._path = Path(path)
+        self._strings_path = Path(f"{path}.strings")
+        self._index_path = Path(f"{path}.index")
+
+        if not self._path.exists():
+            self._path.write_bytes(_RECORDS_HEADER.pack(RECORDS_MAGIC, FORMAT_VERSION, _RECORD.size, 0, 0))
+            self._strings_path.write_bytes(STRINGS_MAGIC)
+            self._write_index(self._index_path, _MIN_CAPACITY, [])
+
+        with self._path.open("rb") as file:
+            header = file.read(_RECORDS_HEADER.size)
+        if (len(header) < _RECORDS_HEADER.size
+                or _RECORDS_HEADER.unpack(header)[:3] != (RECORDS_MAGIC, FORMAT_VERSION, _RECORD.size)):
+            raise ValueError(f"Not a version {FORMAT_VERSION} record store: {path}")
+        if not (self._strings_path.exists() and self._index_path.exists()):
+            raise ValueError(f"Record store is missing its .strings or .index file: {path}")
+
+        self._records_file = self._path.open("r+b")
+        self._strings_file = self._strings_path.open("r+b")
+        self._index_file = self._index_path.open("r+b")
+        self._records = self._strings = self._index = None
+        self._remap()
+
+    # ----------
+    # File mapping
+    # ----------
+
+    def _remap(self) -> None:
+        """(Re)map every file after it grew."""
+        for mapped in (self._records, self._strings, self._index):
+            if mapped is not None:
+                mapped.close()
+        self._records = mmap.mmap(self._records_file.fileno(), 0)
+        self._strings = mmap.mmap(self._strings_file.fileno(), 0)
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+
+    @staticmethod
+    def _grown(mapped: mmap.mmap, file, needed: int) -> mmap.mmap:
+        """
+        A mapping of file with room for at least `needed` bytes.
+
+        The file is at least doubled when it grows (the tail is zero-filled
+        until records are written there), so n appends remap O(log n) times.
+        """
+        size = len(mapped)
+        if needed <= size:
+            return mapped
+        mapped.close()
+        file.truncate(max(needed, 2 * size))
+        return mmap.mmap(file.fileno(), 0)
+
+    def _strings_end(self) -> int:
+        """End of the used part of the strings file: the end of the last record's data."""
+        written = self._header()[0]
+        if not written:
+            return len(STRINGS_MAGIC)
+        offset, length = _RECORD.unpack_from(self._records, _RECORDS_HEADER.size + (written - 1) * _RECORD.size)[4:]
+        return offset + length
+
+    def _header(self) -> tuple:
+        """(records written, records deleted)."""
+        return _RECORDS_HEADER.unpack_from(self._records, 0)[3:]
+
+    def _set_header(self, written: int, deleted: int) -> None:
+        _RECORDS_HEADER.pack_into(self._records, 0, RECORDS_MAGIC, FORMAT_VERSION,
+                                  _RECORD.size, written, deleted)
+
+    def _record(self, number: int) -> tuple:
+        """Unpack record n (range-checked)."""
+        written = self._header()[0]
+        if number < 0:
+            number += written
+        if not 0 <= number < written:
+            raise IndexError("Record number out of range.")
+        return number, _RECORD.unpack_from(self._records, _RECORDS_HEADER.size + number * _RECORD.size)
+
+    # ----------
+    # Hash index
+    # ----------
+
+    @staticmethod
+    def _write_index(path: Path, capacity: int, entries) -> None:
+        """Write a fresh index file with (hash, record number) entries, atomically."""
+        table = bytearray(_INDEX_HEADER.size + capacity * _SLOT.size)
+        mask = capacity - 1
+        used = 0
+        for key_hash, number in entries:
+            slot = key_hash & mask
+            while _SLOT.unpack_from(table, _INDEX_HEADER.size + slot * _SLOT.size)[1]:
+                slot = (slot + 1) & mask
+            _SLOT.pack_into(table, _INDEX_HEADER.size + slot * _SLOT.size, key_hash, number + 1)
+            used += 1
+        _INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, FORMAT_VERSION, capacity, used)
+
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_bytes(table)
+        os.replace(temp_path, path)
+
+    def _index_insert(self, key_hash: int, number: int) -> None:
+        _, _, capacity, used = _INDEX_HEADER.unpack_from(self._index, 0)
+        mask = capacity - 1
+        slot = key_hash & mask
+        while _SLOT.unpack_from(self._index, _INDEX_HEADER.size + slot * _SLOT.size)[1]:
+            slot = (slot + 1) & mask
+        _SLOT.pack_into(self._index, _INDEX_HEADER.size + slot * _SLOT.size, key_hash, number + 1)
+        _INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, FORMAT_VERSION, capacity, used + 1)
+
+    def _reserve(self, extra: int) -> None:
+        """Grow (rebuild) the index if adding `extra` entries would pass the load limit."""
+        _, _, capacity, used = _INDEX_HEADER.unpack_from(self._index, 0)
+        if used + extra <= capacity * _MAX_LOAD:
+            return
+
+        live = [(key_hash, number) for number, (flags, key_hash) in enumerate(self._scan_keys())
+                if flags == _LIVE]
+        while len(live) + extra > capacity * _MAX_LOAD:
+            capacity *= 2
+
+        self._index.close()
+        self._index_file.close()
+        self._write_index(self._index_path, capacity, live)
+        self._index_file = self._index_path.open("r+b")
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+
+    def _scan_keys(self):
+        """Yield (flags, address hash) of every record, in order."""
+        for number in range(self._header()[0]):
+            flags, key_hash = _RECORD.unpack_from(self._records, _RECORDS_HEADER.size + number * _RECORD.size)[:2]
+            yield flags, key_hash
+
+    def find(self, address: str) -> list[int]:
+        """
+        Record numbers of live listings at an address (any capitalization/spacing).
+
+        Only the probed index slots and the candidate records are read.
+        """
+        key = address_key(address)
+        key_hash = _key_hash(key)
+        _, _, capacity, _ = _INDEX_HEADER.unpack_from(self._index, 0)
+        mask = capacity - 1
+
+        numbers = []
+        slot = key_hash & mask
+        while True:
+            slot_hash, stored = _SLOT.unpack_from(self._index, _INDEX_HEADER.size + slot * _SLOT.size)
+            if not stored:
+                break
+            if slot_hash == key_hash:
+                number = stored - 1
+                flags = _RECORD.unpack_from(self._records, _RECORDS_HEADER.size + number * _RECORD.size)[0]
+                # Confirm the address, in case two keys share a 64-bit hash
+                if flags == _LIVE and address_key(self.get(number).get("Address", "")) == key:
+                    numbers.append(number)
+            slot = (slot + 1) & mask
+        return sorted(numbers)
+
+    def lookup(self, address: str) -> list[dict]:
+        """Every live listing at an address."""
+        return [self.get(number) for number in self.find(address)]
+
+    # ----------
+    # Writes
+    # ----------
+
+    def append(self, listing: dict) -> int:
+        """Store one listing; returns its record number."""
+        return self.append_many([listing])[0]
+
+    def append_many(self, listings) -> list[int]:
+        """
+        Store listings after the last record (one copy into each mapping).
+
+        Args:
+            listings (Iterable[dict]): Listings to add.
+
+        Returns:
+            list[int]: The new record numbers, in input order.
+        """
+        listings = list(listings)
+        if not listings:
+            return []
+        self._reserve(len(listings))
+
+        written, deleted = self._header()
+        start = offset = self._strings_end()
+        records, blobs, keys = bytearray(), [], []
+        for listing in listings:
+            # A numeric score lives in the record; the JSON only keeps its column position
+            score = _as_float(listing.get(_SCORE_FIELD))
+            fields = dict(listing)
+            if not math.isnan(score):
+                fields[_SCORE_FIELD] = None
+            blob = json.dumps(fields).encode("utf-8")
+            key_hash = _key_hash(address_key(listing.get("Address", "")))
+            records += _RECORD.pack(_LIVE, key_hash, score, _as_float(listing.get("Rent")),
+                                    offset, len(blob))
+            blobs.append(blob)
+            keys.append(key_hash)
+            offset += len(blob)
+
+        position = _RECORDS_HEADER.size + written * _RECORD.size
+        self._records = self._grown(self._records, self._records_file, position + len(records))
+        self._strings = self._grown(self._strings, self._strings_file, offset)
+        self._records[position:position + len(records)] = records
+        self._strings[start:offset] = b"".join(blobs)
+
+        numbers = list(range(written, written + len(listings)))
+        for key_hash, number in zip(keys, numbers):
+            self._index_insert(key_hash, number)
+        self._set_header(written + len(listings), deleted)
+        return numbers
+
+    def update_score(self, number: int, score: float) -> None:
+        """
+        Overwrite a listing's overall score in place (8 bytes of one record).
+
+        Only the score changes; use replace() when other fields changed too.
+
+        Raises:
+            IndexError: If the record does not exist or was deleted.
+        """
+        number, record = self._record(number)
+        if record[0] != _LIVE:
+            raise IndexError("Record was deleted.")
+        struct.pack_into("<d", self._records,
+                         _RECORDS_HEADER.size + number * _RECORD.size + _SCORE_OFFSET, float(score))
+
+    def replace(self, number: int, listing: dict) -> int:
+        """
+        Supersede a listing: append its new version and delete the old record.
+
+        Returns:
+            int: The record number of the new version.
+
+        Raises:
+            IndexError: If the record does not exist or was deleted.
+        """
+        number, record = self._record(number)
+        if record[0] != _LIVE:
+            raise IndexError("Record was deleted.")
+        new_number = self.append(listing)
+        self.delete(number)
+        return new_number
+
+    def delete(self, number: int) -> bool:
+        """
+        Mark a record deleted (its flag byte only; space is not reclaimed).
+
+        Returns:
+            bool: True if the record was live.
+        """
+        number, record = self._record(number)
+        if record[0] != _LIVE:
+            return False
+        self._records[_RECORDS_HEADER.size + number * _RECORD.size] = 0
+        written, deleted = self._header()
+        self._set_header(written, deleted + 1)
+        return True
+
+    # ----------
+    # Reads
+    # ----------
+
+    def get(self, number: int) -> dict:
+        """
+        Read one listing by record number (negative numbers count from the end).
+
+        Raises:
+            IndexError: If the record does not exist or was deleted.
+        """
+        _, (flags, _, score, _, offset, length) = self._record(number)
+        if flags != _LIVE:
+            raise IndexError("Record was deleted.")
+
+        listing = json.loads(self._strings[offset:offset + length])
+        if not math.isnan(score):
+            listing[_SCORE_FIELD] = score
+        return listing
+
+    def score(self, number: int) -> float:
+        """
+        Overall score of a record, read from the record alone.
+
+        Raises:
+            IndexError: If the record does not exist or was deleted.
+        """
+        flags, _, score = self._record(number)[1][:3]
+        if flags != _LIVE:
+            raise IndexError("Record was deleted.")
+        return score
+
+    def __iter__(self):
+        """Yield (record number, listing) for every live record."""
+        for number, (flags, _) in enumerate(self._scan_keys()):
+            if flags == _LIVE:
+                yield number, self.get(number)
+
+    def __len__(self) -> int:
+        written, deleted = self._header()
+        return written - deleted
+
+    # ----------
+    # Lifecycle
+    # ----------
+
+    def flush(self) -> None:
+        """Write mapped changes back to disk."""
+        for mapped in (self._records, self._strings, self._index):
+            mapped.flush()
+
+    def close(self) -> None:
+        """Flush and close every file."""
+        for mapped in (self._records, self._strings, self._index):
+            if mapped is not None and not mapped.closed:
+                mapped.flush()
+                mapped.close()
+        for file in (self._records_file, self._strings_file, self._index_file):
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self.close()
+        return False
+
+    def __str__(self):
+        return f"RecordStore({self._path}, {len(self)} listings)"
@@ -18,17 +18,23 @@ class RentalProperty:
         _rent (float): Validated rent amount
         _zipcode (int): 5 digit zipcode   
         _utilities_included (bool): Whether utilities are included in rent
-        _coordinates (tuple): (latitude, longitude) of the property
+        _location (Coordinates): Lazily geocoded (latitude, longitude) of the property
         _validator (Validator): Validator instance for data validation
     """
 
-    def __init__(self, address, rent, zipcode, utilities_included, property_type_name, lease_term, distances: dict = None):
+    def __init__(self, address, rent, zipcode, utilities_included, property_type_name, lease_term, distances: dict = None,
+                 coordinates: tuple = None, geocoded_at: str = None, lazy_coordinates: bool = True):
         """Initialize a rental property with validation and formatting
         Args:
             address (str): Full rental address.
             rent (float): Monthly rent amount.
             zipcode (int): 5-digit ZIP code for the property.
             utilities_included (bool): Whether utilities are included.
+            coordinates (tuple | None): Previously resolved (latitude, longitude).
+                When given, the address is not geocoded again.
+            geocoded_at (str | None): When the given coordinates were resolved.
+            lazy_coordinates (bool): If True (default), geocoding is deferred until
+                .coordinates is first read. If False, the address is geocoded now.
 
         Raises:
             TypeError: If an argument has an incorrect data type.
@@ -37,13 +43,18 @@ class RentalProperty:
 
         # Create helper objects
         self._validator = Validator()
-        self._coordinates = None  # Will be set after address validation
+        self._location = None  # Will be set after address validation
+        self._lazy_coordinates = lazy_coordinates
 
         # Validate and set address
         if self._validator.validate_address(address):
             self._address = format_address(address)
-            # Initialize Coordinates object after address is validated
-            self._coordinates = Coordinates(self._address).coordinates
+            if coordinates is not None:
+                # Trusted coordinates (e.g. restored from CSV): no network call
+                self._location = Coordinates.from_saved(self._address, coordinates, geocoded_at)
+            else:
+                # Initialize Coordinates object after address is validated
+                self._location = Coordinates(self._address, lazy=self._lazy_coordinates)
 
         
         # Validate and set rent
@@ -104,7 +115,7 @@ class RentalProperty:
         if self._validator.validate_address(new_address):
             self._address = format_address(new_address)
             # Update coordinates when address changes
-            self._coordinates = Coordinates(self._address).coordinates
+            self._location = Coordinates(self._address, lazy=self._lazy_coordinates)
 
         
     # Rent Getter 
@@ -157,9 +168,16 @@ class RentalProperty:
     # Coordinates Getter
     @property 
     def coordinates(self):
-        """Returns the (latitude, longitude) tuple for the rental property"""
-        return self._coordinates
+        """Returns the (latitude, longitude) tuple for the rental property
+        (geocodes the address on first read in lazy mode)"""
+        return self._location.coordinates
     
+    # Geocode Timestamp Getter
+    @property
+    def geocoded_at(self):
+        """Returns when the coordinates were resolved (ISO-8601 UTC), or None"""
+        return self._location.geocoded_at
+
     # Summary Method for saving or exporting data 
     def summary(self):
          """Returns a summary representation of the property
@@ -171,7 +189,7 @@ class RentalProperty:
             "rent": format_rent_display(self._rent),
             "zipcode": self._zipcode,
             "utilities_included": self._utilities_included,
-            "coordinates": self._coordinates
+            "coordinates": self.coordinates
             }                 
     
     def __str__(self):
@@ -198,7 +216,24 @@ class RentalProperty:
             "Lease Term": self.lease_term,
             "Property Type": self.property_type_obj.type_key,  # Use type_key for reconstruction
             "Type Score": self.property_type_obj.type_score(),
-            "Distances": json.dumps(self.distances)
+            "Distances": json.dumps(self.distances),
+            **self.coordinate_fields()
+        }
+
+    def coordinate_fields(self) -> dict:
+        """
+        Return the persisted coordinate columns (Latitude, Longitude, Geocoded At).
+        Missing values are written as empty strings so CSV rows stay aligned.
+        Exporting never triggers a pending lazy lookup.
+        """
+        if not self._location.resolved:
+            return {"Latitude": "", "Longitude": "", "Geocoded At": ""}
+
+        latitude, longitude = self._location.coordinates
+        return {
+            "Latitude": latitude,
+            "Longitude": longitude,
+            "Geocoded At": self._location.geocoded_at or ""
         }
     
 
@@ -207,6 +242,10 @@ class RentalProperty:
         """
         Reconstruct a RentalProperty object from saved CSV data.
         Used when loading persisted data from disk.
+
+        Rows that carry Latitude/Longitude take the trusted restore path:
+        the saved coordinates are reused and no geocoding request is made.
+        Older rows without coordinates fall back to a normal lookup.
         """
 
 
@@ -220,6 +259,11 @@ class RentalProperty:
                 distances = {}
 
 
+        # Saved coordinates (written by to_dict / add_rental)
+        coordinates = None
+        if data.get("Latitude") not in (None, "") and data.get("Longitude") not in (None, ""):
+            coordinates = (float(data["Latitude"]), float(data["Longitude"]))
+
         # -----------------------------
         # Recreate RentalProperty object
         # -----------------------------
@@ -231,6 +275,8 @@ class RentalProperty:
             utilities_included=str(data["Utilities Included"]).lower() in ["true", "1", "yes"],
             property_type_name=data["Property Type"],
             lease_term=int(data["Lease Term"]),
-            distances=distances
+            distances=distances,
+            coordinates=coordinates,
+            geocoded_at=data.get("Geocoded At") or None
         )
 
@@ -10,6 +10,13 @@ from function_library import (
 )
 
 from property import Property
+from distance_matrix import commute_score_matrix, round_like_python
+from skyline import Skyline
+
+from collections import OrderedDict
+import hashlib
+import json
+import numpy as np
 
 class ScoreCalculator:
     """ 
@@ -20,27 +27,111 @@ class ScoreCalculator:
     convenience and crime safety metrics.
     """
 
-    def __init__(self, average_price: float = 1500.0):
+    # Bump when the scoring formulas change, so persisted scores are recomputed
+    SCORING_VERSION = 1
+
+    # Default weight of each component in the overall score
+    WEIGHTS = {
+        'price': 0.5,
+        'flexibility': 0.2,
+        'commute': 0.3,
+        'type': 0.1
+    }
+
+    def __init__(self, average_price: float = 1500.0, weights: dict = None, market=None,
+                 max_cached: int = 50000):
         """ Initialize with default average rent score 
         Args:
             average_price (float): Average rent price for comparison actuall rent price.
             default is 1500.0
+            weights (dict | None): Component weights overriding WEIGHTS
+            (any of 'price', 'flexibility', 'commute', 'type').
+            market (MarketAverages | None): Live per-ZIP/type rent statistics. When
+            given, rents are compared against their market instead of average_price
+            (which stays the fallback for thin markets).
+            max_cached (int): Most component-score entries kept (least recently
+            used are dropped first).
         """
+        if max_cached < 1:
+            raise ValueError("Cache size must be positive.")
         self._average_price = float(average_price)
+        self._market = market
+        self._weights = dict(self.WEIGHTS)
+        self._max_cached = int(max_cached)
+        self._component_cache = OrderedDict()  # content hash -> component scores (LRU order)
+        self._ranked = None  # component matrix of the last ranked rentals (see _component_columns)
+        if weights:
+            self.set_weights(**weights)
+
+    # ----------
+    # Weights
+    # ----------
+
+    @property
+    def average_price(self) -> float:
+        """Returns the fallback average rent used for price scores."""
+        return self._average_price
+
+    @property
+    def weights(self) -> dict:
+        """Returns a copy of the current component weights."""
+        return dict(self._weights)
+
+    def set_weights(self, **weights) -> dict:
+        """ Change one or more component weights.
+
+        Cached component scores stay valid, so re-ranking after a weight change
+        only redoes the weighted sum.
+
+        Args:
+            **weights (float): New weights, e.g. set_weights(price=0.3, commute=0.5).
+        Returns:
+            dict: The updated weights.
+        Raises:
+            ValueError: If a component is unknown or a weight is negative.
+            TypeError: If a weight is not numeric.
+        """
+        for name, weight in weights.items():
+            if name not in self.WEIGHTS:
+                raise ValueError(f"Unknown score component: {name}")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                raise TypeError("Weights must be numeric.")
+            if weight < 0:
+                raise ValueError("Weights cannot be negative.")
+
+        self._weights.update({name: float(weight) for name, weight in weights.items()})
+        return self.weights
     
     # Type score (polymorphic)
     def property_type_score(self, property_obj: Property) -> float:
         return property_obj.type_score()
 
+    # Reference price
+    def reference_price(self, zipcode=None, property_type: str = None) -> float:
+        """ Average rent a listing is compared against.
+
+        Args:
+            zipcode (int | str | None): Listing ZIP code.
+            property_type (str | None): Listing type key (e.g. "2x2").
+        Returns:
+            float: The market price for the listing's ZIP and type, or average_price
+            when no market is attached (or it has too few rents).
+        """
+        if self._market is None:
+            return self._average_price
+        return self._market.reference_price(zipcode, property_type, default=self._average_price)
+
     # Price Score
-    def price_score(self, price: float) -> float:
+    def price_score(self, price: float, zipcode=None, property_type: str = None) -> float:
         """ Calculate price score based on rent and average price 
         Args:
             price (float): Actual rent price.
+            zipcode (int | str | None): Listing ZIP code (used with a market).
+            property_type (str | None): Listing type key (used with a market).
         Returns:
             float: Price score between 0 and 10.
         """
-        return calculate_price_score(price, self._average_price)
+        return calculate_price_score(price, self.reference_price(zipcode, property_type))
     
     # Lease Flexibility Score
     def flexibility_score(self, lease_term: int) -> float:
@@ -85,30 +176,384 @@ class ScoreCalculator:
         Returns:
             float: Overall score between 0 and 10."""
 
-        price_s = self.price_score(rental.rent)
-        flex_s = self.flexibility_score(rental.lease_term)
-        commute_s = self.commute_score(rental.distances)
-        type_s = rental.property_type_obj.type_score() # ploymorphic call
-
-        weights = {
-            'price': 0.5,
-            'flexibility': 0.2,
-            'commute': 0.3,
-            'type': 0.1
-        }
+        components = self.component_scores(rental)
+        return self._weighted_score(components)
 
+    def _weighted_score(self, components: dict) -> float:
+        """ Combine component scores with the current weights."""
+        weights = self._weights
 
         overall = (
-            price_s * weights['price'] +
-            flex_s * weights['flexibility'] +
-            commute_s * weights['commute'] +
-            type_s * weights['type']
+            components['price'] * weights['price'] +
+            components['flexibility'] * weights['flexibility'] +
+            components['commute'] * weights['commute'] +
+            components['type'] * weights['type']
         )
 
         return round(overall, 2)
 
+    # ----------
+    # Component score cache
+    # ----------
 
+    def component_key(self, rental: RentalProperty) -> str:
+        """ Key of everything the component scores depend on.
 
+        Args:
+            rental (RentalProperty): Rental to fingerprint.
+        Returns:
+            str: The rental's rental_hash() (its own scoring inputs) joined with
+            its reference price, so market updates invalidate stale price scores.
+        """
+        reference_price = self.reference_price(rental.zipcode, rental.property_type_obj.type_key)
+        return f"{self.rental_hash(rental)}:{float(reference_price)!r}"
 
+    def component_scores(self, rental: RentalProperty) -> dict:
+        """ Price, flexibility, commute and type scores for a rental (cached).
 
+        Args:
+            rental (RentalProperty): Rental to score.
+        Returns:
+            dict: 'price', 'flexibility', 'commute' and 'type' scores.
+        """
+        return dict(self._cached_components(rental, self.component_key(rental)))
 
+    def _cached_components(self, rental: RentalProperty, key: str) -> dict:
+        """ Component scores of a rental under its component_key() (not copied)."""
+        components = self._component_cache.get(key)
+        if components is None:
+            components = {
+                'price': self.price_score(rental.rent, rental.zipcode, rental.property_type_obj.type_key),
+                'flexibility': self.flexibility_score(rental.lease_term),
+                'commute': self.commute_score(rental.distances),
+                'type': rental.property_type_obj.type_score() # ploymorphic call
+            }
+            self._component_cache[key] = components
+            if len(self._component_cache) > self._max_cached:
+                self._component_cache.popitem(last=False)
+        else:
+            self._component_cache.move_to_end(key)
+        return components
+
+    def scoring_version(self) -> str:
+        """ Identifier of the scoring formulas and configuration.
+
+        Changes whenever SCORING_VERSION, the weights, the average price or
+        the use of a market changes. Market movements are per listing:
+        PropertyManager stores each row's reference price and compares it
+        separately (see PropertyManager.rescore()).
+
+        Returns:
+            str: e.g. "v1-3f2a9c0d1b7e".
+        """
+        config = json.dumps([
+            self.SCORING_VERSION,
+            sorted(self._weights.items()),
+            self._average_price,
+            self._market is not None
+        ])
+        return f"v{self.SCORING_VERSION}-{hashlib.sha1(config.encode('utf-8')).hexdigest()[:12]}"
+
+    @staticmethod
+    def content_hash(address, rent, lease_term, distances: dict, property_type, zipcode) -> str:
+        """ Stable hash of a listing's scoring inputs.
+
+        Values are normalized first, so a RentalProperty and the CSV row it was
+        saved to ("1200.0", "12", JSON distances) hash the same.
+
+        Args:
+            address (str): Listing address (a change means new geocoding).
+            rent (float | str): Monthly rent.
+            lease_term (int | str): Lease term in months.
+            distances (dict): Mode -> miles, in the rental's order.
+            property_type (str): Property type key (e.g. "2x2").
+            zipcode (int | str): ZIP code.
+        Returns:
+            str: Hex digest.
+        """
+        content = json.dumps([
+            str(address).strip(),
+            float(str(rent).replace("$", "").replace(",", "")),
+            int(float(lease_term)),
+            [[mode, float(miles)] for mode, miles in distances.items()],
+            str(property_type).strip(),
+            str(zipcode).strip().zfill(5)
+        ])
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def rental_hash(self, rental: RentalProperty) -> str:
+        """ content_hash() of a RentalProperty."""
+        return self.content_hash(rental.address, rental.rent, rental.lease_term, rental.distances,
+                                 rental.property_type_obj.type_key, rental.zipcode)
+
+    def clear_cache(self) -> None:
+        """ Forget every cached component score."""
+        self._component_cache.clear()
+        self._ranked = None
+
+    def cache_size(self) -> int:
+        """ Number of rentals with cached component scores."""
+        return len(self._component_cache)
+
+    def rank(self, rentals) -> list:
+        """ Rank rentals by overall score, best first, using cached components.
+
+        The component matrix of the last ranked rentals is kept, so changing
+        weights and ranking the same, unchanged rentals again only checks each
+        rental's component_key() and redoes the weighted sum (one vectorized
+        pass). Ties keep input order.
+
+        Args:
+            rentals (Iterable[RentalProperty]): Rentals to rank.
+        Returns:
+            list[tuple[float, RentalProperty]]: (overall score, rental) pairs.
+
+        Example:
+            calc.rank(rentals)
+            calc.set_weights(commute=0.6)
+            calc.rank(rentals)  # re-ranked without rescoring
+        """
+        rentals = list(rentals)
+        if not rentals:
+            return []
+
+        overall = self._weighted_columns(self._component_columns(rentals))
+
+        order = np.argsort(-overall, kind='stable')
+        return [(float(overall[i]), rentals[i]) for i in order]
+
+    def _component_columns(self, rentals: list) -> dict:
+        """ Component scores of each rental as one array per component.
+
+        The matrix of the last call is kept with the rental objects and the
+        component_key() of each row. A row is copied from it only while the
+        rental's key still matches, so rentals edited in place and market
+        moves are rescored; the rest go through the component cache.
+        """
+        names = list(self.WEIGHTS)
+        kept = self._ranked
+        positions = kept['positions'] if kept is not None else {}
+
+        matrix = np.empty((len(rentals), len(names)), dtype=np.float64)
+        keys, reused, sources = [], [], []
+        for i, rental in enumerate(rentals):
+            key = self.component_key(rental)
+            keys.append(key)
+            j = positions.get(id(rental))
+            if j is not None and kept['keys'][j] == key:
+                reused.append(i)
+                sources.append(j)
+            else:
+                components = self._cached_components(rental, key)
+                matrix[i] = [components[name] for name in names]
+        if reused:
+            matrix[reused] = kept['matrix'][sources]
+
+        self._ranked = {
+            'rentals': rentals,  # keeps the objects alive, so their ids stay unique
+            'positions': {id(rental): i for i, rental in enumerate(rentals)},
+            'keys': keys,
+            'matrix': matrix
+        }
+        return {name: matrix[:, k] for k, name in enumerate(names)}
+
+    def weight_sensitivity(self, rentals, samples: int = 2000, spread: float = 0.25,
+                           top_k: int = 5, seed: int = None) -> dict:
+        """ How robust the ranking is to small changes in the weights.
+
+        Draws `samples` weight vectors around the current weights (each weight
+        multiplied by lognormal noise), scores every rental under every vector
+        with one (rentals x components) @ (components x samples) product, and
+        ranks each column. Scores are not rounded to 2 decimals here, so exact
+        ties in the displayed score may be ordered differently than by rank().
+
+        Args:
+            rentals (Iterable[RentalProperty]): Rentals to analyze.
+            samples (int): Number of weight vectors to draw.
+            spread (float): Standard deviation of the log-noise (0.25 ~ +/-25%).
+            top_k (int): Cut-off for the top-K inclusion probability.
+            seed (int | None): Random seed for reproducible results.
+        Returns:
+            dict: 'weights' (components x samples array), 'ranks' (rentals x samples
+            array of 1-based ranks) and 'listings': one summary per rental, in input
+            order, with its base rank, mean/min/max rank, 5th/50th/95th rank
+            percentiles and 'top_k_probability'.
+        Raises:
+            ValueError: If samples or top_k is not positive, or spread is negative.
+
+        Example:
+            report = calc.weight_sensitivity(rentals, top_k=5)
+            report['listings'][0]['top_k_probability']
+        """
+        if samples < 1 or top_k < 1:
+            raise ValueError("Samples and top_k must be positive.")
+        if spread < 0:
+            raise ValueError("Spread cannot be negative.")
+
+        rentals = list(rentals)
+        names = list(self.WEIGHTS)
+        base = np.array([self._weights[name] for name in names], dtype=np.float64)
+
+        rng = np.random.default_rng(seed)
+        weights = base[:, np.newaxis] * np.exp(rng.normal(0.0, spread, size=(len(names), samples)))
+
+        columns = self._component_columns(rentals)
+        components = np.column_stack([columns[name] for name in names]) if rentals \
+            else np.empty((0, len(names)))
+        scores = components @ weights  # rentals x samples
+
+        # ranks[i, s] = 1-based position of rental i under sample s (ties keep input order)
+        order = np.argsort(-scores, axis=0, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(rentals) + 1)[:, np.newaxis], axis=0)
+
+        base_order = np.argsort(-self._weighted_columns(columns), kind='stable') if rentals else []
+        base_ranks = np.empty(len(rentals), dtype=int)
+        base_ranks[base_order] = np.arange(1, len(rentals) + 1)
+
+        listings = []
+        for i, rental in enumerate(rentals):
+            row = ranks[i]
+            p5, p50, p95 = np.percentile(row, [5, 50, 95])
+            listings.append({
+                'rental': rental,
+                'base_rank': int(base_ranks[i]),
+                'mean_rank': round(float(row.mean()), 2),
+                'min_rank': int(row.min()),
+                'max_rank': int(row.max()),
+                'rank_percentiles': {5: float(p5), 50: float(p50), 95: float(p95)},
+                'top_k_probability': round(float(np.mean(row <= top_k)), 4)
+            })
+
+        return {'weights': weights, 'ranks': ranks, 'listings': listings}
+
+    def pareto_front(self, rentals) -> list:
+        """ Rentals no other rental beats on rent, commute, flexibility and type at once.
+
+        Unlike rank(), the result does not depend on the weights.
+
+        Args:
+            rentals (Iterable[RentalProperty]): Rentals to compare.
+        Returns:
+            list[RentalProperty]: The non-dominated rentals, cheapest first.
+            Use skyline.Skyline directly to keep adding rentals later.
+        """
+        return Skyline.from_rentals(rentals, self).items()
+
+    def _weighted_columns(self, columns: dict) -> np.ndarray:
+        """ Vectorized _weighted_score() over component arrays."""
+        weights = self._weights
+        return round_like_python(
+            columns['price'] * weights['price'] +
+            columns['flexibility'] * weights['flexibility'] +
+            columns['commute'] * weights['commute'] +
+            columns['type'] * weights['type'],
+            2
+        )
+
+    # ----------
+    # Batch / columnar scoring
+    # ----------
+
+    def reference_prices(self, rentals) -> np.ndarray:
+        """ Reference price of each rental, as a score_batch() average_price column."""
+        return np.array([
+            self.reference_price(rental.zipcode, rental.property_type_obj.type_key)
+            for rental in rentals
+        ], dtype=np.float64)
+
+    def reference_table(self) -> dict:
+        """ Reference prices as a MarketAverages.reference_table() dict.
+
+        Returns:
+            dict: Group key -> price for MarketAverages.table_price(); only the
+            whole-market entry (average_price) when no market is attached.
+        """
+        if self._market is None:
+            return {(None, None): self._average_price}
+        return self._market.reference_table(default=self._average_price)
+
+    @staticmethod
+    def rental_columns(rentals) -> dict:
+        """Build score_batch() columns from RentalProperty objects.
+
+        Args:
+            rentals (Iterable[RentalProperty]): Rentals to convert.
+        Returns:
+            dict: rent, lease_term, distances (mode -> array, NaN when missing)
+            and type_score arrays.
+        """
+        rentals = list(rentals)
+        modes = []
+        for rental in rentals:
+            for mode in rental.distances:
+                if mode not in modes:
+                    modes.append(mode)
+
+        return {
+            'rent': np.array([rental.rent for rental in rentals], dtype=np.float64),
+            'lease_term': np.array([rental.lease_term for rental in rentals], dtype=np.float64),
+            'distances': {
+                mode: np.array([rental.distances.get(mode, np.nan) for rental in rentals], dtype=np.float64)
+                for mode in modes
+            },
+            'type_score': np.array([rental.property_type_obj.type_score() for rental in rentals], dtype=np.float64)
+        }
+
+    def score_batch(self, rent, lease_term, distances: dict, type_score, average_price=None) -> dict:
+        """Score many rentals at once from columnar arrays.
+
+        Every value matches the scalar path (price_score, flexibility_score,
+        commute_score, overall_score) exactly, including rounding and the
+        price-ratio clamping in calculate_price_score. Commute modes are summed
+        in the order of the distances dict, like a rental's own distances dict.
+
+        Args:
+            rent (array-like): Monthly rent per rental.
+            lease_term (array-like): Lease term in months per rental.
+            distances (dict): Mode -> array of miles (NaN where a rental lacks that mode).
+            type_score (array-like): Property type score per rental.
+            average_price (float | array-like | None): Reference price per rental
+            (see reference_prices()); defaults to the calculator's average_price.
+        Returns:
+            dict: 'price', 'flexibility', 'commute', 'type' and 'overall' score arrays.
+        Raises:
+            ValueError: If columns differ in length, a rent is not positive,
+            or a rental has no valid commute mode.
+
+        Example:
+            calc.score_batch(**ScoreCalculator.rental_columns(rentals))['overall']
+        """
+        rent = np.asarray(rent, dtype=np.float64)
+        lease_term = np.asarray(lease_term, dtype=np.float64)
+        type_s = np.asarray(type_score, dtype=np.float64)
+
+        columns = [lease_term, type_s, *[np.asarray(d) for d in distances.values()]]
+        if any(column.shape != rent.shape for column in columns):
+            raise ValueError("All score columns must have the same length.")
+        if average_price is None:
+            average_price = self._average_price
+        average_price = np.broadcast_to(np.asarray(average_price, dtype=np.float64), rent.shape)
+        if np.any(rent <= 0) or np.any(average_price <= 0):
+            raise ValueError("Price and average price must be positive numbers.")
+
+        # Price: same clamping as calculate_price_score
+        ratio = rent / average_price
+        price_s = np.where(
+            ratio <= 0.5, 10.0,
+            np.where(ratio >= 3.0, 0.0, round_like_python(10 * (1.5 - ratio), 2))
+        )
+
+        # Flexibility: 6 months -> 7, 12 months -> 4, anything else month-to-month (10)
+        flex_s = np.where(lease_term == 6, 7.0, np.where(lease_term == 12, 4.0, 10.0))
+
+        commute_s = commute_score_matrix(distances)
+
+        scores = {
+            'price': price_s,
+            'flexibility': flex_s,
+            'commute': commute_s,
+            'type': type_s
+        }
+        scores['overall'] = self._weighted_columns(scores)
+        return scores
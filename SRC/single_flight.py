@@ -0,0 +1,173 @@
+# Request coalescing and short-lived failure caching for geocoding.
+#
+# When several threads score listings from the same building at the same
+# time, each one would send its own geocoder request for the identical
+# normalized address. SingleFlight lets the first caller run the lookup
+# while every concurrent caller for the same key waits and shares its
+# result (or its exception).
+#
+# NegativeCache remembers addresses that recently failed to geocode, so a
+# bad address is not sent to the backend again on every retry.
+#
+# A shared exception is never raised twice: every raise would append to its
+# __traceback__ and keep those frames alive. Each caller gets a fresh copy
+# chained to the original instead.
+
+import copy
+import threading
+import time
+
+
+def fresh_exception(error: Exception) -> Exception:
+    """
+    Return a new exception like error (same type and args, no traceback),
+    with error as its __cause__.
+    """
+    try:
+        fresh = copy.copy(error)
+    except Exception:
+        fresh = RuntimeError(str(error))
+    fresh.__traceback__ = None
+    fresh.__cause__ = error
+    return fresh
+
+
+class _Call:
+    """One in-flight call: waiting callers block on the event."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome.
+
+    Example:
+        flight = SingleFlight()
+        flight.do("4500 Knox Rd", lambda: expensive_lookup("4500 Knox Rd"))
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Run fn() for key, or wait for the call already running for key.
+
+        Args:
+            key (Hashable): Identifies duplicate work (e.g. a normalized address).
+            fn (callable): Zero-argument function doing the work.
+
+        Returns:
+            Any: fn()'s result, shared by every caller that joined the call.
+
+        Raises:
+            Exception: Whatever fn() raised. Waiting callers get a copy chained
+                to the leader's exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise fresh_exception(call.error)
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the call before waking waiters, so later callers start fresh
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being worked on."""
+        with self._lock:
+            return len(self._calls)
+
+
+class NegativeCache:
+    """Remembers recent failures for a short time.
+
+    Example:
+        failures = NegativeCache(ttl_seconds=300)
+        failures.add("Nowhere Rd", ValueError("not found"))
+        failures.get("Nowhere Rd")
+        ValueError('not found')
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 10000, clock=time.monotonic):
+        """
+        Args:
+            ttl_seconds (float): How long a failure is remembered.
+            max_entries (int): Upper bound on remembered failures.
+            clock (callable): Time source (injectable for tests).
+
+        Raises:
+            ValueError: If ttl_seconds or max_entries is not positive.
+        """
+        if ttl_seconds <= 0:
+            raise ValueError("Negative cache TTL must be positive.")
+        if max_entries <= 0:
+            raise ValueError("Negative cache size must be positive.")
+
+        self._ttl = float(ttl_seconds)
+        self._max_entries = int(max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (expires_at, exception), in insertion order
+
+    def get(self, key):
+        """
+        Return a fresh copy of the remembered exception for key (safe to raise),
+        or None if absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, error = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+        return fresh_exception(error)
+
+    def add(self, key, error: Exception) -> None:
+        """Remember that key failed with error."""
+        # Keep a traceback-free copy, so remembered failures do not pin stack frames
+        stored = fresh_exception(error)
+        stored.__cause__ = None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + self._ttl, stored)
+
+            # Drop the oldest failures once full
+            while len(self._entries) > self._max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def discard(self, key=None) -> None:
+        """Forget one key, or every remembered failure when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,175 @@
+# Pareto frontier ("skyline") of rentals over rent and component scores.
+#
+# A weighted overall score hides listings that are better on some axes
+# than everything ranked above them. The skyline is every rental that no
+# other rental dominates, i.e. none is at least as good on all of
+#   rent (lower is better), commute score, flexibility score, type score
+# and strictly better on one.
+#
+# Flexibility and type scores only take a handful of values, so rentals are
+# grouped by (flexibility, type). Inside a group the skyline is a 2-D
+# staircase: sorted by rent, commute score strictly increases. Checking a
+# rental against a group, or finding the rentals it knocks out of a group,
+# is then one binary search. Adding n rentals costs O(n log n) (times the
+# small number of groups), versus O(n²) for pairwise comparison, and the
+# skyline stays current as rentals are added one at a time.
+
+from bisect import bisect_left, bisect_right, insort
+
+
+class _Staircase:
+    """Skyline rentals of one (flexibility, type) group, sorted by rent."""
+
+    __slots__ = ("points", "rents", "commutes", "items")
+
+    def __init__(self):
+        self.points = []    # (rent, commute, arrival)
+        self.rents = []
+        self.commutes = []
+        self.items = {}     # arrival -> item
+
+    def best_commute(self, rent: float, inclusive: bool = True):
+        """Highest commute score among rentals cheaper than (or equal to) rent."""
+        index = (bisect_right if inclusive else bisect_left)(self.rents, rent) - 1
+        return self.commutes[index] if index >= 0 else None
+
+    def insert(self, rent: float, commute: float, arrival: int, item) -> None:
+        point = (rent, commute, arrival)
+        index = bisect_right(self.points, point)
+        self.points.insert(index, point)
+        self.rents.insert(index, rent)
+        self.commutes.insert(index, commute)
+        self.items[arrival] = item
+
+    def remove_dominated(self, rent: float, commute: float, keep_equal: bool) -> None:
+        """Drop rentals that cost at least rent and commute no better."""
+        start = bisect_left(self.rents, rent)
+        stop = bisect_right(self.commutes, commute, lo=start)
+        if keep_equal:
+            # Identical rentals do not dominate each other
+            while start < stop and self.rents[start] == rent and self.commutes[start] == commute:
+                start += 1
+        if start >= stop:
+            return
+        for _, _, arrival in self.points[start:stop]:
+            del self.items[arrival]
+        del self.points[start:stop]
+        del self.rents[start:stop]
+        del self.commutes[start:stop]
+
+    def __len__(self):
+        return len(self.points)
+
+
+class Skyline:
+    """Non-dominated rentals over rent, commute, flexibility and type scores.
+
+    Example:
+        skyline = Skyline.from_rentals(rentals, calculator)
+        skyline.add_rental(new_rental, calculator)
+        skyline.items()
+    """
+
+    def __init__(self):
+        """Initialize an empty skyline."""
+        self._groups = {}  # (flexibility, type score) -> _Staircase
+        self._arrivals = 0
+
+    @classmethod
+    def from_rentals(cls, rentals, calculator):
+        """
+        Build the skyline of many rentals.
+
+        Args:
+            rentals (Iterable[RentalProperty]): Rentals to compare.
+            calculator (ScoreCalculator): Provides (cached) component scores.
+
+        Returns:
+            Skyline: The skyline of the given rentals.
+        """
+        skyline = cls()
+        for rental in rentals:
+            skyline.add_rental(rental, calculator)
+        return skyline
+
+    def add_rental(self, rental, calculator) -> bool:
+        """
+        Add a RentalProperty using its component scores.
+
+        Returns:
+            bool: True if the rental is on the skyline.
+        """
+        components = calculator.component_scores(rental)
+        return self.add(rental, rental.rent, components["commute"],
+                        components["flexibility"], components["type"])
+
+    def add(self, item, rent: float, commute: float, flexibility: float, type_score: float) -> bool:
+        """
+        Add one item and update the skyline.
+
+        Args:
+            item (Any): The rental (or listing) to store.
+            rent (float): Monthly rent (lower is better).
+            commute (float): Commute score (higher is better).
+            flexibility (float): Flexibility score (higher is better).
+            type_score (float): Property type score (higher is better).
+
+        Returns:
+            bool: True if the item is on the skyline (it may later be dominated).
+        """
+        rent, commute = float(rent), float(commute)
+        group = (float(flexibility), float(type_score))
+
+        if self._is_dominated(rent, commute, group):
+            return False
+
+        # Knock out everything the new item dominates
+        for other, staircase in list(self._groups.items()):
+            if other[0] <= group[0] and other[1] <= group[1]:
+                staircase.remove_dominated(rent, commute, keep_equal=(other == group))
+                if not staircase:
+                    del self._groups[other]
+
+        self._groups.setdefault(group, _Staircase()).insert(rent, commute, self._arrivals, item)
+        self._arrivals += 1
+        return True
+
+    def _is_dominated(self, rent: float, commute: float, group: tuple) -> bool:
+        """Whether some skyline item is at least as good everywhere and better somewhere."""
+        for other, staircase in self._groups.items():
+            if other[0] < group[0] or other[1] < group[1]:
+                continue
+
+            best = staircase.best_commute(rent)
+            if best is None:
+                continue
+            if other != group:
+                # Already strictly better on flexibility or type
+                if best >= commute:
+                    return True
+            elif best > commute:
+                return True
+            else:
+                cheaper = staircase.best_commute(rent, inclusive=False)
+                if cheaper is not None and cheaper >= commute:
+                    return True
+        return False
+
+    def items(self) -> list:
+        """Return the skyline items, cheapest first (ties in arrival order)."""
+        entries = [
+            (rent, arrival, staircase.items[arrival])
+            for staircase in self._groups.values()
+            for rent, _, arrival in staircase.points
+        ]
+        entries.sort(key=lambda entry: entry[:2])
+        return [item for _, _, item in entries]
+
+    def __iter__(self):
+        return iter(self.items())
+
+    def __len__(self) -> int:
+        return sum(len(staircase) for staircase in self._groups.values())
+
+    def __str__(self) -> str:
+        return f"Skyline({len(self)} non-dominated rentals)"
@@ -0,0 +1,425 @@
+# Columnar binary snapshots of stored listings.
+#
+# Loading a CSV parses every cell as text and converts it again for each
+# row. A snapshot stores the same listings as one typed NumPy array per
+# column in a directory, described by a small manifest.json:
+# - whole-number columns (ZIP, lease term, rent in whole dollars) as int32/int64
+# - decimal columns (scores, rent, latitude/longitude) as float64
+# - every other column dictionary-encoded: uint8/uint16/uint32 codes into a
+#   table of distinct strings (UTF-8 bytes plus offsets)
+# Arrays are opened with np.load(mmap_mode="r"), so opening a snapshot only
+# maps the files; query() filters and ranks on the arrays directly and only
+# the matching rows are turned back into dicts.
+#
+# A column is stored as numbers only if every value converts back to the
+# exact text a CSV would hold ("" for missing values), so a snapshot written
+# from a CSV exports to an identical CSV. Anything else falls back to strings.
+#
+# Every save writes its arrays into a fresh generation sub-directory
+# ("gen-xxxxxxxx/col000.npy"), then swaps the manifest, then deletes older
+# generations. Files are never rewritten in place, so a reader always sees
+# the arrays its manifest names, and an already mapped Snapshot keeps its
+# (unlinked) files instead of faulting on truncated ones.
+
+from pathlib import Path
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+FORMAT_NAME = "rental-snapshot"
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+GENERATION_PREFIX = "gen-"
+
+# Largest integer a float64 holds exactly (whole numbers in decimal columns)
+_MAX_EXACT_INTEGER = 2 ** 53
+
+
+def _text(value) -> str:
+    """The text csv.DictWriter writes for a value."""
+    return "" if value is None else str(value)
+
+
+def _as_int(text: str):
+    """Parse canonical integer text ("20740", "-3"), or None."""
+    try:
+        number = int(text)
+    except ValueError:
+        return None
+    return number if str(number) == text else None
+
+
+def _as_exact_float(text: str):
+    """Parse text that float repr reproduces exactly ("7.5", "1e-05"), or None."""
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if repr(number) == text else None
+
+
+def _parse_number(text: str):
+    """Parse "$1,200"-style text as float, or None."""
+    try:
+        return float(str(text).replace("$", "").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _code_dtype(categories: int):
+    """Smallest unsigned dtype able to index the category table."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if categories <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+
+def _encode_column(texts: list) -> dict:
+    """
+    Pick the narrowest lossless encoding for one column of CSV texts.
+
+    Returns:
+        dict: {"kind", "values", optional "missing", "whole", "categories"}.
+    """
+    present = [text for text in texts if text != ""]
+    missing = np.fromiter((text == "" for text in texts), dtype=bool, count=len(texts))
+
+    if present:
+        integers = [_as_int(text) for text in present]
+        if all(number is not None for number in integers):
+            low, high = min(integers), max(integers)
+            for dtype in (np.int32, np.int64):
+                info = np.iinfo(dtype)
+                if info.min <= low and high <= info.max:
+                    values = np.zeros(len(texts), dtype=dtype)
+                    values[~missing] = integers
+                    return {"kind": "int", "values": values, "missing": missing}
+
+        decimals, whole = [], []
+        for text in present:
+            number = _as_exact_float(text)
+            is_whole = number is None  # "1200" next to "1250.5": kept as a float, written back as 1200
+            if is_whole:
+                integer = _as_int(text)
+                if integer is None or abs(integer) > _MAX_EXACT_INTEGER:
+                    break
+                number = float(integer)
+            decimals.append(number)
+            whole.append(is_whole)
+        else:
+            values = np.full(len(texts), np.nan)
+            values[~missing] = decimals
+            flags = np.zeros(len(texts), dtype=bool)
+            flags[~missing] = whole
+            return {"kind": "float", "values": values, "missing": missing, "whole": flags}
+
+    categories = {}
+    codes = [categories.setdefault(text, len(categories)) for text in texts]
+    return {
+        "kind": "string",
+        "values": np.asarray(codes, dtype=_code_dtype(len(categories))),
+        "categories": list(categories),
+    }
+
+
+def save_snapshot(listings, directory) -> dict:
+    """
+    Write listings as a columnar snapshot directory.
+
+    Columns are the union of listing keys in first-seen order. Arrays go to
+    a new generation sub-directory and the manifest is swapped in last
+    (atomically), so an interrupted save never looks valid and open
+    snapshots keep reading the generation they mapped.
+
+    Args:
+        listings (Sequence[dict]): Listings to store (e.g. PropertyManager rows).
+        directory (str | Path): Snapshot directory (created if needed).
+
+    Returns:
+        dict: The manifest.
+
+    Example:
+        save_snapshot(manager.list_properties(), "snapshots/rentals")
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    generation = Path(tempfile.mkdtemp(prefix=GENERATION_PREFIX, dir=directory)).name
+
+    names = {}
+    for listing in listings:
+        names.update(dict.fromkeys(listing))
+
+    columns = []
+    for index, name in enumerate(names):
+        stem = f"{generation}/col{index:03d}"
+        encoded = _encode_column([_text(listing.get(name)) for listing in listings])
+        entry = {"name": name, "kind": encoded["kind"], "dtype": encoded["values"].dtype.str,
+                 "file": f"{stem}.npy"}
+        np.save(directory / entry["file"], encoded["values"])
+
+        if encoded["kind"] == "string":
+            blobs = [text.encode("utf-8") for text in encoded["categories"]]
+            offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(blob) for blob in blobs])
+            entry["strings"] = f"{stem}.strings.npy"
+            entry["offsets"] = f"{stem}.offsets.npy"
+            np.save(directory / entry["strings"], np.frombuffer(b"".join(blobs), dtype=np.uint8))
+            np.save(directory / entry["offsets"], offsets)
+        else:
+            for key in ("missing", "whole"):
+                flags = encoded.get(key)
+                if flags is not None and flags.any():
+                    entry[key] = f"{stem}.{key}.npy"
+                    np.save(directory / entry[key], flags)
+        columns.append(entry)
+
+    manifest = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "generation": generation,
+                "rows": len(listings), "columns": columns}
+    temp_path = directory / (MANIFEST_NAME + f".{generation}.tmp")
+    temp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(temp_path, directory / MANIFEST_NAME)
+
+    # Earlier generations (and column files of the old flat layout); readers
+    # that mapped them keep their open files, and a file that cannot be
+    # removed yet (Windows, still mapped) is retried by the next save
+    for path in directory.glob(GENERATION_PREFIX + "*"):
+        if path.is_dir() and path.name != generation:
+            shutil.rmtree(path, ignore_errors=True)
+    for path in directory.glob("col*.npy"):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    return manifest
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot directory.
+
+    Example:
+        snapshot = Snapshot("snapshots/rentals")
+        rents = snapshot.array("Rent")       # mapped float64/int array
+        snapshot.query(property_type="2x2", max_rent=1500, limit=10)
+        snapshot.row(0)
+    """
+
+    def __init__(self, directory, mmap: bool = True):
+        """
+        Open a snapshot.
+
+        Args:
+            directory (str | Path): Snapshot directory.
+            mmap (bool): Map arrays instead of reading them into memory.
+
+        Raises:
+            ValueError: If the manifest is missing or has an unsupported format.
+        """
+        self._directory = Path(directory)
+        manifest_path = self._directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise ValueError(f"Snapshot manifest not found: {manifest_path}")
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("format") != FORMAT_NAME or manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format in {manifest_path}.")
+
+        mode = "r" if mmap else None
+        self._rows = int(manifest["rows"])
+        self._columns = {}
+        for entry in manifest["columns"]:
+            arrays = {key: np.load(self._directory / entry[key], mmap_mode=mode)
+                      for key in ("file", "strings", "offsets", "missing", "whole") if key in entry}
+            self._columns[entry["name"]] = {"kind": entry["kind"], **arrays}
+        self._categories = {}  # column -> decoded category list (built on first use)
+
+    # ----------
+    # Column access
+    # ----------
+
+    @property
+    def columns(self) -> list[str]:
+        """Column names, in CSV order."""
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _column(self, name: str) -> dict:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"Unknown snapshot column: {name}") from None
+
+    def array(self, name: str) -> np.ndarray:
+        """The stored array for a column (numbers, or category codes for strings)."""
+        return self._column(name)["file"]
+
+    def categories(self, name: str) -> list[str]:
+        """Distinct strings of a dictionary-encoded column, indexed by code."""
+        column = self._column(name)
+        if column["kind"] != "string":
+            raise ValueError(f"Column {name} is not dictionary-encoded.")
+        if name not in self._categories:
+            blob = column["strings"].tobytes()
+            offsets = column["offsets"].tolist()
+            self._categories[name] = [blob[start:end].decode("utf-8")
+                                      for start, end in zip(offsets, offsets[1:])]
+        return self._categories[name]
+
+    def numbers(self, name: str) -> np.ndarray:
+        """
+        A column as float64, NaN where missing or not numeric.
+
+        String columns are parsed once per distinct value ("$1,200" -> 1200.0).
+        """
+        column = self._column(name)
+        if column["kind"] == "string":
+            parsed = [_parse_number(text) for text in self.categories(name)]
+            parsed = np.array([np.nan if number is None else number for number in parsed],
+                              dtype=np.float64)
+            return parsed[column["file"]]
+
+        values = np.asarray(column["file"], dtype=np.float64)
+        if "missing" in column:
+            values = np.where(column["missing"], np.nan, values)
+        return values
+
+    def values(self, name: str) -> list:
+        """A column decoded to Python values ("" where missing)."""
+        column = self._column(name)
+        if column["kind"] == "string":
+            categories = self.categories(name)
+            return [categories[code] for code in column["file"].tolist()]
+
+        values = column["file"].tolist()
+        if "whole" in column:
+            values = [int(value) if whole else value
+                      for value, whole in zip(values, column["whole"].tolist())]
+        if "missing" in column:
+            values = ["" if missing else value
+                      for value, missing in zip(values, column["missing"].tolist())]
+        return values
+
+    def _value(self, column: dict, name: str, index: int):
+        """Decode one cell."""
+        if column["kind"] == "string":
+            code = int(column["file"][index])
+            if name in self._categories:
+                return self._categories[name][code]
+            start, end = int(column["offsets"][code]), int(column["offsets"][code + 1])
+            return column["strings"][start:end].tobytes().decode("utf-8")
+
+        if "missing" in column and column["missing"][index]:
+            return ""
+        value = column["file"][index].item()
+        if "whole" in column and column["whole"][index]:
+            return int(value)
+        return value
+
+    # ----------
+    # Rows
+    # ----------
+
+    def row(self, index: int) -> dict:
+        """Decode one listing (only its cells are read)."""
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError("Snapshot row out of range.")
+        return {name: self._value(column, name, index) for name, column in self._columns.items()}
+
+    def rows(self, indices=None) -> list[dict]:
+        """
+        Decode several listings at once (column by column).
+
+        Args:
+            indices (array-like | None): Row numbers; None decodes every row.
+        """
+        if indices is None:
+            if not self._columns:
+                return [{} for _ in range(self._rows)]
+            decoded = [self.values(name) for name in self._columns]
+            return [dict(zip(self._columns, cells)) for cells in zip(*decoded)]
+        return [self.row(int(index)) for index in np.asarray(indices).ravel()]
+
+    def __iter__(self):
+        return iter(self.rows())
+
+    # ----------
+    # Queries
+    # ----------
+
+    def _equals(self, name: str, wanted, ignore_case: bool = False) -> np.ndarray:
+        """Boolean mask of rows whose text in a column equals wanted."""
+        if name not in self._columns:
+            return np.zeros(self._rows, dtype=bool)
+
+        column = self._columns[name]
+        wanted = str(wanted).strip()
+        if column["kind"] == "string":
+            fold = str.lower if ignore_case else (lambda text: text)
+            codes = [code for code, text in enumerate(self.categories(name))
+                     if fold(text.strip()) == fold(wanted)]
+            return np.isin(column["file"], codes)
+
+        number = _parse_number(wanted)
+        if number is None:
+            return np.zeros(self._rows, dtype=bool)
+        return self.numbers(name) == number
+
+    def query(self, zipcode=None, property_type: str | None = None, min_rent: float | None = None,
+              max_rent: float | None = None, min_score: float | None = None,
+              order_by: str = "score", limit: int | None = None) -> list[dict]:
+        """
+        Filter and rank listings with vectorized masks over the mapped columns.
+
+        Arguments match PropertyManager.query(); only matching rows are decoded.
+
+        Raises:
+            ValueError: If order_by is unknown or limit is not positive.
+        """
+        if order_by not in ("score", "rent", "inserted"):
+            raise ValueError("order_by must be one of: score, rent, inserted.")
+        if limit is not None and limit < 1:
+            raise ValueError("Limit must be positive.")
+
+        keep = np.ones(self._rows, dtype=bool)
+        if zipcode is not None:
+            keep &= self._equals("ZIP", zipcode)
+        if property_type is not None:
+            keep &= self._equals("Property Type", property_type, ignore_case=True)
+
+        rent = self._metric("Rent")
+        if min_rent is not None:
+            keep &= rent >= min_rent
+        if max_rent is not None:
+            keep &= rent <= max_rent
+
+        score_name = "Overall Score" if "Overall Score" in self._columns else "Score"
+        score = self._metric(score_name)
+        if min_score is not None:
+            keep &= score >= min_score
+
+        matches = np.flatnonzero(keep)
+        if order_by == "score":
+            matches = matches[np.argsort(-score[matches], kind="stable")]
+        elif order_by == "rent":
+            matches = matches[np.argsort(rent[matches], kind="stable")]
+        if limit is not None:
+            matches = matches[:limit]
+        return self.rows(matches)
+
+    def _metric(self, name: str) -> np.ndarray:
+        """Numeric column for filtering and ranking (0.0 where missing, like PropertyManager)."""
+        if name not in self._columns:
+            return np.zeros(self._rows)
+        return np.nan_to_num(self.numbers(name), nan=0.0)
+
+    def __str__(self):
+        return f"Snapshot({self._directory}, {self._rows} rows, {len(self._columns)} columns)"
@@ -0,0 +1,245 @@
+# Grid-based spatial index for radius and nearest-neighbor queries.
+#
+# Questions like "all rentals within 1 mile of ESJ" or "the 20 closest 2x2s
+# to HBK" used to need a scan over every stored listing with a geodesic per
+# row. GridIndex buckets items into square cells of a fixed size (in miles),
+# so a query only looks at the cells around the search point:
+# - radius queries read the cells overlapping the search circle
+# - nearest queries expand ring by ring until no closer item can exist
+#
+# Items can be added and removed one at a time, so PropertyManager keeps
+# the index up to date as rentals are added, loaded or deleted.
+
+import heapq
+import math
+
+
+EARTH_RADIUS_MILES = 3958.7613
+MILES_PER_DEGREE_LATITUDE = 69.0
+
+
+def haversine_miles(start: tuple, end: tuple) -> float:
+    """
+    Great-circle distance in miles between two (latitude, longitude) points.
+
+    Examples:
+        >>> round(haversine_miles((38.9786, -76.9377), (38.98695, -76.94178)), 2)
+        0.62
+    """
+    lat1, lon1 = math.radians(start[0]), math.radians(start[1])
+    lat2, lon2 = math.radians(end[0]), math.radians(end[1])
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(min(1.0, a)))
+
+
+class GridIndex:
+    """Uniform lat/lon grid of items for radius and top-k nearest queries.
+
+    Example:
+        index = GridIndex(cell_miles=0.25)
+        index.add(listing, 38.98, -76.93)
+        index.within((38.987, -76.942), 1.0)
+        [(0.62, listing)]
+        index.nearest((38.987, -76.942), k=20)
+    """
+
+    def __init__(self, cell_miles: float = 0.25, reference_latitude: float = 38.99):
+        """
+        Args:
+            cell_miles (float): Width of a grid cell in miles.
+            reference_latitude (float): Latitude used to size longitude cells
+                (default is College Park).
+
+        Raises:
+            ValueError: If cell_miles is not positive.
+        """
+        if cell_miles <= 0:
+            raise ValueError("Cell size must be positive.")
+
+        self._cell_miles = float(cell_miles)
+        self._lat_step = cell_miles / MILES_PER_DEGREE_LATITUDE
+        self._reference_cos = max(math.cos(math.radians(reference_latitude)), 0.01)
+        self._lon_step = self._lat_step / self._reference_cos
+
+        self._cells = {}    # (row, col) -> {item id: (point, item)}
+        self._entries = {}  # item id -> cell key
+        self._bounds = None # cached (min row, max row, min col, max col) of occupied cells
+
+    # ----------
+    # Maintenance
+    # ----------
+
+    def _cell_for(self, latitude: float, longitude: float) -> tuple:
+        """Return the (row, col) cell containing a point."""
+        return (math.floor(latitude / self._lat_step), math.floor(longitude / self._lon_step))
+
+    def add(self, item, latitude: float, longitude: float) -> None:
+        """
+        Index an item at a point (re-adding an item moves it).
+
+        Args:
+            item (Any): The object to store (indexed by identity).
+            latitude (float): Item latitude.
+            longitude (float): Item longitude.
+        """
+        self.remove(item)
+        key = self._cell_for(latitude, longitude)
+        self._cells.setdefault(key, {})[id(item)] = ((float(latitude), float(longitude)), item)
+        self._entries[id(item)] = key
+
+        if self._bounds is not None:
+            min_row, max_row, min_col, max_col = self._bounds
+            self._bounds = (min(min_row, key[0]), max(max_row, key[0]),
+                            min(min_col, key[1]), max(max_col, key[1]))
+
+    def remove(self, item) -> bool:
+        """
+        Remove an item from the index.
+
+        Returns:
+            bool: True if the item was indexed.
+        """
+        key = self._entries.pop(id(item), None)
+        if key is None:
+            return False
+        cell = self._cells[key]
+        del cell[id(item)]
+        if not cell:
+            del self._cells[key]
+            self._bounds = None  # recomputed on the next nearest() query
+        return True
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self._cells.clear()
+        self._entries.clear()
+        self._bounds = None
+
+    def _occupied_bounds(self) -> tuple:
+        """Return (min row, max row, min col, max col) over occupied cells."""
+        if self._bounds is None:
+            rows = [key[0] for key in self._cells]
+            cols = [key[1] for key in self._cells]
+            self._bounds = (min(rows), max(rows), min(cols), max(cols))
+        return self._bounds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, item) -> bool:
+        return id(item) in self._entries
+
+    # ----------
+    # Queries
+    # ----------
+
+    def _ring(self, center_key: tuple, radius: int):
+        """Yield the cell keys exactly `radius` cells away from center_key."""
+        row, col = center_key
+        if radius == 0:
+            yield center_key
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield (row - radius, c)
+            yield (row + radius, c)
+        for r in range(row - radius + 1, row + radius):
+            yield (r, col - radius)
+            yield (r, col + radius)
+
+    def within(self, center: tuple, miles: float, predicate=None) -> list:
+        """
+        Return every item within a distance of center, closest first.
+
+        Args:
+            center (tuple): (latitude, longitude) of the search point.
+            miles (float): Search radius in miles.
+            predicate (callable | None): Optional item filter.
+
+        Returns:
+            list[tuple[float, Any]]: (distance in miles, item) pairs sorted by distance.
+
+        Raises:
+            ValueError: If miles is negative.
+        """
+        if miles < 0:
+            raise ValueError("Search radius cannot be negative.")
+
+        # Bounding box of the search circle (longitude degrees widen toward the poles)
+        lat_delta = miles / MILES_PER_DEGREE_LATITUDE
+        poleward = min(abs(center[0]) + lat_delta, 89.9)
+        lon_delta = lat_delta / max(math.cos(math.radians(poleward)), 1e-6)
+
+        row_min, col_min = self._cell_for(center[0] - lat_delta, center[1] - lon_delta)
+        row_max, col_max = self._cell_for(center[0] + lat_delta, center[1] + lon_delta)
+
+        results = []
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                for point, item in self._cells.get((row, col), {}).values():
+                    if predicate is not None and not predicate(item):
+                        continue
+                    distance = haversine_miles(center, point)
+                    if distance <= miles:
+                        results.append((distance, item))
+
+        results.sort(key=lambda pair: pair[0])
+        return results
+
+    def nearest(self, center: tuple, k: int, predicate=None) -> list:
+        """
+        Return the k items closest to center, closest first.
+
+        Rings of cells are searched outward until the k-th best distance is
+        closer than anything an unvisited ring could contain.
+
+        Args:
+            center (tuple): (latitude, longitude) of the search point.
+            k (int): Number of items to return.
+            predicate (callable | None): Optional item filter.
+
+        Returns:
+            list[tuple[float, Any]]: Up to k (distance in miles, item) pairs.
+
+        Raises:
+            ValueError: If k is not positive.
+        """
+        if k <= 0:
+            raise ValueError("k must be positive.")
+        if not self._entries:
+            return []
+
+        center_key = self._cell_for(center[0], center[1])
+        min_row, max_row, min_col, max_col = self._occupied_bounds()
+        max_radius = max(
+            abs(center_key[0] - min_row), abs(center_key[0] - max_row),
+            abs(center_key[1] - min_col), abs(center_key[1] - max_col)
+        )
+
+        # Narrowest cell width (in miles) anywhere in the occupied area, so the
+        # stopping rule below stays safe away from the reference latitude
+        poleward = min(max(abs(min_row), abs(max_row + 1)) * self._lat_step, 89.9)
+        poleward = max(poleward, min(abs(center[0]), 89.9))
+        ring_miles = self._cell_miles * min(
+            1.0, math.cos(math.radians(poleward)) / self._reference_cos
+        )
+
+        best = []  # max-heap of (-distance, seq, item), size <= k
+        seq = 0
+        for radius in range(max_radius + 1):
+            for key in self._ring(center_key, radius):
+                for point, item in self._cells.get(key, {}).values():
+                    if predicate is not None and not predicate(item):
+                        continue
+                    distance = haversine_miles(center, point)
+                    seq += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, seq, item))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, seq, item))
+
+            # Any item in ring radius+1 or beyond is at least radius cells away
+            if len(best) == k and -best[0][0] <= radius * ring_miles:
+                break
+
+        return [(-neg, item) for neg, _, item in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
@@ -0,0 +1,312 @@
+# Storage backends for PropertyManager.
+#
+# CSV files are rewritten or scanned in full, and every query over them is a
+# loop over dicts in memory. A ListingStore keeps listings in a database
+# instead; PropertyManager(storage=...) flushes added and deleted listings to
+# it and can filter and rank without loading everything.
+#
+# SQLiteStore keeps one row per listing:
+# - typed, indexed columns for the fields queries filter and sort on
+#   (ZIP, property type, rent, overall score, address key)
+# - the full listing as JSON, so listings come back exactly as stored
+# Inserts are batched with executemany() inside one transaction, and the
+# database runs in WAL mode so readers are not blocked while a writer commits.
+# CSV stays available for import/export (PropertyManager.import_csv/export_csv).
+
+from abc import ABC, abstractmethod
+from itertools import islice
+import json
+import sqlite3
+import threading
+
+from function_library import address_key
+
+
+def _as_float(value):
+    """Convert a stored value ("$1,200", "7.5", 7.5, "") to float, or None."""
+    if value in (None, ""):
+        return None
+    try:
+        return float(str(value).replace("$", "").replace(",", ""))
+    except ValueError:
+        return None
+
+
+class ListingStore(ABC):
+    """
+    Abstract base class for listing persistence.
+
+    Listings are plain dicts (the rows PropertyManager stores). Each stored
+    listing gets an integer id, used to update or delete it later; ids are
+    not reused after a delete.
+    """
+
+    @abstractmethod
+    def insert_many(self, listings) -> list:
+        """
+        Store listings in one transaction.
+
+        Args:
+            listings (Iterable[dict]): Listings to add.
+
+        Returns:
+            list[int]: The new ids, in input order.
+        """
+        pass
+
+    @abstractmethod
+    def delete_ids(self, ids) -> int:
+        """Delete listings by id; returns the number deleted."""
+        pass
+
+    @abstractmethod
+    def update_many(self, pairs) -> int:
+        """
+        Overwrite stored listings by id in one transaction.
+
+        Args:
+            pairs (Iterable[tuple[int, dict]]): (id, listing) pairs.
+
+        Returns:
+            int: Number of listings updated.
+        """
+        pass
+
+    @abstractmethod
+    def iter_listings(self):
+        """Yield (id, listing) for every stored listing, in insertion order."""
+        pass
+
+    @abstractmethod
+    def query(self, zipcode=None, property_type=None, min_rent=None, max_rent=None,
+              min_score=None, order_by: str = "score", limit: int | None = None) -> list:
+        """Filter and rank stored listings (see SQLiteStore.query)."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def close(self) -> None:
+        """Release any open resources."""
+        pass
+
+
+class SQLiteStore(ListingStore):
+    """SQLite-backed listing store with indexed filter-and-rank queries.
+
+    Example:
+        store = SQLiteStore("listings.db")
+        manager = PropertyManager(storage=store)
+        manager.add_rental(rental, score)
+        manager.flush()
+        store.query(zipcode="20740", property_type="2x2", max_rent=1500, limit=10)
+    """
+
+    ORDER_BY = {
+        "score": "overall_score DESC, id",
+        "rent": "rent ASC, id",
+        "inserted": "id",
+    }
+
+    BATCH_SIZE = 10000
+
+    def __init__(self, path: str = "listings.db"):
+        """
+        Open (or create) the listings database.
+
+        Args:
+            path (str): SQLite file path. Use ":memory:" for a throwaway store.
+        """
+        self._path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+
+        # WAL lets readers keep reading while a batch insert commits
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS listings (
+                    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                    listing_key   TEXT NOT NULL,
+                    zip           TEXT,
+                    property_type TEXT COLLATE NOCASE,
+                    rent          REAL,
+                    overall_score REAL,
+                    lease_term    INTEGER,
+                    latitude      REAL,
+                    longitude     REAL,
+                    content_hash  TEXT,
+                    data          TEXT NOT NULL
+                )
+                """
+            )
+            for column in ("listing_key", "zip", "property_type", "rent", "overall_score"):
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_listings_{column} ON listings ({column})"
+                )
+            # Most views filter by type and rank by score
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_listings_type_score "
+                "ON listings (property_type, overall_score DESC)"
+            )
+
+    # ----------
+    # Writes
+    # ----------
+
+    def _row(self, listing_id: int, listing: dict) -> tuple:
+        """Typed column values for one listing."""
+        score = listing.get("Overall Score", listing.get("Score"))
+        lease_term = _as_float(listing.get("Lease Term"))
+        zipcode = listing.get("ZIP")
+        return (
+            listing_id,
+            address_key(listing.get("Address", "")),
+            None if zipcode in (None, "") else str(zipcode).strip(),
+            listing.get("Property Type"),
+            _as_float(listing.get("Rent")),
+            _as_float(score),
+            None if lease_term is None else int(lease_term),
+            _as_float(listing.get("Latitude")),
+            _as_float(listing.get("Longitude")),
+            listing.get("Content Hash") or None,
+            json.dumps(listing)
+        )
+
+    def _insert(self, listings) -> list:
+        """
+        Insert in batches of BATCH_SIZE; caller holds the lock and transaction.
+
+        Ids continue from AUTOINCREMENT's high-water mark in sqlite_sequence,
+        so the id of a deleted listing is never handed out again.
+        """
+        row = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'listings'").fetchone()
+        next_id = (row[0] if row else 0) + 1
+        ids = []
+        iterator = iter(listings)
+        while True:
+            batch = list(islice(iterator, self.BATCH_SIZE))
+            if not batch:
+                return ids
+            rows = [self._row(next_id + i, listing) for i, listing in enumerate(batch)]
+            self._conn.executemany(
+                "INSERT INTO listings (id, listing_key, zip, property_type, rent, overall_score, "
+                "lease_term, latitude, longitude, content_hash, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            ids.extend(range(next_id, next_id + len(batch)))
+            next_id += len(batch)
+
+    def insert_many(self, listings) -> list:
+        """Store listings in one transaction (batched executemany); returns their ids."""
+        with self._lock, self._conn:
+            return self._insert(listings)
+
+    def delete_ids(self, ids) -> int:
+        """Delete listings by id; returns the number deleted."""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany("DELETE FROM listings WHERE id = ?", [(i,) for i in ids])
+            return cursor.rowcount
+
+    def update_many(self, pairs) -> int:
+        """Overwrite listings by id in one transaction (batched executemany); returns the number updated."""
+        updated = 0
+        with self._lock, self._conn:
+            iterator = iter(pairs)
+            while True:
+                batch = list(islice(iterator, self.BATCH_SIZE))
+                if not batch:
+                    return updated
+                rows = [self._row(listing_id, listing) for listing_id, listing in batch]
+                cursor = self._conn.executemany(
+                    "UPDATE listings SET listing_key = ?, zip = ?, property_type = ?, rent = ?, "
+                    "overall_score = ?, lease_term = ?, latitude = ?, longitude = ?, "
+                    "content_hash = ?, data = ? WHERE id = ?",
+                    [row[1:] + row[:1] for row in rows]
+                )
+                updated += cursor.rowcount
+
+    # ----------
+    # Reads
+    # ----------
+
+    def iter_listings(self):
+        """Yield (id, listing) for every stored listing, in insertion order (one page in memory)."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, data FROM listings WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, self.BATCH_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            for listing_id, data in rows:
+                yield listing_id, json.loads(data)
+            last_id = rows[-1][0]
+
+    def query(self, zipcode=None, property_type=None, min_rent=None, max_rent=None,
+              min_score=None, order_by: str = "score", limit: int | None = None) -> list:
+        """
+        Filter and rank stored listings with indexed SQL.
+
+        Args:
+            zipcode (str | int | None): Only this ZIP code.
+            property_type (str | None): Only this type (case-insensitive).
+            min_rent (float | None): Lowest rent.
+            max_rent (float | None): Highest rent.
+            min_score (float | None): Lowest overall score.
+            order_by (str): "score" (best first), "rent" (cheapest first) or "inserted".
+            limit (int | None): Maximum number of listings.
+
+        Returns:
+            list[dict]: Matching listings.
+
+        Raises:
+            ValueError: If order_by is unknown or limit is not positive.
+        """
+        if order_by not in self.ORDER_BY:
+            raise ValueError(f"order_by must be one of: {', '.join(self.ORDER_BY)}.")
+        if limit is not None and limit < 1:
+            raise ValueError("Limit must be positive.")
+
+        conditions, params = [], []
+        for clause, value in (
+            ("zip = ?", None if zipcode is None else str(zipcode).strip()),
+            ("property_type = ?", property_type),
+            ("rent >= ?", min_rent),
+            ("rent <= ?", max_rent),
+            ("overall_score >= ?", min_score),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+
+        sql = "SELECT data FROM listings"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {self.ORDER_BY[order_by]}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __str__(self):
+        return f"SQLiteStore({self._path}, {len(self)} listings)"
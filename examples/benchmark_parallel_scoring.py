@@ -0,0 +1,76 @@
+"""
+benchmark_parallel_scoring.py
+
+Measures how score_csv_parallel() scales with the number of worker
+processes. A synthetic listings CSV (the PropertyManager.save_to_csv()
+format) is written once, then scored with 1, 2, 4, ... workers. The parent
+process's own CPU time is reported next to the wall time: it should stay
+small and flat, since the parent only finds shard boundaries while the
+workers parse and score the rows.
+
+Usage:
+    python examples/benchmark_parallel_scoring.py --rows 1000000 --max-workers 8
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SRC')))
+
+import argparse
+import csv
+import json
+import random
+import tempfile
+import time
+
+from market_stats import MarketAverages
+from parallel_scoring import score_csv_parallel
+from score_calculator import ScoreCalculator
+
+
+def write_listings(path: str, rows: int, seed: int = 18) -> MarketAverages:
+    """Write a synthetic listings CSV and return the market built from its rents."""
+    rng = random.Random(seed)
+    market = MarketAverages()
+    types = [("Studio", 6.0), ("2x2", 8.0), ("4x4", 9.0)]
+    zipcodes = ["20740", "20742", "20782", "20783"]
+
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Address", "Rent", "ZIP", "Property Type", "Type Score", "Lease Term", "Distances"])
+        for i in range(rows):
+            property_type, type_score = rng.choice(types)
+            zipcode = rng.choice(zipcodes)
+            rent = rng.randint(600, 4000)
+            distances = {"walk": round(rng.uniform(0, 4), 2), "drive": round(rng.uniform(0, 12), 2)}
+            writer.writerow([f"{1000 + i} Knox Rd, College Park, MD", rent, zipcode, property_type,
+                             type_score, rng.choice([1, 6, 12]), json.dumps(distances)])
+            market.add(zipcode, property_type, rent)
+    return market
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process-pool CSV scoring.")
+    parser.add_argument("--rows", type=int, default=500000, help="listings in the synthetic CSV")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="largest pool to try")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="approximate rows per shard")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "listings.csv")
+        market = write_listings(path, args.rows)
+        calculator = ScoreCalculator(market=market)
+        print(f"Workload: {args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB\n")
+
+        workers, baseline = 1, None
+        while workers <= args.max_workers:
+            wall, parent = time.perf_counter(), time.process_time()
+            scores = score_csv_parallel(path, calculator, workers=workers, chunk_size=args.chunk_size)
+            wall, parent = time.perf_counter() - wall, time.process_time() - parent
+            baseline = baseline or wall
+            print(f"{workers:2d} workers: {wall:7.2f}s wall  {parent:6.2f}s parent CPU  "
+                  f"speedup {baseline / wall:4.1f}x  ({len(scores['overall'])} scored)")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Tests for the vectorized (NumPy) scoring path:
+- Distance matrix and bulk commute helpers
+- Columnar ScoreCalculator.score_batch()
+- Configurable weights and the component score cache
+- Weight-sensitivity analysis
+- Process-pool parallel scoring
+"""
+import csv
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from geopy.distance import geodesic
+
+# allow imports from SRC directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SRC')))
+
+from function_library import calculate_commute_score, calculate_commute_time
+from distance_matrix import (
+    commute_score_matrix,
+    commute_time_matrix,
+    distance_matrix,
+    round_like_python
+)
+from listing_manager import PropertyManager
+from market_stats import MarketAverages
+import parallel_scoring
+from parallel_scoring import score_csv_parallel, score_parallel
+from rental_property import RentalProperty
+from score_calculator import ScoreCalculator
+
+RENTALS = [(38.9786, -76.9377), (38.9817, -76.9388), (38.9930, -76.9310)]
+BUILDINGS = [(38.98695, -76.94178), (38.98815, -76.94156)]
+
+
+class TestDistanceMatrix(unittest.TestCase):
+    """Vectorized distances and bulk commute calculations."""
+
+    def test_matrix_shape_and_exact_refinement(self):
+        miles, max_error = distance_matrix(RENTALS, BUILDINGS, exact=True)
+
+        self.assertEqual(miles.shape, (3, 2))
+        for i, rental in enumerate(RENTALS):
+            for j, building in enumerate(BUILDINGS):
+                self.assertEqual(miles[i, j], round(geodesic(rental, building).miles, 2))
+        self.assertLess(max_error, 0.01)
+
+    def test_haversine_error_bound_covers_geodesic(self):
+        approx, bound = distance_matrix(RENTALS, BUILDINGS, decimals=None)
+        exact, _ = distance_matrix(RENTALS, BUILDINGS, exact=True, decimals=None)
+        self.assertLessEqual(np.max(np.abs(approx - exact)), bound)
+
+    def test_invalid_coordinates_rejected(self):
+        with self.assertRaises(ValueError):
+            distance_matrix([(95.0, 0.0)], BUILDINGS)
+
+    def test_round_like_python_matches_builtin(self):
+        values = [2.675, 1.005, 0.125, 0.375, 7.7450000001, 12.345]
+        self.assertEqual(list(round_like_python(values, 2)), [round(v, 2) for v in values])
+
+    def test_bulk_commute_matches_scalar_functions(self):
+        rng = random.Random(326)
+        walk = [round(rng.uniform(0, 4), 2) for _ in range(500)]
+        drive = [round(rng.uniform(0, 30), 3) for _ in range(500)]
+
+        times = commute_time_matrix(walk, "walk")
+        scores = commute_score_matrix({"walk": walk, "drive": drive})
+
+        for i in range(500):
+            self.assertEqual(times[i], calculate_commute_time(walk[i], "walk"))
+            self.assertEqual(scores[i], calculate_commute_score({"walk": walk[i], "drive": drive[i]}))
+
+    def test_missing_modes_use_nan(self):
+        scores = commute_score_matrix({"walk": [0.5, np.nan], "drive": [np.nan, 5.0]})
+        self.assertEqual(scores[0], calculate_commute_score({"walk": 0.5}))
+        self.assertEqual(scores[1], calculate_commute_score({"drive": 5.0}))
+
+        with self.assertRaises(ValueError):
+            commute_score_matrix({"walk": [np.nan]})
+
+
+class TestScoreBatch(unittest.TestCase):
+    """score_batch() must agree exactly with the scalar scoring path."""
+
+    def setUp(self):
+        self.calc = ScoreCalculator(average_price=1500.0)
+        rng = random.Random(11)
+        types = ["Studio", "1x1", "2x2", "3x2", "4x4", "Basement", "Shared House"]
+        self.rentals = []
+        for i in range(400):
+            distances = {"walk": round(rng.uniform(0, 5), 2)}
+            if i % 3:
+                distances["drive"] = round(rng.uniform(0, 25), 2)
+            if i % 5 == 0:
+                distances["bus"] = round(rng.uniform(0, 10), 2)
+            self.rentals.append(RentalProperty(
+                address=f"{4000 + i} Knox Rd, College Park, MD",
+                # Covers both clamps (ratio <= 0.5 and >= 3.0) and the linear range
+                rent=round(rng.uniform(500, 5000), rng.choice([0, 2])),
+                zipcode=20740,
+                utilities_included=True,
+                property_type_name=rng.choice(types),
+                lease_term=rng.choice([6, 12, 1]),
+                distances=distances,
+                coordinates=(38.98, -76.93)
+            ))
+
+    def test_matches_scalar_path(self):
+        scores = self.calc.score_batch(**ScoreCalculator.rental_columns(self.rentals))
+
+        for i, rental in enumerate(self.rentals):
+            self.assertEqual(scores["price"][i], self.calc.price_score(rental.rent))
+            self.assertEqual(scores["flexibility"][i], self.calc.flexibility_score(rental.lease_term))
+            self.assertEqual(scores["commute"][i], self.calc.commute_score(rental.distances))
+            self.assertEqual(scores["overall"][i], self.calc.overall_score(rental))
+
+    def test_price_clamps(self):
+        scores = self.calc.score_batch([750, 4500, 1500], [12, 12, 12], {"walk": [1, 1, 1]}, [8, 8, 8])
+        self.assertEqual(list(scores["price"]), [10.0, 0.0, 5.0])
+
+    def test_invalid_columns_rejected(self):
+        with self.assertRaises(ValueError):
+            self.calc.score_batch([0, 1200], [12, 12], {"walk": [1, 1]}, [8, 8])
+        with self.assertRaises(ValueError):
+            self.calc.score_batch([1200, 1200], [12], {"walk": [1, 1]}, [8, 8])
+
+
+class TestComponentCache(unittest.TestCase):
+    """Weight changes re-rank from cached component scores."""
+
+    def setUp(self):
+        self.calc = ScoreCalculator()
+        self.rentals = [
+            RentalProperty(f"{4000 + i} Knox Rd, College Park, MD", rent, 20740, True, "2x2",
+                           12, {"walk": walk}, coordinates=(38.98, -76.93))
+            for i, (rent, walk) in enumerate([(900, 3.0), (1600, 0.3), (1200, 1.5)])
+        ]
+
+    def test_default_weights_unchanged(self):
+        self.assertEqual(self.calc.weights, {'price': 0.5, 'flexibility': 0.2, 'commute': 0.3, 'type': 0.1})
+
+    def test_weight_change_reranks_without_rescoring(self):
+        first = [r.address for _, r in self.calc.rank(self.rentals)]
+        self.assertEqual(self.calc.cache_size(), 3)
+
+        with patch.object(ScoreCalculator, "commute_score") as commute, \
+             patch.object(ScoreCalculator, "price_score") as price:
+            self.calc.set_weights(price=0.0, commute=1.0)
+            with patch.object(ScoreCalculator, "_cached_components") as lookup:
+                second = self.calc.rank(self.rentals)
+                lookup.assert_not_called()  # same rentals: only the weighted sum is redone
+            commute.assert_not_called()
+            price.assert_not_called()
+
+        self.assertNotEqual(first, [r.address for _, r in second])
+        self.assertEqual(second[0][1].address, "4001 Knox Rd, College Park, MD")
+        for score, rental in second:
+            self.assertEqual(score, self.calc.overall_score(rental))
+
+    def test_changed_inputs_miss_the_cache(self):
+        before = self.calc.component_key(self.rentals[0])
+        self.rentals[0].rent = 1000
+        self.assertNotEqual(self.calc.component_key(self.rentals[0]), before)
+
+    def test_in_place_edit_refreshes_kept_components(self):
+        before = dict((id(rental), score) for score, rental in self.calc.rank(self.rentals))
+        self.rentals[0].rent = 400
+        ranked = self.calc.rank(self.rentals)
+        self.assertGreater(dict((id(rental), score) for score, rental in ranked)[id(self.rentals[0])],
+                           before[id(self.rentals[0])])
+        for score, rental in ranked:
+            self.assertEqual(score, self.calc.overall_score(rental))
+
+    def test_component_key_extends_the_content_hash(self):
+        key = self.calc.component_key(self.rentals[0])
+        self.assertTrue(key.startswith(self.calc.rental_hash(self.rentals[0]) + ":"))
+
+    def test_market_change_refreshes_kept_components(self):
+        market = MarketAverages(min_count=1)
+        calc = ScoreCalculator(market=market)
+        market.add(20740, "2x2", 1200)
+        before = calc.rank(self.rentals)
+
+        market.add(20740, "2x2", 3000)  # reference price 1200 -> 2100
+        after = calc.rank(self.rentals)
+        self.assertNotEqual([s for s, _ in before], [s for s, _ in after])
+        for score, rental in after:
+            self.assertEqual(score, ScoreCalculator(average_price=2100).overall_score(rental))
+
+    def test_component_cache_is_bounded(self):
+        calc = ScoreCalculator(max_cached=2)
+        calc.rank(self.rentals)
+        self.assertEqual(calc.cache_size(), 2)
+        self.assertEqual(calc.component_scores(self.rentals[0]), self.calc.component_scores(self.rentals[0]))
+
+    def test_invalid_weights_rejected(self):
+        with self.assertRaises(ValueError):
+            self.calc.set_weights(safety=0.2)
+        with self.assertRaises(ValueError):
+            ScoreCalculator(weights={"price": -1})
+
+
+
+class TestWeightSensitivity(unittest.TestCase):
+    """Rank distributions under sampled weight vectors."""
+
+    def setUp(self):
+        self.calc = ScoreCalculator()
+        rng = random.Random(17)
+        self.rentals = [
+            RentalProperty(f"{4000 + i} Knox Rd, College Park, MD", rng.randint(800, 2400), 20740, True,
+                           "2x2", rng.choice([6, 12, 1]), {"walk": round(rng.uniform(0, 4), 2)},
+                           coordinates=(38.98, -76.93))
+            for i in range(40)
+        ]
+
+    def test_ranks_match_scalar_scoring_per_sample(self):
+        report = self.calc.weight_sensitivity(self.rentals, samples=50, seed=3)
+        self.assertEqual(report["ranks"].shape, (40, 50))
+
+        for sample in (0, 17, 49):
+            weights = dict(zip(ScoreCalculator.WEIGHTS, report["weights"][:, sample]))
+            scores = [sum(self.calc.component_scores(r)[name] * w for name, w in weights.items())
+                      for r in self.rentals]
+            best = max(range(40), key=lambda i: (scores[i], -i))
+            self.assertEqual(report["ranks"][best, sample], 1)
+            self.assertEqual(sorted(report["ranks"][:, sample]), list(range(1, 41)))
+
+    def test_zero_spread_reproduces_base_ranking(self):
+        report = self.calc.weight_sensitivity(self.rentals, samples=10, spread=0.0, top_k=5, seed=1)
+        ranked = [rental for _, rental in self.calc.rank(self.rentals)]
+
+        for summary in report["listings"]:
+            self.assertEqual(summary["base_rank"], ranked.index(summary["rental"]) + 1)
+            self.assertEqual(summary["min_rank"], summary["max_rank"])
+            self.assertEqual(summary["top_k_probability"], 1.0 if summary["base_rank"] <= 5 else 0.0)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self.calc.weight_sensitivity(self.rentals, samples=0)
+
+
+
+class TestParallelScoring(unittest.TestCase):
+    """Chunked process-pool scoring returns scalar results in input order."""
+
+    def setUp(self):
+        self.calc = ScoreCalculator(weights={"commute": 0.4})
+        rng = random.Random(18)
+        self.rentals = []
+        for i in range(120):
+            distances = {"walk": round(rng.uniform(0, 4), 2)}
+            if i % 2:
+                distances["drive"] = round(rng.uniform(0, 12), 2)
+            self.rentals.append(RentalProperty(
+                f"{4000 + i} Knox Rd, College Park, MD", rng.randint(600, 4000), 20740, True,
+                rng.choice(["Studio", "2x2", "4x4"]), rng.choice([6, 12, 1]), distances,
+                coordinates=(38.98, -76.93)
+            ))
+        self.expected = [self.calc.overall_score(rental) for rental in self.rentals]
+
+    def test_process_pool_matches_scalar_order(self):
+        scores = score_parallel(self.rentals, self.calc, workers=2, chunk_size=25)
+        self.assertEqual(list(scores["overall"]), self.expected)
+        self.assertEqual(list(scores["commute"]), [self.calc.commute_score(r.distances) for r in self.rentals])
+
+    def test_csv_file_scoring(self):
+        path = "test_parallel_scoring.csv"
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        manager = PropertyManager()
+        for rental in self.rentals:
+            manager.add_rental(rental, 5.0)  # stored score is not used for rescoring
+        manager.save_to_csv(path)
+
+        scores = score_csv_parallel(path, self.calc, workers=1, chunk_size=50)
+        self.assertEqual(list(scores["overall"]), self.expected)
+
+    def test_workers_parse_their_own_shards(self):
+        path = "test_parallel_shards.csv"
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        manager = PropertyManager()
+        for rental in self.rentals:
+            manager.add_rental(rental, 5.0)
+        manager.save_to_csv(path)
+
+        # Quoted newlines and quotes in a field must not split a row between shards
+        with open(path, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        for row in rows:
+            row["Address"] = row["Address"].replace(", ", ',\n"Unit 2"\n')
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        market = MarketAverages()
+        for rental in self.rentals[:60]:
+            market.add(rental.zipcode, rental.property_type_obj.type_key, rental.rent)
+        calculator = ScoreCalculator(weights={"commute": 0.4}, market=market)
+
+        with patch.object(parallel_scoring, "_row_columns", wraps=parallel_scoring._row_columns) as parse:
+            scores = score_csv_parallel(path, calculator, workers=1, chunk_size=10)
+        self.assertGreater(parse.call_count, 5)  # one parse per shard, none up front
+        self.assertEqual(list(scores["overall"]), [calculator.overall_score(r) for r in self.rentals])
+
+        pooled = score_csv_parallel(path, calculator, workers=2, chunk_size=10)
+        self.assertEqual(list(pooled["overall"]), list(scores["overall"]))
+
+    def test_tombstoned_rows_are_skipped(self):
+        path = "test_parallel_tombstones.csv"
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        self.addCleanup(lambda: os.path.exists(path + ".tombstones") and os.remove(path + ".tombstones"))
+        manager = PropertyManager()
+        for rental in self.rentals:
+            manager.add_rental(rental, 5.0)
+        manager.save_to_csv(path)
+        for i in (0, 17, 18, 64, 119):
+            manager.delete(self.rentals[i].address)
+        manager.flush(path)
+
+        kept = {row["Address"] for row in PropertyManager().iter_rows(path, ["Address"])}
+        expected = [score for rental, score in zip(self.rentals, self.expected) if rental.address in kept]
+        self.assertEqual(len(expected), 115)
+        for workers in (1, 2):
+            scores = score_csv_parallel(path, self.calc, workers=workers, chunk_size=10)
+            self.assertEqual(list(scores["overall"]), expected)
+
+    def test_rental_columns_are_built_in_the_workers(self):
+        with patch.object(ScoreCalculator, "rental_columns") as columns, \
+                patch.object(ScoreCalculator, "reference_prices") as prices:
+            scores = score_parallel(self.rentals, self.calc, workers=1, chunk_size=25)
+        columns.assert_not_called()
+        prices.assert_not_called()
+        self.assertEqual(list(scores["overall"]), self.expected)
+
+    def test_invalid_row_reports_its_line(self):
+        path = "test_parallel_invalid.csv"
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Rent", "Lease Term", "Type Score", "Distances"])
+            for i in range(40):
+                writer.writerow([1200, "abc" if i == 31 else 12, 8.0, '{"walk": 1.0}'])
+
+        with self.assertRaisesRegex(ValueError, "line 33"):
+            score_csv_parallel(path, workers=1, chunk_size=4)
+
+    def test_empty_input(self):
+        self.assertEqual(len(score_parallel([], workers=1)["overall"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
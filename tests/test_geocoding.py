@@ -0,0 +1,510 @@
+"""
+Tests for the geocoding layer:
+- Persistent geocode cache (TTL, eviction, invalidation)
+- get_property_coordinates cache integration
+- Lazy, single-shot Coordinates / RentalProperty geocoding
+- Rate-limited batch geocoding
+- Offline gazetteer backend
+- In-flight request coalescing and negative caching
+- Built-in campus destination table
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# allow imports from SRC directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SRC')))
+
+import function_library
+from geocode_cache import GeocodeCache
+from coordinates import Coordinates
+from rental_property import RentalProperty
+from batch_geocoder import BatchGeocoder, TokenBucket
+from geopy.exc import GeocoderTimedOut
+from geocoder_backends import GazetteerBackend, configure_geocoder, create_backend
+from single_flight import NegativeCache, SingleFlight
+from campus_locations import CAMPUS_BUILDINGS, DestinationTable
+from commute import Commute
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestGeocodeCache(unittest.TestCase):
+    """Unit tests for the SQLite geocode cache."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = GeocodeCache(":memory:", ttl_seconds=60, max_entries=2, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_set_and_get(self):
+        self.cache.set("4500 Knox Rd", (38.98, -76.93))
+        self.assertEqual(self.cache.get("4500 Knox Rd"), (38.98, -76.93))
+        self.assertIsNone(self.cache.get("Unknown Rd"))
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set("4500 Knox Rd", (38.98, -76.93))
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get("4500 Knox Rd"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set("A St", (1.0, 1.0))
+        self.clock.now += 1
+        self.cache.set("B St", (2.0, 2.0))
+        self.clock.now += 1
+        self.cache.get("A St")  # A is now more recent than B
+        self.clock.now += 1
+        self.cache.set("C St", (3.0, 3.0))
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("B St"))
+        self.assertEqual(self.cache.get("A St"), (1.0, 1.0))
+
+    def test_sets_below_the_limit_do_not_count_the_table(self):
+        cache = GeocodeCache(":memory:", max_entries=3, clock=self.clock)
+        self.addCleanup(cache.close)
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+
+        for street in ("A St", "B St", "A St", "C St"):
+            cache.set(street, (1.0, 1.0))
+        self.assertFalse([sql for sql in statements if "COUNT(*)" in sql])
+
+        cache.set("D St", (4.0, 4.0))  # passes the limit: counted once, then evicted
+        self.assertEqual(len([sql for sql in statements if "COUNT(*)" in sql]), 1)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(str(cache), "GeocodeCache(:memory:, 3 entries)")
+
+    def test_invalidate(self):
+        self.cache.set("A St", (1.0, 1.0))
+        self.cache.set("B St", (2.0, 2.0))
+        self.assertEqual(self.cache.invalidate("A St"), 1)
+        self.assertIsNone(self.cache.get("A St"))
+        self.assertEqual(self.cache.invalidate(), 1)
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestCachedCoordinates(unittest.TestCase):
+    """Integration tests: get_property_coordinates goes through the cache."""
+
+    def setUp(self):
+        function_library.configure_geocode_cache(":memory:")
+        self.geolocator = MagicMock()
+        self.geolocator.geocode.return_value = SimpleNamespace(latitude=38.99, longitude=-76.94)
+        patcher = patch("function_library._get_geolocator", return_value=self.geolocator)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        function_library.configure_geocode_cache(enabled=False)
+        function_library.configure_negative_cache()
+
+    def test_repeat_lookup_uses_cache(self):
+        first = function_library.get_property_coordinates("7303 baltimore ave, college park, md")
+        second = function_library.get_property_coordinates("7303 Baltimore Ave,  College Park, MD")
+
+        self.assertEqual(first, (38.99, -76.94))
+        self.assertEqual(second, first)
+        self.assertEqual(self.geolocator.geocode.call_count, 1)
+
+    def test_invalidate_forces_new_lookup(self):
+        function_library.get_property_coordinates("4500 Knox Rd, College Park, MD")
+        removed = function_library.invalidate_cached_coordinates("4500 knox rd, college park, md")
+        function_library.get_property_coordinates("4500 Knox Rd, College Park, MD")
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(self.geolocator.geocode.call_count, 2)
+
+    def test_failed_lookup_is_not_cached(self):
+        self.geolocator.geocode.return_value = None
+        with self.assertRaises(ValueError):
+            function_library.get_property_coordinates("Nowhere Rd")
+        self.assertEqual(len(function_library.get_geocode_cache()), 0)
+
+
+class TestLazyCoordinates(unittest.TestCase):
+    """Lazy coordinate mode: deferred, at-most-once and batched lookups."""
+
+    @patch("coordinates.get_property_coordinates", return_value=(38.99, -76.94))
+    def test_eager_coordinates_geocode_once(self, mock_geo):
+        coords = Coordinates("4500 Knox Rd, College Park, MD")
+        self.assertEqual((coords.latitude, coords.longitude), (38.99, -76.94))
+        self.assertEqual(mock_geo.call_count, 1)
+
+    @patch("coordinates.get_property_coordinates", return_value=(38.99, -76.94))
+    def test_lazy_lookup_is_deferred_and_runs_once(self, mock_geo):
+        coords = Coordinates("4500 Knox Rd, College Park, MD", lazy=True)
+        mock_geo.assert_not_called()
+
+        coords.coordinates
+        coords.coordinates
+        self.assertEqual(mock_geo.call_count, 1)
+
+    @patch("coordinates.get_property_coordinates", return_value=(38.99, -76.94))
+    def test_rental_property_does_not_geocode_until_read(self, mock_geo):
+        rental = RentalProperty(
+            address="7303 Baltimore Ave, College Park, MD",
+            rent=1200,
+            zipcode=20740,
+            utilities_included=True,
+            property_type_name="2x2",
+            lease_term=12,
+            distances={"walk": 1.0}
+        )
+        rental.to_dict()
+        mock_geo.assert_not_called()
+
+        self.assertEqual(rental.coordinates, (38.99, -76.94))
+        self.assertIsNotNone(rental.geocoded_at)
+
+    @patch("coordinates.get_property_coordinates", return_value=(38.99, -76.94))
+    def test_resolve_all_dedupes_addresses(self, mock_geo):
+        pending = [Coordinates("4500 Knox Rd", lazy=True) for _ in range(3)]
+        pending.append(Coordinates("7303 Baltimore Ave", lazy=True))
+
+        failures = Coordinates.resolve_all()
+
+        looked_up = [call.args[0] for call in mock_geo.call_args_list]
+        self.assertEqual(failures, {})
+        self.assertEqual(looked_up.count("4500 Knox Rd"), 1)
+        self.assertEqual(looked_up.count("7303 Baltimore Ave"), 1)
+        self.assertTrue(all(c.resolved for c in pending))
+        self.assertEqual(Coordinates.pending_count(), 0)
+
+
+class TestBatchGeocoder(unittest.TestCase):
+    """Batch geocoding: dedupe, retries, rate limiting and backend plug-in."""
+
+    def setUp(self):
+        function_library.configure_geocode_cache(":memory:")
+
+    def tearDown(self):
+        function_library.set_geocoder_backend(None)
+        function_library.configure_geocode_cache(enabled=False)
+        function_library.configure_negative_cache()
+
+    def test_token_bucket_waits_for_tokens(self):
+        clock = FakeClock(0.0)
+        waits = []
+
+        def fake_sleep(seconds):
+            waits.append(seconds)
+            clock.now += seconds
+
+        bucket = TokenBucket(rate_per_second=2.0, capacity=1, clock=clock, sleep=fake_sleep)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(waits, [0.5])
+
+    def test_stream_dedupes_and_reports_failures(self):
+        lock = threading.Lock()
+        calls = []
+
+        def lookup(address):
+            with lock:
+                calls.append(address)
+            return None if address.startswith("Nowhere") else (38.99, -76.94)
+
+        geocoder = BatchGeocoder(lookup=lookup, rate_per_second=1000, burst=10, max_workers=3)
+        results = geocoder.geocode_all(["4500 knox rd", "4500 Knox Rd", "Nowhere Ln", "7303 Baltimore Ave"])
+
+        self.assertEqual(sorted(calls), ["4500 Knox Rd", "7303 Baltimore Ave", "Nowhere Ln"])
+        self.assertEqual(results["4500 Knox Rd"], (38.99, -76.94))
+        self.assertIsInstance(results["Nowhere Ln"], ValueError)
+
+        # Successful lookups land in the shared cache
+        self.assertEqual(function_library.get_geocode_cache().get("7303 Baltimore Ave"), (38.99, -76.94))
+
+    def test_stream_shares_the_single_address_lookup_path(self):
+        lookup = MagicMock(return_value=None)
+        geocoder = BatchGeocoder(lookup=lookup, rate_per_second=1000, burst=10, max_workers=2)
+
+        # Campus buildings come from the destination table
+        results = geocoder.geocode_all(["ESJ", "Nowhere Ln"])
+        self.assertEqual(results["Esj"], CAMPUS_BUILDINGS["ESJ"]["coordinates"])
+        self.assertIsInstance(results["Nowhere Ln"], ValueError)
+        lookup.assert_called_once_with("Nowhere Ln")
+
+        # The failure is negatively cached for both entry points
+        self.assertIsInstance(geocoder.geocode_all(["Nowhere Ln"])["Nowhere Ln"], ValueError)
+        with self.assertRaises(ValueError):
+            function_library.get_property_coordinates("Nowhere Ln")
+        lookup.assert_called_once()
+
+    def test_retries_timeouts_with_backoff(self):
+        attempts = []
+        sleeps = []
+
+        def flaky(address):
+            attempts.append(address)
+            if len(attempts) < 3:
+                raise GeocoderTimedOut("slow")
+            return (1.0, 2.0)
+
+        geocoder = BatchGeocoder(lookup=flaky, rate_per_second=1000, max_retries=3,
+                                 backoff_base=0.5, sleep=sleeps.append)
+        self.assertEqual(geocoder("4500 Knox Rd"), (1.0, 2.0))
+        self.assertEqual(len(attempts), 3)
+        self.assertTrue(0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0)
+
+    def test_plugs_into_get_property_coordinates(self):
+        def always_timeout(address):
+            raise GeocoderTimedOut("down")
+
+        function_library.set_geocoder_backend(
+            BatchGeocoder(lookup=always_timeout, rate_per_second=1000, max_retries=1, sleep=lambda s: None)
+        )
+        with self.assertRaises(ConnectionError):
+            function_library.get_property_coordinates("4500 Knox Rd")
+
+
+class TestGazetteerBackend(unittest.TestCase):
+    """Offline gazetteer: exact, street, prefix and street-centroid matches."""
+
+    def setUp(self):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8")
+        handle.write("address,lat,lon\n")
+        handle.write('"4500 knox rd, college park, md",38.9800,-76.9300\n')
+        handle.write('"4510 Knox Rd, College Park, MD",38.9810,-76.9310\n')
+        handle.write('"7303 Baltimore Ave, College Park, MD 20740",38.9780,-76.9370\n')
+        handle.close()
+        self.path = handle.name
+        self.backend = GazetteerBackend(self.path)
+        function_library.configure_geocode_cache(enabled=False)
+
+    def tearDown(self):
+        function_library.set_geocoder_backend(None)
+        function_library.configure_negative_cache()
+        os.unlink(self.path)
+
+    def test_exact_match(self):
+        self.assertEqual(self.backend.geocode("4500 Knox Rd, College Park, MD"), (38.98, -76.93))
+
+    def test_street_line_match(self):
+        self.assertEqual(self.backend.geocode("4500 Knox Rd, College Park, MD 20740"), (38.98, -76.93))
+
+    def test_prefix_match(self):
+        self.assertEqual(self.backend.geocode("7303 Baltimore Ave, College"), (38.978, -76.937))
+
+    def test_street_centroid_fallback(self):
+        latitude, longitude = self.backend.geocode("4520 Knox Rd")
+        self.assertAlmostEqual(latitude, 38.9805)
+        self.assertAlmostEqual(longitude, -76.9305)
+
+    def test_unknown_address(self):
+        self.assertIsNone(self.backend.geocode("1 Nowhere Ln"))
+
+    def test_fallbacks_stay_in_the_same_city(self):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8")
+        handle.write("address,lat,lon\n")
+        handle.write('"12 Main St, Springfield, IL 62701",39.800,-89.640\n')
+        handle.write('"20 Main St, Springfield, IL 62701",39.802,-89.642\n')
+        handle.write('"12 Main St, Shelbyville, IL 62565",39.400,-88.790\n')
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+        backend = GazetteerBackend(handle.name)
+
+        self.assertEqual(backend.geocode("12 Main St, Shelbyville"), (39.40, -88.79))
+        self.assertIsNone(backend.geocode("12 Main St, Capital City"))
+        self.assertIsNone(backend.geocode("12 Main St"))  # same street line in two cities
+        self.assertIsNone(backend.geocode("16 Main St"))  # centroid would span two cities
+        latitude, _ = backend.geocode("16 Main St, Springfield, IL 62701")
+        self.assertAlmostEqual(latitude, 39.801)
+
+    def test_fuzzy_matches_are_cached_briefly(self):
+        clock = FakeClock()
+        cache = GeocodeCache(":memory:", ttl_seconds=30 * 24 * 3600, clock=clock)
+        self.addCleanup(cache.close)
+        with patch.object(function_library, "get_geocode_cache", return_value=cache):
+            function_library.set_geocoder_backend(self.backend)
+            function_library.get_property_coordinates("4500 Knox Rd, College Park, MD")
+            function_library.get_property_coordinates("4520 Knox Rd, College Park, MD")
+
+        clock.now += function_library.APPROXIMATE_GEOCODE_TTL + 1
+        self.assertEqual(cache.get("4500 Knox Rd, College Park, MD"), (38.98, -76.93))
+        self.assertIsNone(cache.get("4520 Knox Rd, College Park, MD"))
+
+    def test_configured_backend_serves_get_property_coordinates(self):
+        configure_geocoder("gazetteer", path=self.path)
+        self.assertEqual(function_library.get_property_coordinates("4500 knox rd, college park, md"), (38.98, -76.93))
+        with self.assertRaises(ValueError):
+            function_library.get_property_coordinates("1 Nowhere Ln")
+
+    def test_unknown_backend_name(self):
+        with self.assertRaises(ValueError):
+            create_backend("carrier-pigeon")
+
+
+class TestRequestCoalescing(unittest.TestCase):
+    """Single-flight lookups and short-lived negative caching."""
+
+    def setUp(self):
+        function_library.configure_geocode_cache(enabled=False)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        function_library.set_geocoder_backend(None)
+        function_library.configure_negative_cache()
+
+    def test_concurrent_callers_share_one_lookup(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_backend(address):
+            calls.append(address)
+            release.wait(5)
+            return (38.99, -76.94)
+
+        function_library.set_geocoder_backend(slow_backend)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                function_library.get_property_coordinates("4500 Knox Rd, College Park, MD")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)  # let every thread join the in-flight lookup
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [(38.99, -76.94)] * 5)
+
+    def test_waiters_get_a_copy_of_the_leaders_exception(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+        calls = []
+
+        def failing():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("key", failing)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=call)
+        follower.start()
+        time.sleep(0.1)  # let the follower join the in-flight call
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(errors), 2)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual([str(e) for e in errors], ["boom", "boom"])
+        leader_error, = [e for e in errors if e.__cause__ is None]
+        waiter_error, = [e for e in errors if e.__cause__ is not None]
+        self.assertIs(waiter_error.__cause__, leader_error)
+
+    def test_failed_address_is_negatively_cached(self):
+        calls = []
+
+        def backend(address):
+            calls.append(address)
+            return None
+
+        function_library.set_geocoder_backend(backend)
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                function_library.get_property_coordinates("1 Nowhere Ln")
+        self.assertEqual(len(calls), 1)
+
+        function_library.invalidate_cached_coordinates("1 Nowhere Ln")
+        with self.assertRaises(ValueError):
+            function_library.get_property_coordinates("1 Nowhere Ln")
+        self.assertEqual(len(calls), 2)
+
+    def test_negative_hits_raise_fresh_exceptions(self):
+        failures = NegativeCache(ttl_seconds=10, clock=self.clock)
+        failures.add("1 Nowhere Ln", ValueError("not found"))
+        raised = []
+        for _ in range(3):
+            try:
+                raise failures.get("1 Nowhere Ln")
+            except ValueError as e:
+                raised.append(e)
+        self.assertEqual(len({id(e) for e in raised}), 3)
+        self.assertTrue(all(e.__traceback__.tb_next is None for e in raised))
+        self.assertEqual(str(raised[0]), "not found")
+
+    def test_negative_entries_expire(self):
+        failures = NegativeCache(ttl_seconds=10, clock=self.clock)
+        failures.add("1 Nowhere Ln", ValueError("not found"))
+        self.assertIsInstance(failures.get("1 Nowhere Ln"), ValueError)
+        self.clock.now += 11
+        self.assertIsNone(failures.get("1 Nowhere Ln"))
+
+
+class TestCampusDestinations(unittest.TestCase):
+    """Campus buildings resolve from the built-in table with no geocoding."""
+
+    def setUp(self):
+        function_library.configure_geocode_cache(enabled=False)
+        self.backend = MagicMock(return_value=None)
+        function_library.set_geocoder_backend(self.backend)
+
+    def tearDown(self):
+        function_library.set_geocoder_backend(None)
+        function_library.set_destination_table(None)
+        function_library.configure_negative_cache()
+
+    def test_every_class_building_is_known(self):
+        table = DestinationTable.campus()
+        for code in ["ESJ", "HBK", "KEY", "MMH", "CCC", "TWS"]:
+            self.assertIn(code, table)
+        # validate_class_locations() returns title-cased codes
+        self.assertEqual(table.lookup("Esj"), CAMPUS_BUILDINGS["ESJ"]["coordinates"])
+
+    def test_distance_between_destinations_needs_no_lookup(self):
+        miles = function_library.calculate_distance("ESJ", "7649 Library Ln, College Park, MD 20742")
+        self.assertGreater(miles, 0)
+        self.assertLess(miles, 1)
+        self.backend.assert_not_called()
+
+    def test_commute_to_building_by_name(self):
+        commute = Commute("Hornbake Library", "Tawes Hall", "walk")
+        self.assertGreater(commute.time_minutes, 0)
+        self.backend.assert_not_called()
+
+    def test_load_destinations_from_csv(self):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8")
+        handle.write("code,name,address,lat,lon\nGYM,Eppley Recreation Center,,38.9935,-76.9450\n")
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+
+        function_library.set_destination_table(DestinationTable.from_csv(handle.name))
+        self.assertEqual(function_library.get_property_coordinates("eppley recreation center"), (38.9935, -76.945))
+        self.assertIn("ESJ", function_library.get_destination_table())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,14 +4,25 @@ from pathlib import Path
 import unittest
 import os
 import json
+import shutil
+from unittest.mock import patch
+
+import numpy as np
 
 # Add SRC directory to Python path
 sys.path.append(str(Path(__file__).resolve().parents[1] / "SRC"))
 
 from listing_manager import PropertyManager
 from rental_property import RentalProperty
+from score_calculator import ScoreCalculator
+from storage import SQLiteStore
+from snapshot import Snapshot
+from record_store import RecordStore
 
 TEST_CSV = Path(__file__).parent / "test_persistence.csv"
+TEST_DB = Path(__file__).parent / "test_persistence.db"
+TEST_SNAPSHOT = Path(__file__).parent / "test_snapshot"
+TEST_RECORDS = Path(__file__).parent / "test_records.rec"
 
 
 class TestIOPersistence(unittest.TestCase):
@@ -20,6 +31,9 @@ class TestIOPersistence(unittest.TestCase):
         # Clean up test CSV after each run
         if TEST_CSV.exists():
             TEST_CSV.unlink()
+        tombstones = Path(str(TEST_CSV) + ".tombstones")
+        if tombstones.exists():
+            tombstones.unlink()
 
     def test_save_and_load_properties(self):
         manager = PropertyManager()
@@ -53,11 +67,601 @@ class TestIOPersistence(unittest.TestCase):
         distances = json.loads(loaded[0]["Distances"])
         self.assertEqual(distances["UMD"], 10)
 
+    @patch("coordinates.get_property_coordinates", return_value=(38.99, -76.94))
+    def test_load_rentals_restores_coordinates_without_geocoding(self, mock_geo):
+        manager = PropertyManager()
+        rental = RentalProperty(
+            address="123 College Ave, College Park, MD",
+            rent=1200,
+            zipcode=20740,
+            utilities_included=True,
+            property_type_name="1x1",
+            lease_term=12,
+            distances={"walk": 0.5}
+        )
+        rental.coordinates  # resolve the lazy lookup before saving
+        manager.add_rental(rental, score=8.5)
+        manager.save_to_csv(TEST_CSV)
+        mock_geo.reset_mock()
+
+        loaded = PropertyManager().load_rentals_from_csv(TEST_CSV)
+
+        mock_geo.assert_not_called()
+        self.assertEqual(loaded[0].coordinates, (38.99, -76.94))
+        self.assertEqual(loaded[0].geocoded_at, rental.geocoded_at)
+
+    def test_rescore_skips_unchanged_rows(self):
+        calculator = ScoreCalculator()
+        manager = PropertyManager()
+        for i, rent in enumerate((1000, 1200, 1400)):
+            rental = RentalProperty(f"{4500 + i} Knox Rd, College Park, MD", rent, 20740, True, "2x2", 12,
+                                    {"walk": 0.5 + i, "drive": 2}, coordinates=(38.98, -76.93))
+            manager.add_rental(rental, calculator.overall_score(rental), calculator)
+        manager.save_to_csv(TEST_CSV)
+
+        # Edit one row on disk
+        reloaded = PropertyManager()
+        rows = reloaded.load_from_csv(TEST_CSV)
+        rows[1]["Rent"] = "1600"
+        reloaded.save_to_csv(TEST_CSV)
+
+        fresh = PropertyManager()
+        with patch("listing_manager.RentalProperty.from_dict", wraps=RentalProperty.from_dict) as rebuild:
+            counts = fresh.load_scored_csv(TEST_CSV, calculator)
+        self.assertEqual(counts, {"reused": 2, "rescored": 1, "skipped": 0})
+        self.assertEqual(rebuild.call_count, 1)
+
+        edited = fresh.list_properties()[1]
+        expected = RentalProperty.from_dict(edited)
+        self.assertEqual(edited["Overall Score"], calculator.overall_score(expected))
+        self.assertEqual(edited["Price Score"], calculator.price_score(1600))
+
+    def test_weight_change_invalidates_stored_scores(self):
+        calculator = ScoreCalculator()
+        manager = PropertyManager()
+        rental = RentalProperty("4500 Knox Rd, College Park, MD", 1200, 20740, True, "2x2", 12,
+                                {"walk": 1.0}, coordinates=(38.98, -76.93))
+        manager.add_rental(rental, calculator.overall_score(rental), calculator)
+
+        self.assertEqual(manager.rescore(calculator)["reused"], 1)
+        calculator.set_weights(commute=0.6)
+        self.assertEqual(manager.rescore(calculator)["rescored"], 1)
+        self.assertEqual(manager.list_properties()[0]["Overall Score"], calculator.overall_score(rental))
+
+    def test_market_move_invalidates_stored_price_scores(self):
+        manager = PropertyManager()
+        calculator = ScoreCalculator(market=manager.market)
+        originals = []
+        for i, rent in enumerate((1000, 1200, 1400)):
+            rental = RentalProperty(f"{4500 + i} Knox Rd, College Park, MD", rent, 20740, True, "2x2", 12,
+                                    {"walk": 1.0}, coordinates=(38.98, -76.93))
+            originals.append(manager.add_rental(rental, calculator.overall_score(rental), calculator))
+        manager.rescore(calculator)  # settle the scores taken while the market filled up
+        self.assertEqual(manager.rescore(calculator)["reused"], 3)
+
+        for i in range(39):
+            rental = RentalProperty(f"{5000 + i} Knox Rd, College Park, MD", 3000, 20740, True, "2x2", 12,
+                                    {"walk": 1.0}, coordinates=(38.98, -76.93))
+            manager.add_rental(rental, 5.0)
+
+        counts = manager.rescore(calculator)
+        self.assertEqual(counts["rescored"], 42)
+        for row in originals:
+            self.assertEqual(row["Price Score"], calculator.price_score(float(row["Rent"]), 20740, "2x2"))
+        self.assertEqual(manager.rescore(calculator)["reused"], 42)
+
+    def test_reload_reuses_rows_while_the_market_holds(self):
+        manager = PropertyManager()
+        calculator = ScoreCalculator(market=manager.market)
+        for i, rent in enumerate((1000, 1200, 1400, 1300)):
+            rental = RentalProperty(f"{4500 + i} Knox Rd, College Park, MD", rent, 20740, True, "2x2", 12,
+                                    {"walk": 1.0}, coordinates=(38.98, -76.93))
+            manager.add_rental(rental, calculator.overall_score(rental), calculator)
+        manager.rescore(calculator)
+        manager.save_to_csv(TEST_CSV)
+
+        fresh = PropertyManager()
+        self.assertEqual(fresh.load_scored_csv(TEST_CSV, ScoreCalculator(market=fresh.market))["reused"], 4)
+
+        # One more listing near the local mean moves it by well under 2%
+        fresh_calculator = ScoreCalculator(market=fresh.market)
+        rental = RentalProperty("4600 Knox Rd, College Park, MD", 1250, 20740, True, "2x2", 12,
+                                {"walk": 1.0}, coordinates=(38.98, -76.93))
+        added = fresh.add_rental(rental, fresh_calculator.overall_score(rental), fresh_calculator)
+        self.assertEqual(added["Reference Price"], fresh.market.reference_price("20740", "2x2"))
+        self.assertEqual(fresh.rescore(fresh_calculator), {"reused": 5, "rescored": 0, "skipped": 0})
+
+    def test_iter_rows_streams_with_projection(self):
+        manager = PropertyManager()
+        for i in range(5):
+            rental = RentalProperty(f"{4500 + i} Knox Rd, College Park, MD", 1000 + i, 20740, True, "2x2", 12,
+                                    {"walk": 1.0}, coordinates=(38.98, -76.93))
+            manager.add_rental(rental, 7.0)
+        manager.save_to_csv(TEST_CSV)
+
+        reader = PropertyManager()
+        rows = reader.iter_rows(TEST_CSV, columns=["Address", "Rent"])
+        self.assertEqual(next(rows), {"Address": "4500 Knox Rd, College Park, MD", "Rent": "1000.0"})
+        self.assertEqual(len(list(rows)), 4)
+        self.assertEqual(reader.list_properties(), [])  # nothing stored
+
+        with self.assertRaises(ValueError):
+            next(reader.iter_rows(TEST_CSV, columns=["Bedrooms"]))
+
+    @patch("coordinates.get_property_coordinates")
+    def test_iter_rentals_rebuilds_lazily(self, mock_geo):
+        manager = PropertyManager()
+        rental = RentalProperty("4500 Knox Rd, College Park, MD", 1200, 20740, True, "Studio", 6,
+                                {"walk": 1.0}, coordinates=(38.98, -76.93))
+        manager.add_rental(rental, 7.0)
+        manager.save_to_csv(TEST_CSV)
+
+        rentals = list(PropertyManager().iter_rentals(TEST_CSV))
+        self.assertEqual(len(rentals), 1)
+        self.assertEqual(rentals[0].coordinates, (38.98, -76.93))
+        mock_geo.assert_not_called()
+
+    def make_rental(self, number, rent=1200):
+        return RentalProperty(f"{number} Knox Rd, College Park, MD", rent, 20740, True, "2x2", 12,
+                              {"walk": 1.0}, coordinates=(38.98, -76.93))
+
+    def test_flush_appends_only_new_rows(self):
+        manager = PropertyManager()
+        manager.add_rental(self.make_rental(4500), 7.0)
+        self.assertEqual(manager.flush(TEST_CSV), 1)
+        self.assertFalse(manager.dirty)
+
+        with manager:
+            manager.add_rental(self.make_rental(4501), 6.0)
+            manager.add_rental(self.make_rental(4502), 5.0)
+            self.assertTrue(manager.dirty)
+            with patch.object(PropertyManager, "save_to_csv") as rewrite:
+                self.assertEqual(manager.flush(), 2)
+                rewrite.assert_not_called()
+            manager.add_rental(self.make_rental(4503), 4.0)
+        # leaving the block flushed the last row
+
+        with open(TEST_CSV, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines.count(lines[0]), 1)  # header written once
+
+        loaded = PropertyManager().load_from_csv(TEST_CSV)
+        self.assertEqual([row["Overall Score"] for row in loaded], ["7.0", "6.0", "5.0", "4.0"])
+
+    def test_flush_keeps_existing_header(self):
+        # An older file without the coordinate and scoring columns
+        with open(TEST_CSV, "w", encoding="utf-8") as f:
+            f.write("Address,Rent,Overall Score\n4400 Knox Rd,1100,6.5\n")
+
+        manager = PropertyManager()
+        manager.add_rental(self.make_rental(4500), 7.0)
+        manager.flush(TEST_CSV)
+
+        rows = PropertyManager().load_from_csv(TEST_CSV)
+        self.assertEqual(rows[0]["Address"], "4400 Knox Rd")
+        self.assertEqual(rows[0]["Latitude"], "")
+        self.assertEqual(rows[1]["Latitude"], "38.98")
+        self.assertEqual(len(rows), 2)
+
+    def test_rescored_rows_are_appended_not_rewritten(self):
+        calculator = ScoreCalculator()
+        manager = PropertyManager()
+        for number in (4500, 4501, 4502):
+            rental = self.make_rental(number, rent=1000 + number % 10 * 100)
+            manager.add_rental(rental, calculator.overall_score(rental), calculator)
+        manager.save_to_csv(TEST_CSV)
+
+        calculator.set_weights(price=0.6)
+        session = PropertyManager()
+        self.assertEqual(session.load_scored_csv(TEST_CSV, calculator)["rescored"], 3)
+        session.remove_property(0)
+        with patch.object(PropertyManager, "save_to_csv") as rewrite:
+            self.assertEqual(session.flush(), 2)
+            rewrite.assert_not_called()
+        tombstones = Path(str(TEST_CSV) + ".tombstones").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(tombstones), 3)
+
+        reloaded = PropertyManager()
+        counts = reloaded.load_scored_csv(TEST_CSV, calculator)
+        self.assertEqual(counts, {"reused": 2, "rescored": 0, "skipped": 0})
+        self.assertEqual([float(row["Overall Score"]) for row in reloaded.list_properties()],
+                         [row["Overall Score"] for row in session.list_properties()])
+
+    def test_flush_to_another_file_writes_loaded_rows(self):
+        manager = PropertyManager()
+        for number in (4500, 4501):
+            manager.add_rental(self.make_rental(number), 7.0)
+        manager.save_to_csv(TEST_CSV)
+
+        other = Path(str(TEST_CSV) + ".copy.csv")
+        self.addCleanup(lambda: other.exists() and other.unlink())
+        session = PropertyManager()
+        session.load_from_csv(TEST_CSV)
+        session.add_rental(self.make_rental(4502), 6.0)
+        self.assertEqual(session.flush(other), 3)
+        self.assertEqual(len(PropertyManager().load_from_csv(other)), 3)
+
+    def test_delete_writes_tombstone_not_file(self):
+        manager = PropertyManager(compact_fraction=0.5)
+        for number in (4500, 4501, 4502, 4503):
+            manager.add_rental(self.make_rental(number), 7.0)
+        manager.flush(TEST_CSV)
+        size = TEST_CSV.stat().st_size
+
+        self.assertEqual(manager.delete("4501 knox rd, college park, md"), 1)
+        with patch.object(PropertyManager, "save_to_csv") as rewrite:
+            manager.flush()
+            rewrite.assert_not_called()
+        self.assertEqual(TEST_CSV.stat().st_size, size)
+
+        reader = PropertyManager()
+        self.assertEqual([row["Address"][:4] for row in reader.iter_rows(TEST_CSV)], ["4500", "4502", "4503"])
+
+        # Re-adding the same address after the delete is kept
+        reader.load_from_csv(TEST_CSV)
+        reader.add_rental(self.make_rental(4501, rent=1500), 6.0)
+        reader.flush()
+        rows = PropertyManager().load_from_csv(TEST_CSV)
+        self.assertEqual([row["Address"][:4] for row in rows], ["4500", "4502", "4503", "4501"])
+
+    def test_compaction_after_dead_fraction(self):
+        tombstones = Path(str(TEST_CSV) + ".tombstones")
+
+        manager = PropertyManager(compact_fraction=0.5)
+        for number in range(4500, 4506):
+            manager.add_rental(self.make_rental(number), 7.0)
+        manager.flush(TEST_CSV)
+
+        manager.remove_property(0)
+        manager.remove_property(0)
+        manager.flush()
+        self.assertTrue(tombstones.exists())
+        self.assertEqual(PropertyManager()._count_rows(TEST_CSV), 6)
+
+        self.assertFalse(manager.compaction_due)
+        self.assertEqual(manager.compact_if_due(), 0)
+
+        manager.delete("4502 Knox Rd, College Park, MD")  # 3 of 6 rows dead
+        with patch.object(PropertyManager, "compact") as compact:
+            manager.flush()
+            compact.assert_not_called()  # flush stays append-only
+        self.assertTrue(manager.compaction_due)
+        self.assertEqual(manager.compact_if_due(), 3)
+        self.assertFalse(tombstones.exists())
+        self.assertEqual(PropertyManager()._count_rows(TEST_CSV), 3)
+
+        # Row numbers were remapped: later deletes still hit the right rows
+        manager.delete("4505 Knox Rd, College Park, MD")
+        manager.flush()
+        rows = PropertyManager().load_from_csv(TEST_CSV)
+        self.assertEqual([row["Address"][:4] for row in rows], ["4503", "4504"])
+
+    def test_row_numbers_follow_the_listing_not_its_id(self):
+        manager = PropertyManager()
+        for number in (4500, 4501, 4502):
+            manager.add_rental(self.make_rental(number), 7.0)
+        manager.flush(TEST_CSV)
+
+        # A different dict that happens to reuse a stored listing's id() is not on disk
+        stored = manager.list_properties()[1]
+        manager._row_numbers[id(stored)] = (dict(stored), 1)
+        self.assertIsNone(manager._row_number(stored))
+
+        manager.load_from_csv(TEST_CSV)
+        manager.remove_property(1)
+        manager.flush()
+        with manager:
+            manager.remove_property(0)  # 2 of 3 rows dead: compacted when the block ends
+        rows = PropertyManager().load_from_csv(TEST_CSV)
+        self.assertEqual([row["Address"][:4] for row in rows], ["4502"])
+        self.assertFalse(Path(str(TEST_CSV) + ".tombstones").exists())
+
     def test_load_missing_file_raises_error(self):
         manager = PropertyManager()
         with self.assertRaises(ValueError):
             manager.load_from_csv("missing.csv")
 
 
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SQLiteStore(TEST_DB)
+
+    def tearDown(self):
+        self.store.close()
+        for path in (TEST_CSV, TEST_DB, Path(f"{TEST_DB}-wal"), Path(f"{TEST_DB}-shm")):
+            if path.exists():
+                path.unlink()
+
+    def make_rental(self, number, rent=1200, zipcode=20740, property_type="2x2"):
+        return RentalProperty(f"{number} Knox Rd, College Park, MD", rent, zipcode, True,
+                              property_type, 12, {"walk": 1.0}, coordinates=(38.98, -76.93))
+
+    def test_flush_inserts_and_deletes_in_database(self):
+        with PropertyManager(storage=self.store) as manager:
+            for number, rent in ((4500, 1500), (4501, 1100), (4502, 1300)):
+                manager.add_rental(self.make_rental(number, rent), 7.0)
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        manager = PropertyManager(storage=SQLiteStore(TEST_DB))
+        loaded = manager.load_from_storage()
+        self.assertEqual([row["Address"][:4] for row in loaded], ["4500", "4501", "4502"])
+        self.assertEqual(loaded[0]["Rent"], 1500)
+
+        manager.remove_property(1)
+        manager.add_rental(self.make_rental(4503), 6.0)
+        self.assertEqual(manager.flush(), 1)
+        self.assertFalse(manager.dirty)
+        addresses = [row["Address"][:4] for _, row in self.store.iter_listings()]
+        self.assertEqual(addresses, ["4500", "4502", "4503"])
+        manager.storage.close()
+
+    def test_ids_are_not_reused_after_deletes(self):
+        listings = [{"Address": f"{number} Knox Rd", "Overall Score": 7.0} for number in range(4500, 4503)]
+        first = self.store.insert_many(listings)
+        self.assertEqual(self.store.delete_ids(first[1:]), 2)
+        second = self.store.insert_many(listings[1:])
+        self.assertEqual(second, [first[-1] + 1, first[-1] + 2])
+        self.assertEqual([listing_id for listing_id, _ in self.store.iter_listings()], first[:1] + second)
+
+    def test_query_filters_and_ranks_like_memory(self):
+        memory = PropertyManager()
+        manager = PropertyManager(storage=self.store)
+        for number in range(40):
+            rental = self.make_rental(4500 + number, rent=900 + 37 * number % 800,
+                                      zipcode=20740 + number % 2,
+                                      property_type=("2x2", "1x1", "Studio")[number % 3])
+            score = (number * 7) % 10 + 0.5
+            memory.add_rental(rental, score)
+            manager.add_rental(rental, score)
+        manager.flush()
+
+        for kwargs in (
+            {},
+            {"zipcode": "20740", "property_type": "2X2"},
+            {"min_rent": 1000, "max_rent": 1400, "order_by": "rent"},
+            {"min_score": 6, "limit": 5},
+            {"property_type": "studio", "order_by": "inserted", "limit": 3},
+        ):
+            expected = [row["Address"] for row in memory.query(**kwargs)]
+            actual = [row["Address"] for row in manager.query(**kwargs)]
+            self.assertEqual(actual, expected, kwargs)
+
+        with self.assertRaises(ValueError):
+            manager.query(order_by="distance")
+
+    def test_csv_import_export_round_trip(self):
+        manager = PropertyManager()
+        for number in range(4500, 4505):
+            manager.add_rental(self.make_rental(number, rent=1000 + number % 10), 7.0)
+        manager.save_to_csv(TEST_CSV)
+
+        database = PropertyManager(storage=self.store)
+        self.assertEqual(database.import_csv(TEST_CSV), 5)
+        self.assertEqual(len(database.query(max_rent=1002)), 3)
+
+        original = TEST_CSV.read_text(encoding="utf-8")
+        self.assertEqual(database.export_csv(TEST_CSV), 5)
+        self.assertEqual(TEST_CSV.read_text(encoding="utf-8"), original)
+
+    def test_rescore_updates_rows_without_dropping_unloaded_ones(self):
+        source = PropertyManager()
+        for number in range(4500, 4503):
+            source.add_rental(self.make_rental(number), 7.0)
+        source.save_to_csv(TEST_CSV)
+
+        calculator = ScoreCalculator()
+        manager = PropertyManager(storage=self.store)
+        manager.import_csv(TEST_CSV)  # stored, but not loaded into the manager
+        manager.add_rental(self.make_rental(4503), 7.0)
+        manager.flush()
+        manager.rescore(calculator)
+        self.assertEqual(manager.flush(), 1)
+        self.assertEqual(len(self.store), 4)
+
+        rescored = PropertyManager(storage=self.store)
+        self.assertEqual(len(rescored.load_from_storage()), 4)
+        for listing in rescored.list_properties()[:2]:
+            listing["Rent"] = 1600  # edited in place, then rescored
+        # 4500 and 4501 changed; 4502 was imported unscored; 4503 is up to date
+        self.assertEqual(rescored.rescore(calculator)["rescored"], 3)
+        self.assertEqual(rescored.flush(), 3)
+
+        rows = {row["Address"][:4]: row for _, row in self.store.iter_listings()}
+        self.assertEqual(sorted(rows), ["4500", "4501", "4502", "4503"])
+        self.assertEqual(rows["4500"]["Rent"], 1600)
+        self.assertEqual(rows["4502"]["Price Score"], calculator.price_score(1200))
+        self.assertEqual(len(self.store.query(min_rent=1600)), 2)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def tearDown(self):
+        shutil.rmtree(TEST_SNAPSHOT, ignore_errors=True)
+        if TEST_CSV.exists():
+            TEST_CSV.unlink()
+
+    def make_manager(self, count=30):
+        manager = PropertyManager()
+        for number in range(count):
+            rental = RentalProperty(f"{4500 + number} Knox Rd, College Park, MD",
+                                    1000 + 45.5 * (number % 7), 20740 + number % 3, number % 2 == 0,
+                                    ("2x2", "1x1", "Studio")[number % 3], 12, {"walk": 0.5 + number / 10},
+                                    coordinates=(38.98 + number / 1e5, -76.93 - number / 1e5))
+            manager.add_rental(rental, (number * 7) % 10 + 0.25)
+        return manager
+
+    def test_csv_round_trip_is_lossless(self):
+        manager = self.make_manager()
+        manager.save_to_csv(TEST_CSV)
+        original = TEST_CSV.read_text(encoding="utf-8")
+
+        from_csv = PropertyManager()
+        from_csv.load_from_csv(TEST_CSV)
+        from_csv.save_snapshot(TEST_SNAPSHOT)
+
+        restored = PropertyManager()
+        restored.load_snapshot(TEST_SNAPSHOT)
+        restored.save_to_csv(TEST_CSV)
+        self.assertEqual(TEST_CSV.read_text(encoding="utf-8"), original)
+
+    def test_columns_are_typed_and_memory_mapped(self):
+        self.make_manager().save_snapshot(TEST_SNAPSHOT)
+        snapshot = PropertyManager.open_snapshot(TEST_SNAPSHOT)
+
+        self.assertEqual(len(snapshot), 30)
+        self.assertIsInstance(snapshot.array("Rent"), np.memmap)
+        self.assertEqual(snapshot.array("Rent").dtype, np.float64)
+        self.assertEqual(snapshot.array("ZIP").dtype, np.int32)
+        self.assertEqual(snapshot.array("Property Type").dtype, np.uint8)
+        self.assertEqual(snapshot.categories("Property Type"), ["2x2", "1x1", "Studio"])
+        self.assertEqual(snapshot.row(-1)["Address"], "4529 Knox Rd, College Park, MD")
+
+    def test_query_matches_in_memory_query(self):
+        manager = self.make_manager()
+        manager.save_snapshot(TEST_SNAPSHOT)
+        snapshot = Snapshot(TEST_SNAPSHOT)
+
+        for kwargs in (
+            {},
+            {"zipcode": "20741", "property_type": "1X1"},
+            {"min_rent": 1040, "max_rent": 1150, "order_by": "rent"},
+            {"min_score": 6, "limit": 4},
+        ):
+            expected = [row["Address"] for row in manager.query(**kwargs)]
+            actual = [row["Address"] for row in snapshot.query(**kwargs)]
+            self.assertEqual(actual, expected, kwargs)
+
+    def test_resave_leaves_open_snapshots_intact(self):
+        self.make_manager().save_snapshot(TEST_SNAPSHOT)
+        before = Snapshot(TEST_SNAPSHOT)
+        first_rent = before.array("Rent")[0]
+
+        self.make_manager(count=5).save_snapshot(TEST_SNAPSHOT)
+        after = Snapshot(TEST_SNAPSHOT)
+
+        # The mapped arrays of the old generation still hold the old rows
+        self.assertEqual(len(before.values("Address")), 30)
+        self.assertEqual(before.array("Rent")[0], first_rent)
+        self.assertEqual(before.row(29)["Address"], "4529 Knox Rd, College Park, MD")
+        self.assertEqual(len(after.rows()), 5)
+        self.assertEqual([path.name for path in TEST_SNAPSHOT.glob("gen-*")],
+                         [json.loads((TEST_SNAPSHOT / "manifest.json").read_text())["generation"]])
+
+    def test_missing_manifest_raises_error(self):
+        with self.assertRaises(ValueError):
+            PropertyManager().load_snapshot(TEST_SNAPSHOT)
+
+
+class TestRecordStore(unittest.TestCase):
+
+    def tearDown(self):
+        for suffix in ("", ".strings", ".index"):
+            path = Path(f"{TEST_RECORDS}{suffix}")
+            if path.exists():
+                path.unlink()
+
+    def make_listing(self, number):
+        return {"Address": f"{number} Knox Rd, College Park, MD", "Rent": 1000 + number % 500,
+                "ZIP": "20740", "Overall Score": (number % 10) + 0.5, "Distances": '{"walk": 1.0}'}
+
+    def test_manager_records_read_by_number_and_address(self):
+        manager = PropertyManager()
+        for number in range(4500, 4510):
+            rental = RentalProperty(f"{number} Knox Rd, College Park, MD", 1200, 20740, True, "2x2",
+                                    12, {"walk": 1.0}, coordinates=(38.98, -76.93))
+            manager.add_rental(rental, 7.5)
+        self.assertEqual(manager.save_records(TEST_RECORDS), 10)
+
+        with PropertyManager.open_records(TEST_RECORDS) as store:
+            self.assertEqual(len(store), 10)
+            self.assertEqual(store.get(3), manager.list_properties()[3])
+            self.assertEqual(store.find("  4507 KNOX RD, college park, md "), [7])
+            self.assertEqual(store.lookup("9999 Knox Rd"), [])
+
+    def test_score_updates_and_deletes_are_in_place(self):
+        with RecordStore(TEST_RECORDS) as store:
+            store.append_many(self.make_listing(n) for n in range(3000))  # grows the index
+            size = TEST_RECORDS.stat().st_size
+
+            store.update_score(42, 9.75)
+            self.assertTrue(store.delete(43))
+            self.assertFalse(store.delete(43))
+            with self.assertRaises(IndexError):
+                store.get(43)
+            with self.assertRaises(IndexError):
+                store.update_score(3000, 1.0)
+            self.assertEqual(TEST_RECORDS.stat().st_size, size)
+
+        with RecordStore(TEST_RECORDS) as store:
+            self.assertEqual(len(store), 2999)
+            self.assertEqual(store.get(42)["Overall Score"], 9.75)
+            self.assertEqual(list(store.get(42)), list(self.make_listing(42)))
+            self.assertEqual(store.find("43 Knox Rd, College Park, MD"), [])
+            self.assertEqual(store.find("2999 Knox Rd, College Park, MD"), [2999])
+            self.assertEqual(sum(1 for _ in store), 2999)
+
+    def test_attached_store_follows_adds_deletes_and_rescores(self):
+        calculator = ScoreCalculator()
+        with RecordStore(TEST_RECORDS) as store:
+            manager = PropertyManager(records=store)
+            for number, rent in ((4500, 1000), (4501, 1200), (4502, 1400)):
+                rental = RentalProperty(f"{number} Knox Rd, College Park, MD", rent, 20740, True, "2x2",
+                                        12, {"walk": 1.0}, coordinates=(38.98, -76.93))
+                manager.add_rental(rental, calculator.overall_score(rental), calculator)
+            manager.remove_property(1)
+            calculator.set_weights(price=0.6)
+            self.assertEqual(manager.rescore(calculator)["rescored"], 2)
+
+            self.assertEqual(len(store), 2)
+            with self.assertRaises(IndexError):
+                store.score(1)
+            for listing in manager.list_properties():
+                # Superseding records carry the new components and hash, not just the score
+                self.assertEqual(store.lookup(listing["Address"]), [listing])
+
+        with RecordStore(TEST_RECORDS) as store:
+            reloaded = PropertyManager(records=store)
+            rows = reloaded.load_from_records()
+            self.assertEqual([row["Address"][:4] for row in rows], ["4500", "4502"])
+            reloaded.delete("4500 Knox Rd, College Park, MD")
+            self.assertEqual(store.find("4500 Knox Rd, College Park, MD"), [])
+            self.assertEqual(len(store), 1)
+
+    def test_appends_grow_the_files_geometrically(self):
+        with RecordStore(TEST_RECORDS) as store:
+            with patch("record_store.mmap.mmap", wraps=__import__("mmap").mmap) as mapping:
+                for number in range(2000):
+                    store.append(self.make_listing(number))
+            self.assertLess(mapping.call_count, 40)
+            self.assertEqual(store.get(1999), self.make_listing(1999) | {"Overall Score": 9.5})
+
+        with RecordStore(TEST_RECORDS) as store:
+            self.assertEqual(len(store), 2000)
+            self.assertEqual(store.replace(7, self.make_listing(7) | {"Rent": 999}), 2000)
+            self.assertEqual(store.lookup("7 Knox Rd, College Park, MD")[0]["Rent"], 999)
+            self.assertEqual(store.append(self.make_listing(5000)), 2001)
+            self.assertEqual(store.get(10), self.make_listing(10) | {"Overall Score": 0.5})
+
+    @patch("coordinates.get_property_coordinates", return_value=(38.99, -76.94))
+    def test_located_coordinates_reach_the_record_store(self, _):
+        with RecordStore(TEST_RECORDS) as store:
+            manager = PropertyManager(records=store)
+            rental = RentalProperty("4500 Knox Rd, College Park, MD", 1200, 20740, True, "2x2",
+                                    12, {"walk": 1.0})
+            manager.add_rental(rental, 7.5)
+            self.assertEqual(store.lookup("4500 Knox Rd, College Park, MD")[0]["Latitude"], "")
+
+            manager.rentals_within((38.99, -76.94), 1.0)
+            self.assertEqual(store.lookup("4500 Knox Rd, College Park, MD")[0]["Latitude"], 38.99)
+
+    def test_rejects_other_files(self):
+        TEST_RECORDS.write_bytes(b"not a record store at all")
+        with self.assertRaises(ValueError):
+            RecordStore(TEST_RECORDS)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
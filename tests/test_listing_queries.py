@@ -0,0 +1,314 @@
+"""
+Tests for PropertyManager queries over stored listings:
+- Spatial index (radius and nearest-neighbor queries)
+- Top-K ranking
+- Sorted score/rent indexes
+- Streaming market averages
+- Pareto skyline
+"""
+import os
+import random
+import sys
+import unittest
+
+# allow imports from SRC directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SRC')))
+
+import function_library
+from listing_manager import PropertyManager
+from rental_property import RentalProperty
+from market_stats import MarketAverages, P2Quantile
+from ranking import SortedIndex
+from skyline import Skyline
+from score_calculator import ScoreCalculator
+from spatial_index import GridIndex, haversine_miles
+
+ESJ = (38.98695, -76.94178)
+
+
+def make_rental(number, coordinates, property_type="2x2", rent=1200, lease_term=12):
+    """Build a rental with known coordinates (no geocoding)."""
+    return RentalProperty(
+        address=f"{number} Knox Rd, College Park, MD",
+        rent=rent,
+        zipcode=20740,
+        utilities_included=True,
+        property_type_name=property_type,
+        lease_term=lease_term,
+        distances={"walk": 1.0},
+        coordinates=coordinates
+    )
+
+
+class TestSpatialQueries(unittest.TestCase):
+    """Radius and top-k nearest queries on PropertyManager."""
+
+    def setUp(self):
+        self.manager = PropertyManager()
+        rng = random.Random(10)
+        self.points = []
+        for i in range(300):
+            point = (38.96 + rng.uniform(0, 0.06), -76.97 + rng.uniform(0, 0.06))
+            property_type = "2x2" if i % 2 else "Studio"
+            self.manager.add_rental(make_rental(4000 + i, point, property_type), 7.0)
+            self.points.append((point, property_type))
+
+    def test_radius_query_matches_linear_scan(self):
+        found = self.manager.rentals_within(ESJ, 1.0)
+        expected = sum(1 for point, _ in self.points if haversine_miles(ESJ, point) <= 1.0)
+
+        self.assertEqual(len(found), expected)
+        distances = [distance for distance, _ in found]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_nearest_with_type_filter(self):
+        nearest = self.manager.nearest_rentals("ESJ", k=20, property_type="2x2")
+        expected = sorted(haversine_miles(ESJ, point) for point, t in self.points if t == "2x2")[:20]
+
+        self.assertEqual([distance for distance, _ in nearest], expected)
+        self.assertTrue(all(listing["Property Type"] == "2x2" for _, listing in nearest))
+
+    def test_removed_rental_leaves_index(self):
+        closest = self.manager.nearest_rentals(ESJ, k=1)[0][1]
+        position = self.manager.list_properties().index(closest)
+
+        self.manager.remove_property(position)
+
+        self.assertNotIn(closest, [listing for _, listing in self.manager.nearest_rentals(ESJ, k=5)])
+
+    def test_lazy_rental_is_indexed_once_geocoded(self):
+        lookups = []
+
+        def backend(address):
+            lookups.append(address)
+            return None if address.startswith("1 Nowhere") else (38.9866, -76.9418)
+
+        function_library.configure_geocode_cache(enabled=False)
+        function_library.set_geocoder_backend(backend)
+        self.addCleanup(function_library.set_geocoder_backend, None)
+        self.addCleanup(function_library.configure_negative_cache)
+
+        manager = PropertyManager()
+        listing = manager.add_rental(RentalProperty("4131 Campus Dr, College Park, MD", 1200, 20742,
+                                                    True, "2x2", 12, {"walk": 0.1}), 7.0)
+        manager.add_rental(RentalProperty("1 Nowhere Ln", 900, 20740, True, "2x2", 12, {"walk": 1.0}), 6.0)
+        self.assertEqual(lookups, [])  # adding does not geocode
+
+        nearest = manager.nearest_rentals((38.98, -76.93), k=5)
+        self.assertEqual([found for _, found in nearest], [listing])
+        self.assertEqual(listing["Latitude"], 38.9866)
+        self.assertEqual(len(manager.rentals_within(ESJ, 1.0)), 1)
+        self.assertEqual(sorted(lookups), ["1 Nowhere Ln", "4131 Campus Dr, College Park, MD"])
+
+    def test_grid_index_handles_empty_and_invalid_queries(self):
+        index = GridIndex()
+        self.assertEqual(index.nearest(ESJ, 3), [])
+        with self.assertRaises(ValueError):
+            index.within(ESJ, -1)
+
+
+
+class TestTopKRanking(unittest.TestCase):
+    """Bounded-heap ranking on PropertyManager."""
+
+    def setUp(self):
+        self.manager = PropertyManager()
+        rng = random.Random(13)
+        for i in range(200):
+            score = rng.choice([5.0, 6.25, 7.5, 8.0, 9.1])
+            self.manager.add_rental(make_rental(4000 + i, (38.98, -76.93), "2x2" if i % 2 else "Studio"), score)
+
+    def test_top_listings_match_stable_sort(self):
+        expected = sorted(self.manager.list_properties(), key=lambda r: r["Overall Score"], reverse=True)
+        self.assertEqual(self.manager.top_listings(25), expected[:25])
+
+    def test_type_filter(self):
+        top = self.manager.top_listings(10, property_type="studio")
+        self.assertTrue(all(r["Property Type"] == "Studio" for r in top))
+
+    def test_top_rentals_scores_generator(self):
+        calculator = ScoreCalculator()
+        rentals = [make_rental(5000 + i, (38.98, -76.93), rent=800 + 25 * i) for i in range(60)]
+
+        top = self.manager.top_rentals((r for r in rentals), calculator, k=5)
+
+        expected = sorted(((calculator.overall_score(r), r) for r in rentals), key=lambda p: -p[0])[:5]
+        self.assertEqual(top, expected)
+
+    def test_invalid_k(self):
+        with self.assertRaises(ValueError):
+            self.manager.top_listings(0)
+
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Incrementally maintained score and rent indexes."""
+
+    def setUp(self):
+        self.manager = PropertyManager()
+        rng = random.Random(14)
+        for i in range(150):
+            rental = make_rental(4000 + i, (38.98, -76.93), rent=rng.choice([900, 1100, 1350, 1600]))
+            self.manager.add_rental(rental, rng.choice([4.5, 6.0, 7.25, 8.5, 9.0]))
+
+    def expected(self, field, reverse):
+        return sorted(self.manager.list_properties(), key=lambda r: float(r[field]), reverse=reverse)
+
+    def test_views_stay_sorted_through_adds_and_deletes(self):
+        for index in (0, 40, 77, 100):
+            self.manager.remove_property(index)
+        self.manager.add_rental(make_rental(9999, (38.98, -76.93), rent=700), 9.9)
+
+        by_score = self.manager.list_properties("score")
+        self.assertEqual(list(by_score), self.expected("Overall Score", True))
+        self.assertEqual(list(self.manager.list_properties("rent")), self.expected("Rent", False))
+        self.assertEqual(by_score[0]["Overall Score"], 9.9)
+
+    def test_rank_range_and_pages(self):
+        by_score = self.manager.list_properties("score")
+        expected = self.expected("Overall Score", True)
+
+        self.assertEqual(by_score.rank(expected[37]), 37)
+        self.assertEqual(by_score.page(3, 20), expected[40:60])
+        self.assertEqual(by_score.between(6.0, 8.5),
+                         [r for r in expected if 6.0 <= r["Overall Score"] <= 8.5])
+
+    def test_index_survives_csv_reload(self):
+        path = "test_sorted_index.csv"
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        self.manager.save_to_csv(path)
+
+        reloaded = PropertyManager()
+        reloaded.load_from_csv(path)
+        scores = [float(r["Overall Score"]) for r in reloaded.list_properties("score")]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(scores), 150)
+
+    def test_random_operations_match_sorted_list(self):
+        rng = random.Random(7)
+        index = SortedIndex(lambda item: item["value"], rng=rng)
+        items = []
+        for _ in range(2000):
+            if items and rng.random() < 0.4:
+                self.assertTrue(index.remove(items.pop(rng.randrange(len(items)))))
+            else:
+                item = {"value": rng.randint(0, 20)}
+                index.insert(item)
+                items.append(item)
+
+        expected = sorted(items, key=lambda item: -item["value"])
+        self.assertEqual(list(index), expected)
+        for position in range(0, len(expected), 25):
+            self.assertIs(index[position], expected[position])
+            self.assertEqual(index.rank(expected[position]), position)
+
+
+
+class TestMarketAverages(unittest.TestCase):
+    """Running per-(ZIP, type) rent statistics feeding price_score."""
+
+    def test_p2_quantiles_track_exact_values(self):
+        rng = random.Random(15)
+        rents = sorted(rng.lognormvariate(7.2, 0.3) for _ in range(5000))
+        rng.shuffle(rents)
+        for p in (0.25, 0.5, 0.9):
+            estimator = P2Quantile(p)
+            for rent in rents:
+                estimator.add(rent)
+            exact = sorted(rents)[int(p * (len(rents) - 1))]
+            self.assertAlmostEqual(estimator.value(), exact, delta=exact * 0.02)
+
+        small = P2Quantile(0.5)
+        for rent in (1400, 1000, 1200):
+            small.add(rent)
+        self.assertEqual(small.value(), 1200)
+
+    def test_reference_price_falls_back_to_broader_groups(self):
+        market = MarketAverages(min_count=2)
+        market.add("20740", "2x2", 1200)
+        market.add("20740", "2x2", 1400)
+        market.add("20740", "Studio", 900)
+        market.add(20742, "Studio", 1000)
+
+        self.assertEqual(market.reference_price("20740", "2x2"), 1300)
+        self.assertEqual(market.reference_price("20740", "studio"), 3500 / 3)  # whole ZIP
+        self.assertEqual(market.reference_price("20742", "Studio"), 4500 / 4)  # whole market
+        self.assertEqual(MarketAverages().reference_price("20740", "2x2", default=1500.0), 1500.0)
+
+        market.remove("20740", "2x2", 1400)
+        self.assertEqual(market.stats("20740", "2x2").mean, 1200)
+
+    def test_manager_market_feeds_price_score(self):
+        manager = PropertyManager()
+        calculator = ScoreCalculator(market=manager.market)
+        for i, rent in enumerate((800, 900, 1000)):
+            manager.add_rental(make_rental(4000 + i, (38.98, -76.93), rent=rent), 7.0)
+
+        rental = make_rental(5000, (38.98, -76.93), rent=1350)
+        self.assertEqual(calculator.reference_price(rental.zipcode, "2x2"), 900)
+        self.assertEqual(calculator.component_scores(rental)["price"], 0.0)  # 1.5x the local market
+
+        manager.remove_property(0)
+        self.assertEqual(manager.market.stats("20740", "2x2").count, 2)
+        # Two rents are below min_count, so the $1500 default applies again
+        self.assertEqual(calculator.component_scores(rental)["price"], 6.0)
+
+    def test_quantiles_forget_removed_rents(self):
+        market = MarketAverages()
+        for rent in (1000, 1100, 1200, 1300, 5000, 5100, 5200):
+            market.add("20740", "2x2", rent)
+        market.remove("20740", "2x2", 5200)
+        with self.assertRaises(ValueError):
+            market.stats("20740", "2x2").median  # no source to rebuild from
+        self.assertIsNone(market.stats("20740", "2x2").summary()["p50"])
+
+        manager = PropertyManager()
+        for i, rent in enumerate((1000, 1100, 1200, 1300, 5000, 5100, 5200)):
+            manager.add_rental(make_rental(4100 + i, (38.98, -76.93), rent=rent), 7.0)
+        for _ in range(3):
+            manager.remove_property(len(manager.list_properties()) - 1)  # drop the $5000+ rents
+        stats = manager.market.stats("20740", "2x2")
+        self.assertEqual((stats.count, stats.median), (4, 1150))
+        self.assertEqual(manager.market.stats().median, 1150)
+
+
+
+class TestSkyline(unittest.TestCase):
+    """Non-dominated rentals over rent, commute, flexibility and type."""
+
+    @staticmethod
+    def dominates(a, b):
+        return a[0] <= b[0] and all(x >= y for x, y in zip(a[1:], b[1:])) and a != b
+
+    def test_matches_pairwise_comparison(self):
+        rng = random.Random(16)
+        points = [(rng.choice(range(800, 1600, 50)), rng.choice([4.0, 6.5, 8.0, 10.0]),
+                   rng.choice([4, 7, 10]), rng.choice([6.0, 8.0, 9.0])) for _ in range(500)]
+
+        skyline = Skyline()
+        for i, point in enumerate(points):
+            skyline.add(i, *point)
+
+        expected = [i for i, p in enumerate(points) if not any(self.dominates(q, p) for q in points)]
+        self.assertEqual(sorted(skyline.items()), expected)
+
+    def test_incremental_add_knocks_out_dominated(self):
+        skyline = Skyline()
+        self.assertTrue(skyline.add("a", 1200, 8.0, 4, 8.0))
+        self.assertTrue(skyline.add("b", 1000, 6.0, 4, 8.0))
+        self.assertFalse(skyline.add("c", 1300, 7.0, 4, 8.0))
+        self.assertTrue(skyline.add("d", 1000, 8.0, 7, 8.0))
+        self.assertEqual(skyline.items(), ["d"])
+
+    def test_pareto_front_uses_component_scores(self):
+        calculator = ScoreCalculator()
+        cheap = make_rental(4000, (38.98, -76.93), rent=900)
+        close = make_rental(4001, (38.98, -76.93), rent=1500)
+        close.distances = {"walk": 0.2}
+        worse = make_rental(4002, (38.98, -76.93), rent=1600)
+
+        self.assertEqual(calculator.pareto_front([worse, close, cheap]), [cheap, close])
+
+
+if __name__ == "__main__":
+    unittest.main()
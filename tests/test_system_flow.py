@@ -17,6 +17,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'S
 from rental_property import RentalProperty
 from score_calculator import ScoreCalculator
 from listing_manager import PropertyManager
+from commute import Commute, CommuteProfile
 
 # --------------------------------------------------
 # UNIT TESTS
@@ -111,6 +112,25 @@ class TestIntegrationFlow(unittest.TestCase):
         self.assertIn("Overall Score", listing)
 
 
+class TestCommuteProfile(unittest.TestCase):
+    """Integration tests: one distance computation covers every travel mode."""
+
+    @patch("commute.calculate_distance", return_value=1.2)
+    def test_distance_computed_once_for_all_modes(self, mock_distance):
+        profile = CommuteProfile("7303 Baltimore Ave, College Park, MD", "ESJ")
+
+        self.assertEqual(mock_distance.call_count, 1)
+        self.assertEqual(profile.modes, ["walk", "bike", "drive", "bus"])
+        self.assertEqual(profile.distances(["walk", "drive"]), {"walk": 1.2, "drive": 1.2})
+
+    @patch("commute.calculate_distance", return_value=1.2)
+    def test_times_match_single_mode_commute(self, mock_distance):
+        profile = CommuteProfile("7303 Baltimore Ave, College Park, MD", "ESJ")
+        for mode in profile.modes:
+            commute = Commute("7303 Baltimore Ave, College Park, MD", "ESJ", mode)
+            self.assertEqual(profile.time_for(mode), commute.time_minutes)
+
+
 # --------------------------------------------------
 # SYSTEM TESTS
 # --------------------------------------------------